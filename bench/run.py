@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# bench/run.py
+# End-to-end benchmark of the entry points against scripts/fakegithub.py. For every size
+# each script runs as its own process, in a scratch copy of the repository seeded with a
+# synthetic account, username corpus and state, and is measured for
+#   - wall time and peak RSS of the process,
+#   - API requests it made, by endpoint (counted by the fake server) and mutations,
+#   - size of .github/state afterwards,
+#   - time and requests per phase, from the metrics the script emitted (metrics.py).
+# Scripts run in workflow order against one fake world per size, so later scripts see the
+# state earlier ones left (autotrack feeds autostarback, autostargrow feeds autounstarback).
+#
+#   python bench/run.py                       # small size, results in bench/results/
+#   python bench/run.py --sizes small,medium --latency 0.05
+#   python bench/run.py --check               # fail on regressions against bench/thresholds.json
+#   python bench/run.py --update-thresholds   # re-baseline thresholds from this run
+#
+# Runs are seeded (SAMPLE_SEED) and per-run caps kept low, so request counts are stable
+# and a run isn't dominated by mutation pacing.
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = Path(__file__).parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import fakegithub  # noqa: E402
+
+THRESHOLDS_PATH = BENCH_DIR / "thresholds.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# followers/following of the bot, stargazers per bot repo, usernames in config/usernames.txt
+SIZES = {
+    "small":  {"followers": 200,   "following": 300,   "stargazers": 100,   "repos": 2, "corpus": 2000},
+    "medium": {"followers": 2000,  "following": 3000,  "stargazers": 1000,  "repos": 3, "corpus": 50000},
+    "large":  {"followers": 20000, "following": 30000, "stargazers": 10000, "repos": 3, "corpus": 500000},
+}
+
+# In workflow order; (name, extra arguments)
+SCRIPTS = [
+    ("shoutouts", []),
+    ("autotrack", []),
+    ("autostarback", []),
+    ("autostargrow", []),
+    ("autounstarback", []),
+    ("gitgrow", []),
+    ("unfollowers", []),
+    ("cleaner", []),
+    ("integrity", ["--sweep", "--limit", "500"]),
+]
+
+ENV = {
+    "PAT_TOKEN": "bench",
+    "BOT_USER": "bot",
+    "GITHUB_REPOSITORY": "bot/repo0",
+    "SAMPLE_SEED": "1",
+    "WRITE_INTERVAL": "0",
+    "FOLLOWERS_PER_RUN": "20",
+    "UNFOLLOWS_PER_RUN": "20",
+    "STARBACK_BUDGET": "20",
+    "UNSTARS_PER_RUN": "20",
+}
+
+# Variables that would send a script's state somewhere other than the scratch tree
+STRIPPED_ENV = ("DRY_RUN", "METRICS_PATH", "GITHUB_STEP_SUMMARY", "USER_CACHE_PATH", "UNFOLLOW_QUEUE_PATH",
+                "FOLLOW_SNAPSHOT_PATH", "USERNAME_CORPUS_PATH", "FOLLOW_LEDGER_PATH", "INTEGRITY_CHECKPOINT_PATH",
+                "STATE_DB_PATH", "STATE_JSON_PATH", "ACTIONS_JOURNAL_PATH")
+
+GROWTH_SEED = 0.01  # Share of the corpus seeded as growth stars already past their expiry
+
+# Allowed slack when --update-thresholds turns a run into limits
+HEADROOM = {"requests": 1.25, "wall_s": 2.0, "peak_rss_mb": 1.5, "state_bytes": 1.5}
+
+
+def build_world(size):
+    """Fake GitHub world and matching usernames.txt lines for one size."""
+    spec = SIZES[size]
+    world = fakegithub.World.synthetic(spec["followers"], spec["following"], spec["stargazers"],
+                                       spec["repos"], missing_every=0, seed=1)
+    population = max(spec["followers"], spec["following"], spec["stargazers"])
+    lines = []
+    for i in range(spec["corpus"]):
+        if i % 25 == 0:
+            login = f"gone{i:06d}"             # Deleted accounts for integrity/cleaner to find
+            world.missing.add(login)
+        else:
+            login = f"user{population + i:06d}"
+        lines.append(login)
+        if i % 50 == 1:
+            lines.append(login.upper())        # Case duplicates for cleaner
+    return world, lines
+
+
+def prepare(workdir, size, lines):
+    """Scratch repository: scripts, config and pre-seeded state."""
+    shutil.copytree(ROOT / "scripts", workdir / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    (workdir / "config").mkdir()
+    (workdir / "config" / "usernames.txt").write_text("\n".join(lines) + "\n")
+    (workdir / "config" / "whitelist.txt").write_text("user000000\nuser000001\n")
+    state = workdir / ".github" / "state"
+    state.mkdir(parents=True)
+
+    import statestore, expiry
+    due = (datetime.now(timezone.utc) - timedelta(days=expiry.DAYS_UNTIL_UNSTAR + 1)).isoformat()
+    with statestore.StateStore(state / "stargazer_state.sqlite") as store:
+        growth = store.section("growth_starred")
+        with store.transaction():
+            for login in lines[1:int(len(lines) * GROWTH_SEED) + 1]:
+                if not login.startswith("gone") and login.islower():
+                    growth.put(login, [{"repo": f"{login}/project0", "starred_at": due}])
+        expiry.ensure(store)
+
+
+def state_bytes(workdir):
+    return sum(p.stat().st_size for p in (workdir / ".github" / "state").rglob("*") if p.is_file())
+
+
+def phases(workdir, name):
+    """{phase: {elapsed_s, requests}} of the last run of `name` in the scratch tree's metrics."""
+    path = workdir / "logs" / "metrics.jsonl"
+    if not path.exists():
+        return {}
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    runs = [r["run"] for r in records if r["script"] == name and r["type"] == "run"]
+    return {
+        r["phase"]: {"elapsed_s": r["elapsed_s"], "requests": r["requests"]}
+        for r in records
+        if runs and r["script"] == name and r["run"] == runs[-1] and r["type"] == "phase"
+    }
+
+
+def run_script(workdir, name, args, server, log_path, timeout):
+    env = {k: v for k, v in os.environ.items() if k not in STRIPPED_ENV}
+    env.update(ENV, GITHUB_API_URL=server.url)
+    calls_before, mutations_before = server.calls.copy(), server.mutations
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen([sys.executable, f"scripts/{name}.py", *args], cwd=workdir, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        deadline = started + timeout
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.01)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    calls = server.calls - calls_before
+    return {
+        "exit": proc.returncode,
+        "wall_s": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is in KiB on Linux
+        "requests": sum(calls.values()),
+        "mutations": server.mutations - mutations_before,
+        "endpoints": dict(sorted(calls.items())),
+        "state_bytes": state_bytes(workdir),
+        "phases": phases(workdir, name),
+    }
+
+
+def run_size(size, scripts, latency, out_dir, timeout):
+    world, lines = build_world(size)
+    server = fakegithub.serve(world, latency=latency, rate_limit=1_000_000)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"gitgrow-bench-{size}-") as tmp:
+            workdir = Path(tmp)
+            prepare(workdir, size, lines)
+            for name, args in SCRIPTS:
+                if name not in scripts:
+                    continue
+                log_path = out_dir / f"{size}-{name}.log"
+                r = run_script(workdir, name, args, server, log_path, timeout)
+                results[name] = r
+                status = "ok" if r["exit"] == 0 else f"exit {r['exit']} (see {log_path})"
+                print(f"[BENCH] {size:<6} {name:<15} {r['wall_s']:>7.2f}s {r['peak_rss_mb']:>7.1f}MB "
+                      f"requests={r['requests']:<6} mutations={r['mutations']:<4} "
+                      f"state={r['state_bytes']}B {status}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+# — thresholds —
+
+def check(results, thresholds):
+    """
+    Regressions of `results` against `thresholds` as readable lines; empty when all pass.
+    A script that exited nonzero fails whether or not it has thresholds.
+    """
+    failures = []
+    for size, scripts in results.items():
+        for name, r in scripts.items():
+            if r["exit"] != 0:
+                failures.append(f"{size}/{name}: exited with {r['exit']}")
+                continue
+            for metric, limit in thresholds.get(size, {}).get(name, {}).items():
+                if r[metric] > limit:
+                    failures.append(f"{size}/{name}: {metric} {r[metric]} > {limit}")
+    return failures
+
+
+def thresholds_from(results, previous=None):
+    """Limits with HEADROOM over a run; scripts that failed keep their previous limits."""
+    updated = json.loads(json.dumps(previous or {}))
+    for size, scripts in results.items():
+        for name, r in scripts.items():
+            if r["exit"] != 0:
+                continue
+            updated.setdefault(size, {})[name] = {
+                metric: (round(r[metric] * slack, 2) if metric == "wall_s" else int(r[metric] * slack) + 1)
+                for metric, slack in HEADROOM.items()
+            }
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GitGrow scripts against a fake GitHub")
+    parser.add_argument("--sizes", default="small", help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--scripts", default=",".join(n for n, _ in SCRIPTS), help="comma-separated subset")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per API request")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a script is killed")
+    parser.add_argument("--out", type=Path, default=RESULTS_DIR, help="directory for results and logs")
+    parser.add_argument("--check", action="store_true", help=f"exit 1 on regressions against {THRESHOLDS_PATH.name}")
+    parser.add_argument("--update-thresholds", action="store_true", help="rewrite the thresholds from this run")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    scripts = {s.strip() for s in args.scripts.split(",") if s.strip()}
+    unknown = [s for s in sizes if s not in SIZES] + sorted(scripts - {n for n, _ in SCRIPTS})
+    if unknown:
+        parser.error(f"unknown size or script: {', '.join(unknown)}")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    results = {size: run_size(size, scripts, args.latency, args.out, args.timeout) for size in sizes}
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {"at": stamp, "latency": args.latency, "sizes": {s: SIZES[s] for s in sizes}, "results": results}
+    (args.out / f"bench-{stamp}.json").write_text(json.dumps(report, indent=2) + "\n")
+    print(f"[BENCH] Results written to {args.out / f'bench-{stamp}.json'}")
+
+    thresholds = json.loads(THRESHOLDS_PATH.read_text()) if THRESHOLDS_PATH.exists() else {}
+    if args.update_thresholds:
+        THRESHOLDS_PATH.write_text(json.dumps(thresholds_from(results, thresholds), indent=2) + "\n")
+        print(f"[BENCH] Thresholds updated in {THRESHOLDS_PATH}")
+    elif args.check:
+        failures = check(results, thresholds)
+        for line in failures:
+            print(f"[REGRESSION] {line}")
+        if failures:
+            sys.exit(1)
+        print("[BENCH] No regressions against the thresholds.")
+
+
+if __name__ == "__main__":
+    main()
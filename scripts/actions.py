@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# actions.py
+# Star/unstar/follow/unfollow by name, shared by every script that mutates. Each action is
+# exactly one request (PUT/DELETE /user/starred/{owner}/{repo}, PUT/DELETE
+# /user/following/{login}) sent through client.write(), so it is paced and retried like any
+# other mutation, without fetching the authenticated user, the repo or the target user first.
+# Every action is counted on the client, and client.report() prints what a run mutated.
+#
+# On a dry run (client.dry_run, see ghclient.py) an action only logs what it would do and
+# is counted as if it succeeded, so callers update their local state exactly as on a real
+# run; nothing is sent.
+#
+# PyGithub < 2 has no public requester; there the same calls go through the authenticated
+# user's add_to_starred/... with lazy_repo()/lazy_user() handles.
+
+import threading
+from urllib.parse import quote
+
+ENDPOINTS = {
+    "star":     ("PUT",    "/user/starred/{}"),
+    "unstar":   ("DELETE", "/user/starred/{}"),
+    "follow":   ("PUT",    "/user/following/{}"),
+    "unfollow": ("DELETE", "/user/following/{}"),
+}
+
+
+class Actions:
+    """Mutations by repo full name / login; `me` (AuthenticatedUser) is only needed on PyGithub < 2."""
+
+    def __init__(self, client, me=None):
+        self.client = client
+        self._me = me
+        self._lock = threading.Lock()
+
+    def _user(self):
+        with self._lock:
+            if self._me is None:
+                self._me = self.client.read(self.client.gh.get_user)  # Authenticated user, fetched once
+            return self._me
+
+    def _send(self, action, target, fallback):
+        if self.client.dry_run:
+            print(f"[DRY-RUN] would {action} {target}")
+            self.client.count_mutation(action)
+            return
+        requester = getattr(self.client.gh, "requester", None)
+        if requester is None:
+            self.client.write(fallback)
+        else:
+            verb, path = ENDPOINTS[action]
+            self.client.write(requester.requestJsonAndCheck, verb, path.format(quote(target, safe="/")))
+        self.client.count_mutation(action)
+
+    def star(self, full_name):
+        self._send("star", full_name, lambda: self._user().add_to_starred(self.client.lazy_repo(full_name)))
+
+    def unstar(self, full_name):
+        self._send("unstar", full_name, lambda: self._user().remove_from_starred(self.client.lazy_repo(full_name)))
+
+    def follow(self, login):
+        self._send("follow", login, lambda: self._user().add_to_following(self.client.lazy_user(login)))
+
+    def unfollow(self, login):
+        self._send("unfollow", login, lambda: self._user().remove_from_following(self.client.lazy_user(login)))
@@ -2,100 +2,157 @@
 
 import os
 import sys
-import json
-from pathlib import Path
-from github import Github
+from github import GithubException
+from ghclient import connect, BudgetExhausted
+from actions import Actions
+from usercache import UserCache
+import statestore
+from journal import Journal
+import stargazers
+import metrics
 from datetime import datetime, timezone
 
 TOKEN = os.getenv("PAT_TOKEN")
 BOT_USER = os.getenv("BOT_USER")
-STATE_PATH = Path(".github/state/stargazer_state.json")
+REPO_INDEX_LIMIT = 100  # Public non-fork repos indexed per stargazer
+STARBACK_BUDGET = int(os.getenv("STARBACK_BUDGET", 200))  # Users taken from the queue per run
 
 def main():
+    metrics.start("autostarback")  # Phase timings, API calls and counters of this run
     print("==== [START] autostarback.py ====")
     print(f"ENV: TOKEN={'SET' if TOKEN else 'UNSET'} BOT_USER={BOT_USER}")
 
     if not TOKEN or not BOT_USER:
         print("[autostarback] ERROR: PAT_TOKEN and BOT_USER required.", file=sys.stderr)
         sys.exit(1)
-    if not STATE_PATH.exists():
-        print(f"[autostarback] ERROR: {STATE_PATH} not found.", file=sys.stderr)
+    if not statestore.exists():
+        print(f"[autostarback] ERROR: {statestore.DB_PATH} not found.", file=sys.stderr)
         sys.exit(1)
     print("[autostarback] State file found.")
 
-    with open(STATE_PATH) as f:
-        state = json.load(f)
-
-    current_stargazers = set(state.get("current_stargazers", []))
-    reciprocity = state.get("reciprocity", {})
-    now_iso = datetime.now(timezone.utc).isoformat()
+    with metrics.phase("load-state"):
+        store = statestore.StateStore()
+        journal = Journal()
+        replayed = journal.replay(store)  # Stars an interrupted run made but never saved
+        if replayed:
+            print(f"[autostarback] Replayed {replayed} journaled actions from an interrupted run.")
+        reciprocity = store.section("reciprocity")  # Read and written one user at a time
+        queue = store.get("pending_reciprocity")
+        if queue is None:  # State written before autotrack.py emitted the queue
+            queue = stargazers.pending_queue(dict(reciprocity.items()))
     changed = False
+    now_iso = datetime.now(timezone.utc).isoformat()
 
     print("[autostarback] Authenticating with GitHub ...")
-    gh = Github(TOKEN)
-    me = gh.get_user(BOT_USER)
-    print(f"[autostarback] Authenticated as: {me.login}")
-
-    print("[autostarback] Starting star-back reconciliation loop over all current stargazers ...")
-    for user_idx, user in enumerate(current_stargazers, 1):
-        if user not in reciprocity:
-            continue
-
-        starred_by = reciprocity[user]["starred_by"]
-        starred_back = reciprocity[user].get("starred_back", [])
-        needed = len(starred_by)
-        current = len(starred_back)
-
-        print(f"\n[autostarback] Processing user [{user_idx}/{len(current_stargazers)}]: {user}")
-        print(f"    starred_by={needed} starred_back={current}")
-
-        try:
-            u = gh.get_user(user)
-            user_repos = []
-            for r in u.get_repos():
-                if r.fork or r.private:
-                    continue
-                user_repos.append(r)
-                if len(user_repos) == needed:
-                    break
-            user_repo_names = [r.full_name for r in user_repos]
-            max_possible = len(user_repo_names)
-
-            # If all possible repos are already starred, but still unbalanced, log the attempt with timestamp
-            if needed > max_possible and current >= max_possible:
-                print(f"[autostarback] Cannot match reciprocity for {user} (starred_by={needed}, user has only {max_possible} repos). Logging unbalanced attempt.")
-                reciprocity[user]["last_unbalanced_attempt"] = now_iso
-                changed = True
-                continue
-
-            # Star more of their repos if needed, up to the max possible
-            while len(starred_back) < needed and len(user_repo_names) > len(starred_back):
-                repo_name = user_repo_names[len(starred_back)]
-                print(f"[autostarback] Starring {repo_name} for {user} (to match count)")
-                try:
-                    repo = gh.get_repo(repo_name)
-                    me.add_to_starred(repo)
-                    starred_back.append(repo_name)
+    client = connect(TOKEN)
+    gh = client.gh
+    actions = Actions(client)  # Stars by repo name as the authenticated user
+    cache = UserCache()  # Stargazer repo index, reused while the owner's repo signature holds
+
+    batch = queue[:STARBACK_BUDGET]
+    print(f"[autostarback] {len(queue)} users pending star-back, processing {len(batch)} this run ...")
+    done = 0      # Queue cursor: batch[:done] has been handled
+    retry = []    # Failed users, moved to the back of the queue
+    with client.phase("star-back"):
+        for user_idx, user in enumerate(batch, 1):
+            done = user_idx - 1
+            rec = reciprocity.get(user)
+            if rec is None:
+                continue  # Unstarred since autotrack.py built the queue
+
+            starred_by = rec["starred_by"]
+            starred_back = rec.get("starred_back", [])
+            needed = len(starred_by)
+            current = len(starred_back)
+
+            print(f"\n[autostarback] Processing user [{user_idx}/{len(batch)}]: {user}")
+            print(f"    starred_by={needed} starred_back={current}")
+
+            try:
+                u = client.read(gh.get_user, user)
+                signature = [u.public_repos, u.updated_at]  # Changes when repos are added/removed
+                index = cache.repos(user, signature=signature)
+                if index is None:
+                    index = []
+                    for r in u.get_repos(type="owner"):
+                        if r.fork or r.private:
+                            continue
+                        index.append(r.full_name)
+                        if len(index) >= REPO_INDEX_LIMIT:
+                            break
+                    cache.set_repos(user, index, signature=signature)
+                else:
+                    metrics.count("repo-index.reused")
+                    print(f"    Repo index for {user} unchanged ({len(index)} repos), not re-listing")
+                user_repo_names = index[:needed]
+                max_possible = len(user_repo_names)
+
+                # If all possible repos are already starred, but still unbalanced, log the attempt with timestamp
+                if needed > max_possible and current >= max_possible:
+                    print(f"[autostarback] Cannot match reciprocity for {user} (starred_by={needed}, user has only {max_possible} repos). Logging unbalanced attempt.")
+                    rec["last_unbalanced_attempt"] = now_iso
+                    rec["starback_unmatchable_at"] = now_iso  # Keeps the user out of the queue for a while
+                    metrics.count("users.unbalanced")
+                    reciprocity.put(user, rec)
                     changed = True
-                except Exception as err:
-                    print(f"[autostarback] ERROR: Failed to star {repo_name} for {user}: {err}")
-                    break
-
-            print(f"[autostarback] Final: {user}: user_starred_yours={needed}, you_starred_theirs={len(starred_back)}")
-            reciprocity[user]["starred_back"] = starred_back
-
-        except Exception as e:
-            print(f"[autostarback] ERROR processing {user}: {e}")
+                    continue
 
-    # Write updated state (reciprocity only; autotrack will always overwrite on next run)
+                # Star more of their repos if needed, up to the max possible
+                while len(starred_back) < needed and len(user_repo_names) > len(starred_back):
+                    repo_name = user_repo_names[len(starred_back)]
+                    print(f"[autostarback] Starring {repo_name} for {user} (to match count)")
+                    try:
+                        actions.star(repo_name)  # Star by name, no repo GET
+                        journal.record("star_back", user, repo_name)
+                        starred_back.append(repo_name)
+                        changed = True
+                    except BudgetExhausted:
+                        raise
+                    except Exception as err:
+                        print(f"[autostarback] ERROR: Failed to star {repo_name} for {user}: {err}")
+                        metrics.count("star.failed")
+                        if isinstance(err, GithubException) and err.status == 404:
+                            cache.forget_repos(user)  # Renamed/deleted: rebuild the index next run
+                        retry.append(user)
+                        break
+
+                print(f"[autostarback] Final: {user}: user_starred_yours={needed}, you_starred_theirs={len(starred_back)}")
+                rec["starred_back"] = starred_back
+                reciprocity.put(user, rec)
+
+            except BudgetExhausted as e:
+                rec["starred_back"] = starred_back  # Keep stars made before the budget ran out
+                reciprocity.put(user, rec)
+                print(f"[autostarback] Rate budget exhausted, deferring remaining users to next run: {e}")
+                break
+            except Exception as e:
+                print(f"[autostarback] ERROR processing {user}: {e}")
+                metrics.count("users.failed")
+                retry.append(user)
+        else:
+            done = len(batch)
+
+    cache.close()
+
+    # Unprocessed users keep their place at the front, so the next run resumes there
+    remaining = queue[done:] + retry
+    if remaining != store.get("pending_reciprocity"):
+        store.set("pending_reciprocity", remaining)
+        changed = True
+    print(f"[autostarback] {len(remaining)} users left in the star-back queue.")
+    metrics.count("queue.remaining", len(remaining))
+
+    # Reciprocity records were saved per user above; refresh the JSON export if anything moved
     if changed:
-        state["reciprocity"] = reciprocity
-        with open(STATE_PATH, "w") as f:
-            json.dump(state, f, indent=2)
+        store.export_json()
         print("[autostarback] State updated and saved to disk.")
     else:
         print("[autostarback] No changes to state.")
+    journal.replay(store)  # Compact: everything is in the store now
+    journal.close()
+    store.close()
 
+    client.report()
     print("==== [END] autostarback.py ====")
 
 if __name__ == "__main__":
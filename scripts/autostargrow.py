@@ -2,19 +2,28 @@
 
 import os
 import sys
-import json
 import random
 from pathlib import Path
-from github import Github
 from datetime import datetime, timezone
+from usercache import UserCache
+from ghclient import connect, BudgetExhausted
+from actions import Actions
+from corpus import load_corpus
+from sampler import Sampler, sample_rng
+import resolver
+import statestore
+import expiry
+from journal import Journal
+import metrics
 
 BOT_USER = os.getenv("BOT_USER")
 TOKEN = os.getenv("PAT_TOKEN")
-STATE_PATH = Path(".github/state/stargazer_state.json")
 USERNAMES_PATH = Path("config/usernames.txt")
 GROWTH_SAMPLE = 10  # Number of new growth users to process per run
+GROWTH_REPOS = 3    # Public non-fork repos looked up per user, one of which gets starred
 
 def main():
+    metrics.start("autostargrow")  # Phase timings, API calls and counters of this run
     print("=== GitGrowBot autostargrow.py started ===")
 
     if not TOKEN or not BOT_USER:
@@ -28,7 +37,8 @@ def main():
         sys.exit(1)
 
     print("Authenticating with GitHub...")
-    gh = Github(TOKEN)
+    client = connect(TOKEN)
+    gh = client.gh
     try:
         me = gh.get_user()
         print(f"Authenticated as: {me.login}")
@@ -37,78 +47,122 @@ def main():
         sys.exit(1)
 
     # *** ONLY THIS BLOCK IS MODIFIED ***
-    if not STATE_PATH.exists():
-        print(f"ERROR: State file {STATE_PATH} not found. Did you forget to fetch tracker-data branch?", file=sys.stderr)
+    if not statestore.exists():
+        print(f"ERROR: State file {statestore.DB_PATH} not found. Did you forget to fetch tracker-data branch?", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Loading state from {STATE_PATH} ...")
-    with open(STATE_PATH) as f:
-        state = json.load(f)
-    growth_starred = state.get("growth_starred", {})
-    # *** END OF MODIFICATION ***
-
-    # Upgrade legacy entries to always use dict with 'repo' and 'starred_at'
-    changed = False
-    for user, entries in list(growth_starred.items()):
-        upgraded = []
-        for e in entries:
-            if isinstance(e, dict) and "repo" in e and "starred_at" in e:
-                upgraded.append(e)
-            elif isinstance(e, str):
-                upgraded.append({"repo": e, "starred_at": None})
+    with client.phase("load-state"):
+        store = statestore.StateStore()
+        print(f"Loading state from {store.path} ...")
+        indexed = expiry.ensure(store)  # Growth stars by expiry day, for autounstarback.py
+        if indexed:
+            print(f"Indexed {indexed} existing growth stars by expiry.")
+        journal = Journal()
+        replayed = journal.replay(store)  # Stars an interrupted run made but never saved
+        if replayed:
+            print(f"Replayed {replayed} journaled actions from an interrupted run.")
+        growth_starred = store.section("growth_starred")
+        # *** END OF MODIFICATION ***
+
+        # Upgrade legacy entries to always use dict with 'repo' and 'starred_at'
+        changed = False
+        for user, entries in growth_starred.items():
+            upgraded = []
+            for e in entries:
+                if isinstance(e, dict) and "repo" in e and "starred_at" in e:
+                    upgraded.append(e)
+                elif isinstance(e, str):
+                    upgraded.append({"repo": e, "starred_at": None})
+                    expiry.add(store, user, e, expiry.expires_at(None))  # Unknown age: due now
+                    changed = True
+                else:
+                    # Any other legacy or corrupt entry
+                    continue
+            if upgraded != entries:
+                growth_starred.put(user, upgraded)
                 changed = True
-            else:
-                # Any other legacy or corrupt entry
-                continue
-        if upgraded != entries:
-            growth_starred[user] = upgraded
-            changed = True
-
-    # Load candidate usernames for growth
-    with open(USERNAMES_PATH) as f:
-        all_usernames = [line.strip() for line in f if line.strip()]
-    print(f"  Loaded {len(all_usernames)} usernames from {USERNAMES_PATH}")
-
-    # Exclude already starred users
-    available = set(all_usernames) - set(growth_starred)
-    print(f"  {len(available)} candidates for growth starring.")
-    sample = random.sample(list(available), min(GROWTH_SAMPLE, len(available)))
+
+        # Load candidate usernames for growth
+        corpus = load_corpus(USERNAMES_PATH)
+        print(f"  Loaded {len(corpus)} usernames from {USERNAMES_PATH}")
+
+        # Draw a random sample, excluding already starred and unresponsive users
+        already = {login.lower() for login in growth_starred.keys()}
+        unresponsive = {login.lower() for login in store.section("unresponsive").keys()}
+        print(f"  {len(already)} users already growth-starred, {len(unresponsive)} unresponsive.")
+        sampler = Sampler(corpus, exclude=(already, unresponsive), rng=sample_rng())
+        sample = sampler.take(GROWTH_SAMPLE)
+        corpus.close()
 
     now_iso = datetime.now(timezone.utc).isoformat()
+    cache = UserCache()
+    actions = Actions(client, me)
 
-    for i, user in enumerate(sample):
-        print(f"  [{i+1}/{len(sample)}] Growth star for user: {user}")
+    with client.phase("growth-star"):
+        # Repos of sampled users not in the cache: one batched lookup instead of a profile + repo listing each
+        unknown = [u for u in sample if cache.exists(u) is not False and cache.repos(u) is None]
         try:
-            u = gh.get_user(user)
-            repos = []
-            for repo in u.get_repos():
-                if not repo.fork and not repo.private:
-                    repos.append(repo)
-                if len(repos) >= 3:
-                    break
-            if not repos:
-                print(f"    No public repos to star for {user}, skipping.")
-                continue
-            repo = random.choice(repos)
-            print(f"    Starring repo: {repo.full_name}")
-            me.add_to_starred(repo)
-            growth_starred.setdefault(user, [])
-            growth_starred[user].append({
-                "repo": repo.full_name,
-                "starred_at": now_iso
-            })
-            changed = True
-            print(f"    Growth: Starred {repo.full_name} for {user} at {now_iso}")
-        except Exception as e:
-            print(f"    Failed to star for growth {user}: {e}")
-
-    # Save updated growth_starred to state file
-    print(f"Saving updated growth_starred to {STATE_PATH} ...")
-    state["growth_starred"] = growth_starred
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
-    print(f"Updated growth_starred written to {STATE_PATH}")
-
+            resolved = resolver.profiles(client, unknown, repos=GROWTH_REPOS) if unknown else {}
+        except BudgetExhausted as e:
+            print(f"    Rate budget exhausted while resolving candidates: {e}")
+            resolved, sample = {}, []
+        for user, profile in resolved.items():
+            if profile is False:
+                cache.set_exists(user, False)
+            elif profile is not None:
+                cache.set_exists(user, True)
+                cache.set_repos(user, profile.repos)
+
+        for i, user in enumerate(sample):
+            print(f"  [{i+1}/{len(sample)}] Growth star for user: {user}")
+            try:
+                if cache.exists(user) is False:
+                    print(f"    {user} not found, skipping.")
+                    metrics.count("skipped.notfound")
+                    continue
+                repo_names = cache.repos(user)
+                if repo_names is None:
+                    print(f"    Could not look up {user}, skipping.")
+                    metrics.count("skipped.lookup-failed")
+                    continue
+                if not repo_names:
+                    print(f"    No public repos to star for {user}, skipping.")
+                    metrics.count("skipped.no-repos")
+                    continue
+                repo_name = random.choice(repo_names)
+                print(f"    Starring repo: {repo_name}")
+                actions.star(repo_name)  # Star by name, no repo GET
+                journal.record("growth_star", user, repo_name, at=now_iso)
+                entries = growth_starred.get(user, [])
+                entries.append({
+                    "repo": repo_name,
+                    "starred_at": now_iso
+                })
+                with store.transaction():
+                    growth_starred.put(user, entries)
+                    expiry.add(store, user, repo_name, expiry.expires_at(now_iso))
+                changed = True
+                print(f"    Growth: Starred {repo_name} for {user} at {now_iso}")
+            except BudgetExhausted as e:
+                print(f"    Rate budget exhausted, stopping growth starring for this run: {e}")
+                break
+            except Exception as e:
+                print(f"    Failed to star for growth {user}: {e}")
+                metrics.count("star.failed")
+
+    cache.close()
+
+    # growth_starred entries were saved as they were made; refresh the JSON export
+    if changed:
+        store.export_json()
+        print(f"Updated growth_starred written to {store.path}")
+    else:
+        print("No changes to growth_starred.")
+    journal.replay(store)  # Compact: everything is in the store now
+    journal.close()
+    store.close()
+
+    client.report()
     print("=== GitGrowBot autostargrow.py finished ===")
 
 if __name__ == "__main__":
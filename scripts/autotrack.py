@@ -2,15 +2,19 @@
 
 import os
 import sys
-import json
-from pathlib import Path
-from github import Github
+from datetime import datetime, timezone
+from github import GithubException
+from ghclient import connect, Unsupported
+from statestore import StateStore
+from journal import Journal
+import stargazers
+import metrics
 
 BOT_USER = os.getenv("BOT_USER")
 TOKEN = os.getenv("PAT_TOKEN")
-STATE_PATH = Path(".github/state/stargazer_state.json")
 
 def main():
+    metrics.start("autotrack")  # Phase timings, API calls and counters of this run
     print("=== GitGrowBot autotrack.py started ===")
     if not TOKEN or not BOT_USER:
         print("ERROR: PAT_TOKEN and BOT_USER required", file=sys.stderr)
@@ -19,90 +23,128 @@ def main():
     print(f"BOT_USER: {BOT_USER}")
 
     print("Authenticating with GitHub...")
-    gh = Github(TOKEN)
+    client = connect(TOKEN)
+    gh = client.gh
     try:
-        me = gh.get_user(BOT_USER)
+        me = client.read(gh.get_user, BOT_USER)
         print(f"Authenticated as: {me.login}")
     except Exception as e:
         print("ERROR: Could not authenticate with GitHub:", e)
         sys.exit(1)
 
-    print("Collecting all public, non-fork repos owned by BOT_USER...")
-    try:
-        repos = [r for r in me.get_repos(type="owner") if not r.fork and not r.private]
-        print(f"Found {len(repos)} repos.")
-    except Exception as e:
-        print("ERROR: Failed to list repos:", e)
-        sys.exit(1)
+    # Load previous state (sections this script doesn't own, e.g. growth_starred, are left alone)
+    with client.phase("load-state"):
+        store = StateStore()
+        print(f"Loading previous state from {store.path} ...")
+        with Journal() as journal:
+            replayed = journal.replay(store)  # Stars/unstars of an interrupted run, before reconciling
+        if replayed:
+            print(f"Replayed {replayed} journaled actions from an interrupted run.")
+        previous_stargazers = set(store.get("current_stargazers", []))
+        previous_reciprocity = dict(store.section("reciprocity").items())
+        previous_repos = dict(store.section("repo_stargazers").items())  # {repo: {login: starred_at}}
+        previous_synced_at = (store.get("stargazer_delta") or {}).get("synced_at")
+        if not previous_repos:  # State from before per-repo records: rebuild them from reciprocity
+            for login, rec in previous_reciprocity.items():
+                for repo_name in rec.get("starred_by", []):
+                    previous_repos.setdefault(repo_name, {})[login] = None
+    print(f"Previous stargazers: {len(previous_stargazers)}, mutual_stars: {len(store.section('mutual_stars'))}")
 
-    # Build set of all unique stargazers and their starred repos
-    stargazer_set = set()
-    reciprocity = {}
+    # Incremental sync starts from last run's per-repo marks and stargazer lists
+    sync_mode = (os.getenv("STARGAZER_SYNC") or "incremental").strip().lower()
+    marks = dict(store.section("stargazer_sync").items())
+    previous = None
+    if sync_mode != "full" and marks:
+        previous = {
+            repo_name: {"mark": mark, "logins": list(previous_repos.get(repo_name, {}))}
+            for repo_name, mark in marks.items()
+        }
 
-    for idx, repo in enumerate(repos):
-        print(f"[{idx+1}/{len(repos)}] Processing repo: {repo.full_name}")
+    mode = stargazers.source()
+    print(f"Collecting all public, non-fork repos owned by BOT_USER and their stargazers "
+          f"({mode}, {'incremental' if previous else 'full'})...")
+    snapshot = None
+    if mode == "graphql":
         try:
-            count = 0
-            for u in repo.get_stargazers():
-                login = u.login
-                stargazer_set.add(login)
-                if login not in reciprocity:
-                    reciprocity[login] = {"starred_by": [], "starred_back": []}
-                reciprocity[login]["starred_by"].append(repo.full_name)
-                count += 1
-                if count % 20 == 0:
-                    print(f"    {count} stargazers fetched so far for this repo...")
-            print(f"    Total stargazers fetched for {repo.full_name}: {count}")
+            snapshot = stargazers.collect_graphql(client, me.login, previous, with_starred=previous is None)
+        except (Unsupported, GithubException, RuntimeError) as e:
+            print(f"WARNING: GraphQL collection failed, falling back to REST: {e}")
+            mode = "rest"
+    if snapshot is None:
+        try:
+            snapshot = stargazers.collect_rest(client, me, previous, with_starred=previous is None)
         except Exception as e:
-            print(f"    ERROR fetching stargazers for {repo.full_name}: {e}")
+            print("ERROR: Failed to list repos:", e)
+            sys.exit(1)
+
+    # Build set of all unique stargazers and their starred repos
+    stargazer_set = set()
+    reciprocity = {}
+    for repo_name in snapshot.repos:
+        for login in snapshot.stargazers.get(repo_name, []):
+            stargazer_set.add(login)
+            if login not in reciprocity:
+                # Carry over bookkeeping (e.g. starback_unmatchable_at) from earlier runs
+                extra = {k: v for k, v in previous_reciprocity.get(login, {}).items()
+                         if k not in ("starred_by", "starred_back")}
+                reciprocity[login] = {"starred_by": [], "starred_back": [], **extra}
+            reciprocity[login]["starred_by"].append(repo_name)
 
     current_stargazers = sorted(stargazer_set)
     print(f"Total unique stargazers across all repos: {len(current_stargazers)}")
 
-    # Fetch all repos YOU have starred
-    print("Fetching all repos starred by the bot user...")
-    try:
-        starred_repos = list(me.get_starred())
-        print(f"Bot user has starred {len(starred_repos)} repos in total.")
-    except Exception as e:
-        print(f"ERROR fetching bot user's starred repos: {e}")
-        starred_repos = []
-
-    # For each of your starred repos, if owner is a stargazer, log as "starred_back"
-    for repo in starred_repos:
-        owner = repo.owner.login
-        if owner in reciprocity:
-            reciprocity[owner]["starred_back"].append(repo.full_name)
-
-    # Load previous state if exists (keep mutual_stars for legacy)
-    if STATE_PATH.exists():
-        print(f"Loading previous state from {STATE_PATH} ...")
-        with open(STATE_PATH, "r") as f:
-            state = json.load(f)
-        previous_stargazers = set(state.get("current_stargazers", []))
-        mutual_stars = state.get("mutual_stars", {})
-        print(f"Previous stargazers: {len(previous_stargazers)}, mutual_stars: {len(mutual_stars)}")
+    # Canonical per-repo record and what changed since the last sync (also read by shoutouts.py)
+    repo_stargazers = stargazers.repo_stargazers(snapshot, previous_repos)
+    delta = stargazers.deltas(previous_repos, repo_stargazers)
+    delta["since"] = previous_synced_at  # The sync this delta starts from (shoutouts.py checks it)
+    delta["synced_at"] = datetime.now(timezone.utc).isoformat()
+    print(f"Star delta: +{sum(map(len, delta['new'].values()))} "
+          f"-{sum(map(len, delta['lost'].values()))} across {len(repo_stargazers)} repos")
+
+    # The bot's own stars only change through our scripts, which record them in state;
+    # the full starred list is needed only when someone new has to be matched against it
+    starred = snapshot.starred
+    newcomers = {login for logins in delta["new"].values() for login in logins} - set(previous_reciprocity)
+    if starred is None and newcomers:
+        print(f"{len(newcomers)} new stargazers, fetching starred repos to match them...")
+        starred = stargazers.collect_starred(client, me, mode)
+
+    if starred is not None:
+        # For each of your starred repos, if owner is a stargazer, log as "starred_back"
+        for repo_name, owner in starred:
+            if owner in reciprocity:
+                reciprocity[owner]["starred_back"].append(repo_name)
     else:
-        print("No previous state found.")
-        previous_stargazers = set()
-        mutual_stars = {}
+        for login, rec in reciprocity.items():
+            rec["starred_back"] = list(previous_reciprocity[login].get("starred_back", []))
 
     # Detect unstargazers: users who have unstarred since last run
     unstargazers = sorted(list(previous_stargazers - stargazer_set))
     print(f"Unstargazers detected: {len(unstargazers)}")
+    metrics.count("stargazers", len(current_stargazers))
+    metrics.count("stargazers.lost", len(unstargazers))
+    metrics.count("stargazers.new", len(newcomers))
+
+    # Star-back work list for autostarback.py: only the users it can still do something for
+    pending = stargazers.pending_queue(reciprocity, store.get("pending_reciprocity", []))
+    print(f"Users pending star-back: {len(pending)}")
 
-    # Save new state
+    # Save new state: only records that differ from the previous run are rewritten
     print("Saving new state ...")
-    new_state = {
-        "current_stargazers": current_stargazers,
-        "mutual_stars": mutual_stars,
-        "unstargazers": unstargazers,
-        "reciprocity": reciprocity,
-    }
-    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATE_PATH, "w") as f:
-        json.dump(new_state, f, indent=2)
-    print(f"Saved user-level stargazer state to {STATE_PATH}")
+    with client.phase("save-state"):
+        with store.transaction():
+            store.set("current_stargazers", current_stargazers)
+            store.set("unstargazers", unstargazers)
+            store.set("pending_reciprocity", pending)
+            updated = store.section("reciprocity").replace(reciprocity)
+            store.section("stargazer_sync").replace(snapshot.marks)
+            store.section("repo_stargazers").replace(repo_stargazers)
+            store.set("stargazer_delta", delta)
+        store.export_json()
+        store.close()
+    metrics.count("reciprocity.changed", updated)
+    print(f"Saved user-level stargazer state to {store.path} ({updated} reciprocity records changed)")
+    client.report()
     print("=== GitGrowBot autotrack.py finished ===")
 
 if __name__ == "__main__":
@@ -2,111 +2,144 @@
 
 import os
 import sys
-import json
-from pathlib import Path
-from github import Github
-from datetime import datetime, timedelta, timezone
+from github import GithubException
+from ghclient import connect, BudgetExhausted
+from actions import Actions
+from executor import WriteExecutor
+import statestore
+import expiry
+from journal import Journal
+import metrics
+from datetime import datetime, timezone
 
 TOKEN = os.getenv("PAT_TOKEN")
 BOT_USER = os.getenv("BOT_USER")
-STATE_PATH = Path(".github/state/stargazer_state.json")
-DAYS_UNTIL_UNSTAR = 4  # Timeout for growth stars
+UNSTAR_WORKERS = max(1, int(os.getenv("UNSTAR_WORKERS", 4)))  # Concurrent growth-star unstars
+UNSTARS_PER_RUN = max(1, int(os.getenv("UNSTARS_PER_RUN", 300)))  # The rest waits in the index
 
 def main():
+    metrics.start("autounstarback")  # Phase timings, API calls and counters of this run
     print("=== GitGrowBot autounstarback.py started ===")
     if not TOKEN:
         print("ERROR: PAT_TOKEN required.", file=sys.stderr)
         sys.exit(1)
-    if not STATE_PATH.exists():
-        print(f"ERROR: {STATE_PATH} not found.", file=sys.stderr)
+    if not statestore.exists():
+        print(f"ERROR: {statestore.DB_PATH} not found.", file=sys.stderr)
         sys.exit(1)
 
-    gh = Github(TOKEN)
+    client = connect(TOKEN)
+    actions = Actions(client, client.gh.get_user())  # One authenticated user for every unstar
     now = datetime.now(timezone.utc)
     now_iso = now.isoformat()
 
-    with open(STATE_PATH) as f:
-        state = json.load(f)
-
-    current_stargazers = set(state.get("current_stargazers", []))
-    growth_starred = state.get("growth_starred", {})
-    reciprocity = state.get("reciprocity", {})
-    unresponsive = state.get("unresponsive", {})
+    with client.phase("load-state"):
+        store = statestore.StateStore()
+        journal = Journal()
+        replayed = journal.replay(store)  # Unstars an interrupted run made but never saved
+        if replayed:
+            print(f"Replayed {replayed} journaled actions from an interrupted run.")
+        # Stargazer logins keep GitHub's casing; growth_starred keys are lowercase corpus names
+        current_stargazers = {u.lower() for u in store.get("current_stargazers", [])}
+        # Sections are read and written per user; each user's changes commit together
+        growth_starred = store.section("growth_starred")
+        reciprocity = store.section("reciprocity")
 
     changed = False
 
     # 1. GROWTH USERS: unstar after timeout if no reciprocation, move to unresponsive with timestamp
-    for user in list(growth_starred.keys()):
-        # If user is still a stargazer, skip (wait for reciprocation)
-        if user in current_stargazers:
-            continue
-        for entry in list(growth_starred[user]):
-            repo_name = entry["repo"]
-            starred_at = entry.get("starred_at")
-            do_unstar = False
-            if not starred_at:
-                do_unstar = True  # legacy entries
-            else:
-                try:
-                    starred_dt = datetime.fromisoformat(starred_at.replace("Z", "+00:00"))
-                    if now - starred_dt > timedelta(days=DAYS_UNTIL_UNSTAR):
-                        do_unstar = True
-                except Exception:
-                    do_unstar = True  # treat bad timestamp as expired
+    indexed = expiry.ensure(store)
+    if indexed:
+        print(f"Indexed {indexed} existing growth stars by expiry.")
+    expired = []  # (user, repo) due for unstarring
+    with store.transaction():
+        for day, user, repo_name in expiry.due(store, now):  # Only today's and overdue buckets are read
+            entry = next((e for e in growth_starred.get(user, []) if e.get("repo") == repo_name), None)
+            if entry is None:
+                expiry.remove(store, user, repo_name, day)  # Star already resolved, stale index entry
+                metrics.count("growth.stale-index")
+                continue
+            if expiry.expires_at(entry.get("starred_at")) > now:
+                continue  # Later today, next run
+            if user in current_stargazers:
+                # Reciprocating for now: look again one timeout later instead of every run
+                expiry.remove(store, user, repo_name, day)
+                expiry.add(store, user, repo_name, expiry.expires_at(now_iso))
+                metrics.count("growth.reciprocating")
+                continue
+            expired.append((user, repo_name))
+    print(f"[growth timeout] {len(expired)} growth stars due")
+    metrics.count("growth.due", len(expired))
 
-            if do_unstar:
-                try:
-                    repo = gh.get_repo(repo_name)
-                    gh.get_user().remove_from_starred(repo)
-                    print(f"[growth timeout] Unstarred {repo_name} for {user} (no reciprocation)")
-                except Exception as e:
-                    print(f"  Warning: could not unstar {repo_name}: {e}")
-                # Log to unresponsive with timestamp
-                entry["unstarred_at"] = now_iso
-                unresponsive.setdefault(user, []).append(entry)
-                growth_starred[user].remove(entry)
-                changed = True
+    def unstar(item):
+        user, repo_name = item
+        try:
+            actions.unstar(repo_name)  # Unstar by name, no repo GET
+            print(f"[growth timeout] Unstarred {repo_name} for {user} (no reciprocation)")
+        except GithubException as e:
+            if getattr(e, "status", None) != 404:
+                raise
+            print(f"  Warning: could not unstar {repo_name}: {e}")  # Repo gone, nothing left to undo
+        journal.record("growth_unstar", user, repo_name, at=now_iso)
 
-        # Clean up empty users
-        if not growth_starred[user]:
-            del growth_starred[user]
+    with client.phase("growth-timeout"):
+        result = WriteExecutor(client, workers=UNSTAR_WORKERS, cap=UNSTARS_PER_RUN).run(expired, unstar)
+        metrics.count("growth.failed", len(result.failed))
+        metrics.count("growth.deferred", len(result.remaining))
+    # Journal replay moves finished ones to unresponsive (and out of the index) in one transaction
+    if result.done:
+        journal.replay(store)
+        changed = True
+    if result.remaining:
+        print(f"[growth timeout] {len(result.remaining)} unstars deferred to the next run")
 
     # 2. RECIPROCITY: Keep starred_back <= starred_by
-    for user, rec in reciprocity.items():
-        starred_by = rec.get("starred_by", [])
-        starred_back = rec.get("starred_back", [])
-        excess = len(starred_back) - len(starred_by)
-        # Only unstar if excess stars
-        if excess > 0:
-            for i in range(excess):
-                repo_name = starred_back.pop()
-                try:
-                    repo = gh.get_repo(repo_name)
-                    gh.get_user().remove_from_starred(repo)
-                    print(f"[over-recip] Unstarred {repo_name} for {user}")
-                except Exception as e:
-                    print(f"  Warning: could not unstar {repo_name}: {e}")
-                changed = True
-            rec["starred_back"] = starred_back
-            rec["last_reciprocity_update"] = now_iso
+    try:
+        with client.phase("over-reciprocity"):
+            for user, rec in reciprocity.items():
+                before = dict(rec)
+                starred_by = rec.get("starred_by", [])
+                starred_back = list(rec.get("starred_back", []))
+                excess = len(starred_back) - len(starred_by)
+                # Only unstar if excess stars
+                if excess > 0:
+                    for i in range(excess):
+                        repo_name = starred_back.pop()
+                        try:
+                            actions.unstar(repo_name)
+                            print(f"[over-recip] Unstarred {repo_name} for {user}")
+                        except BudgetExhausted:
+                            starred_back.append(repo_name)  # Still starred, retry next run
+                            rec["starred_back"] = starred_back
+                            reciprocity.put(user, rec)
+                            raise
+                        except Exception as e:
+                            print(f"  Warning: could not unstar {repo_name}: {e}")
+                        journal.record("unstar_back", user, repo_name, at=now_iso)
+                        changed = True
+                    rec["starred_back"] = starred_back
+                    rec["last_reciprocity_update"] = now_iso
 
-        # If cannot achieve parity due to lack of repos, record timestamp
-        if len(starred_by) > len(starred_back):
-            # User may not have enough public repos to restore balance
-            rec["last_unbalanced_attempt"] = now_iso
-            changed = True
+                # If cannot achieve parity due to lack of repos, record timestamp
+                if len(starred_by) > len(starred_back):
+                    # User may not have enough public repos to restore balance
+                    rec["last_unbalanced_attempt"] = now_iso
+                    changed = True
+                if rec != before:
+                    reciprocity.put(user, rec)
+    except BudgetExhausted as e:
+        print(f"[over-recip] Rate budget exhausted, deferring the rest to next run: {e}")
 
-    # Save JSON if changed
+    # Records were saved as they changed; refresh the JSON export if anything did
     if changed:
-        state["growth_starred"] = growth_starred
-        state["unresponsive"] = unresponsive
-        state["reciprocity"] = reciprocity
-        with open(STATE_PATH, "w") as f:
-            json.dump(state, f, indent=2)
-        print("Updated state written to", STATE_PATH)
+        store.export_json()
+        print("Updated state written to", store.path)
     else:
         print("No changes to state.")
+    journal.replay(store)  # Compact: everything is in the store now
+    journal.close()
+    store.close()
 
+    client.report()
     print("=== GitGrowBot autounstarback.py finished ===")
 
 if __name__ == "__main__":
@@ -1,10 +1,154 @@
 # cleaner.py
 #!/usr/bin/env python3
+# Deduplicates config/usernames.txt (case-insensitive, first occurrence and its casing win)
+# and drops usernames integrity.py has logged as missing (logs/integrity/*missing-*.txt)
+# within the last MISSING_TTL, the same window the user cache trusts a missing verdict for.
+#
+# The file is never loaded whole: lines are spilled in sorted runs of CLEANER_CHUNK_LINES
+# to a temp directory and merged back (external merge sort), once by login to find the
+# duplicates and, unless --sorted is given, once by line number to restore the original
+# order. Peak memory is bounded by the chunk size however long the list grows. The result replaces the
+# file atomically, and only if something was removed; with --dry-run it never does.
+
+import os
+import re
 import sys
+import heapq
+import argparse
+import tempfile
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+
+import metrics
+from usercache import MISSING_TTL
+
+CHUNK_LINES = int(os.getenv("CLEANER_CHUNK_LINES", 200000))
+
+
+def _records(path):
+    """(line number, username) for every non-blank line."""
+    with path.open(encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            name = line.strip()
+            if name:
+                yield index, name
+
+
+def _spill(records, key, tmpdir):
+    records.sort(key=key)
+    fd, run = tempfile.mkstemp(dir=tmpdir, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(f"{index}\t{name}\n" for index, name in records)
+    return run
+
+
+def _read_run(run):
+    with open(run, encoding="utf-8") as f:
+        for line in f:
+            index, name = line.rstrip("\n").split("\t", 1)
+            yield int(index), name
+
+
+def external_sort(records, key, tmpdir, chunk=CHUNK_LINES):
+    """Yield (index, name) `records` ordered by `key`, holding at most `chunk` of them in memory."""
+    runs, buf = [], []
+    for record in records:
+        buf.append(record)
+        if len(buf) >= chunk:
+            runs.append(_spill(buf, key, tmpdir))
+            buf = []
+    if not runs:
+        yield from sorted(buf, key=key)  # Small file: no need to touch the disk
+        return
+    if buf:
+        runs.append(_spill(buf, key, tmpdir))
+    del buf
+    yield from heapq.merge(*(_read_run(run) for run in runs), key=key)
+
+
+def _by_login(record):
+    return record[1].lower(), record[0]
+
+
+def _by_line(record):
+    return record[0]
+
+
+def load_missing(log_dir, now=None, window=MISSING_TTL):
+    """
+    Lowercase usernames listed in integrity.py's missing-* logs written within `window`.
+    Older verdicts are stale: the login may have been re-registered since.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - window
+    missing = set()
+    for log in Path(log_dir).glob("*missing-*.txt"):
+        stamp = re.search(r"missing-(\d{14})", log.name)  # UTC %Y%m%d%H%M%S of the run
+        if not stamp or datetime.strptime(stamp[1], "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc) < cutoff:
+            continue
+        with log.open(encoding="utf-8") as f:
+            missing.update(ln.strip().lower() for ln in f if ln.strip())
+    return missing
+
+
+def clean(username_path, missing=(), keep_order=True, duplicates_log=None, chunk=CHUNK_LINES, dry_run=False):
+    """
+    Rewrite `username_path` without duplicates and `missing` logins (only count them on a
+    dry run). Returns (kept, duplicates, missing_dropped); duplicates are written to `duplicates_log`.
+    """
+    username_path = Path(username_path)
+    stats = {"kept": 0, "duplicates": 0, "missing": 0}
+    dup_file = None
+    tmp = username_path.with_name(username_path.name + ".tmp")
+    try:
+        with tempfile.TemporaryDirectory(prefix="cleaner-") as tmpdir:
+
+            def unique():
+                nonlocal dup_file
+                previous = None
+                for index, name in external_sort(_records(username_path), _by_login, tmpdir, chunk):
+                    lower = name.lower()
+                    if lower == previous:
+                        stats["duplicates"] += 1
+                        if duplicates_log:
+                            if dup_file is None:
+                                dup_file = open(duplicates_log, "w", encoding="utf-8")
+                            dup_file.write(name + "\n")
+                        continue
+                    previous = lower
+                    if lower in missing:
+                        stats["missing"] += 1
+                        continue
+                    yield index, name
+
+            kept = external_sort(unique(), _by_line, tmpdir, chunk) if keep_order else unique()
+            with tmp.open("w", encoding="utf-8") as out:
+                for _, name in kept:
+                    out.write(name + "\n")
+                    stats["kept"] += 1
+    finally:
+        if dup_file is not None:
+            dup_file.close()
+
+    if not dry_run and (stats["duplicates"] or stats["missing"] or not keep_order):
+        os.replace(tmp, username_path)
+    else:
+        tmp.unlink()  # Nothing removed: leave the file (and its mtime) alone
+    return stats["kept"], stats["duplicates"], stats["missing"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate config/usernames.txt")
+    parser.add_argument("--sorted", action="store_true",
+                        help="write usernames in sorted order instead of keeping their original order")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="don't drop usernames integrity.py logged as missing")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES,
+                        help="lines held in memory per sorted run")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would be removed without rewriting usernames.txt")
+    args = parser.parse_args(argv)
+    run = metrics.start("cleaner")
 
-def main():
     base_dir      = Path(__file__).parent.parent
     username_path = base_dir / "config" / "usernames.txt"
     log_dir       = base_dir / "logs" / "cleaner"
@@ -13,35 +157,28 @@ def main():
     if not username_path.exists():
         sys.exit(f"Error: usernames file not found at {username_path}")
 
-    # Read all lines, strip and ignore blanks
-    lines    = [l.strip() for l in username_path.read_text().splitlines() if l.strip()]
-    seen     = set()
-    unique   = []
-    duplicates = []
-
-    # Identify duplicates (case-insensitive)
-    for name in lines:
-        lower = name.lower()
-        if lower in seen:
-            duplicates.append(name)
-        else:
-            seen.add(lower)
-            unique.append(name)
+    with run.phase("load-missing"):
+        missing = set() if args.keep_missing else load_missing(base_dir / "logs" / "integrity")
+    ts       = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    dup_file = log_dir / f"duplicates-{ts}.txt"
+    with run.phase("clean"):
+        kept, duplicates, dropped = clean(
+            username_path, missing, keep_order=not args.sorted,
+            duplicates_log=dup_file, chunk=max(1, args.chunk_lines), dry_run=args.dry_run,
+        )
+        run.count("usernames.kept", kept)
+        run.count("usernames.duplicates", duplicates)
+        run.count("usernames.missing", dropped)
 
+    removed = "Would remove" if args.dry_run else "Removed"
     if duplicates:
-        # Log duplicates
-        ts        = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        dup_file  = log_dir / f"duplicates-{ts}.txt"
-        with dup_file.open("w") as f:
-            for d in duplicates:
-                f.write(d + "\n")
-        print(f"[INFO] Logged {len(duplicates)} duplicates to {dup_file}")
-
-        # Rewrite usernames.txt without the extras
-        username_path.write_text("\n".join(unique) + "\n")
-        print(f"[INFO] Removed {len(duplicates)} duplicates; {len(unique)} remain.")
+        print(f"[INFO] Logged {duplicates} duplicates to {dup_file}")
+        print(f"[INFO] {removed} {duplicates} duplicates; {kept} remain.")
     else:
         print("[INFO] No duplicates found.")
+    if dropped:
+        print(f"[INFO] {removed} {dropped} usernames logged as missing by integrity.py.")
+    run.emit()
 
 if __name__ == "__main__":
     main()
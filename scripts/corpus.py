@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# corpus.py
+# Compiled, memory-mapped form of config/usernames.txt for the scripts that draw candidates
+# from it (gitgrow.py, autostargrow.py). The text file stays the editable source of truth;
+# the compiled file next to it is rebuilt automatically whenever the text file changes.
+#
+# Layout (little-endian):
+#   header   MAGIC, source size, source mtime_ns, entry count      (struct HEADER)
+#   offsets  count + 1 uint64 byte offsets into the data section
+#   data     lowercase UTF-8 logins, sorted and deduplicated, no separators
+# Entry i is data[offsets[i]:offsets[i+1]], so lookups touch only the pages they need:
+# membership is a binary search (O(log n)), random access and sampling are O(1) per entry,
+# and nothing is materialised up front however long the list grows.
+
+import os
+import mmap
+import random
+import struct
+from pathlib import Path
+
+from sampler import sparse_permutation
+
+MAGIC = b"GGCORP01"
+HEADER = struct.Struct("<8sQQQ")
+OFFSET = struct.Struct("<Q")
+
+
+def compiled_path(source):
+    """Where the compiled corpus of `source` lives, overridable with USERNAME_CORPUS_PATH."""
+    return Path(os.getenv("USERNAME_CORPUS_PATH") or Path(source).with_suffix(".corpus"))
+
+
+def compile_corpus(source, target=None):
+    """Build the compiled corpus from a one-login-per-line text file; returns the entry count."""
+    source = Path(source)
+    target = Path(target) if target else compiled_path(source)
+    stat = source.stat()
+    with source.open(encoding="utf-8") as f:
+        logins = sorted({ln.strip().lower().encode("utf-8") for ln in f if ln.strip()})
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, len(logins)))
+        offset = 0
+        for login in logins:
+            f.write(OFFSET.pack(offset))
+            offset += len(login)
+        f.write(OFFSET.pack(offset))
+        for login in logins:
+            f.write(login)
+    os.replace(tmp, target)
+    return len(logins)
+
+
+def _is_current(source, target):
+    try:
+        with target.open("rb") as f:
+            magic, size, mtime_ns, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+    stat = source.stat()
+    return magic == MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+
+def load_corpus(source):
+    """Open the compiled corpus of `source`, (re)building it first if it is missing or stale."""
+    source = Path(source)
+    target = compiled_path(source)
+    if not _is_current(source, target):
+        count = compile_corpus(source, target)
+        print(f"[CORPUS] Compiled {count} usernames from {source} → {target}")
+    return Corpus(target)
+
+
+class Corpus:
+    """Read-only view of a compiled corpus: len(), corpus[i], `login in corpus`, iteration."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, _, self._count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled username corpus")
+        self._data = HEADER.size + OFFSET.size * (self._count + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _raw(self, i):
+        start, end = struct.unpack_from("<QQ", self._mm, HEADER.size + OFFSET.size * i)
+        return self._mm[self._data + start:self._data + end]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._raw(i).decode("utf-8")
+
+    def bisect(self, login):
+        """Index of the first entry sorting after `login` (resume point after it)."""
+        key = login.strip().lower().encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, login):
+        i = self.bisect(login)
+        return i > 0 and self._raw(i - 1) == login.strip().lower().encode("utf-8")
+
+    def __iter__(self):
+        """Stream entries in sorted order."""
+        for i in range(self._count):
+            yield self._raw(i).decode("utf-8")
+
+    def sample(self, k, rng=random):
+        """k distinct entries chosen uniformly at random."""
+        return [self[i] for i in rng.sample(range(self._count), min(k, self._count))]
+
+    def shuffled(self, rng=random):
+        """All entries in random order, decoded one at a time as the caller consumes them."""
+        for i in sparse_permutation(self._count, rng):
+            yield self[i]
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# executor.py
+# Runs one mutation per item (unfollow, star, ...) on a small worker pool.
+# Every call still goes through client.write(), which paces mutations and retries
+# secondary-limit responses; on top of that the executor
+#   - keeps at most `workers` calls in flight so request latency overlaps,
+#   - backs off adaptively: each throttled call doubles the client's write interval,
+#     and a streak of clean calls halves it again, down to the configured value,
+#   - stops after `cap` items or when the API budget is exhausted, returning what is left
+#     so the caller can persist it for the next run.
+
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from github import GithubException
+from ghclient import BudgetExhausted
+
+MAX_INTERVAL = 60.0  # Upper bound for the backed-off write interval (seconds)
+CALM_STREAK  = 20    # Clean calls before the interval is relaxed again
+
+# done/failed: items the action completed / raised a GithubException for
+# remaining: items not attempted (cap reached, budget exhausted), in their original order
+Result = namedtuple("Result", "done failed remaining")
+
+
+class WriteExecutor:
+    def __init__(self, client, workers=4, cap=None):
+        self.client = client
+        self.workers = max(1, workers)
+        self.cap = cap
+        self._base_interval = client.write_interval
+        self._seen_retries = client.retries
+        self._calm = 0
+        self._lock = threading.Lock()
+
+    def _adapt(self):
+        """Called after each call: slow down if the client had to retry, speed up when calm."""
+        with self._lock:
+            client = self.client
+            if client.retries > self._seen_retries:
+                self._seen_retries = client.retries
+                self._calm = 0
+                client.write_interval = min(max(client.write_interval * 2, 1.0), MAX_INTERVAL)
+                print(f"[RATE] throttled, spacing writes {client.write_interval:.1f}s apart")
+                return
+            self._calm += 1
+            if self._calm >= CALM_STREAK and client.write_interval > self._base_interval:
+                self._calm = 0
+                client.write_interval = max(client.write_interval / 2, self._base_interval)
+
+    def run(self, items, action):
+        """
+        Call action(item) for each item; action performs its own client.write(...).
+        Stops submitting on BudgetExhausted and returns a Result.
+        """
+        items = list(items)
+        budget = items if self.cap is None else items[:self.cap]
+        done, failed, deferred = [], [], []
+        stop = threading.Event()
+
+        def call(item):
+            if stop.is_set():
+                deferred.append(item)
+                return
+            try:
+                action(item)
+                done.append(item)
+            except BudgetExhausted as e:
+                if not stop.is_set():
+                    print(f"[RATE] stopping early, the rest is kept for the next run: {e}")
+                stop.set()
+                deferred.append(item)
+            except GithubException as e:
+                print(f"[ERROR] {item}: {e}")
+                failed.append(item)
+            finally:
+                self._adapt()
+
+        submitted = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = set()
+            for item in budget:
+                if stop.is_set():
+                    break
+                in_flight.add(pool.submit(call, item))
+                submitted += 1
+                if len(in_flight) >= self.workers:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            wait(in_flight)
+
+        order = {item: i for i, item in enumerate(items)}
+        remaining = sorted(deferred, key=order.get) + items[submitted:]
+        return Result(done, failed, remaining)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# expiry.py
+# Expiry index for growth stars (autostargrow.py stars a repo of a candidate; after
+# DAYS_UNTIL_UNSTAR without a star back autounstarback.py takes it back).
+# growth_starred holds the stars per user; the growth_expiry section of the state store
+# indexes them by the UTC day they expire: {"YYYY-MM-DD": [[user, repo], ...]}. The sweeper
+# reads only the buckets up to today (a range query on the state table's primary key) instead
+# of walking and re-parsing every growth star on every run.
+#
+# The index is maintained next to growth_starred by autostargrow.py and by journal replay,
+# and rebuilt from growth_starred when missing (state from before it existed).
+
+from datetime import datetime, timedelta, timezone
+
+DAYS_UNTIL_UNSTAR = 4  # Timeout for growth stars
+INDEX = "growth_expiry"
+
+
+def expires_at(starred_at):
+    """When a growth star starred at `starred_at` (ISO string) times out; legacy/bad values are due now."""
+    try:
+        starred = datetime.fromisoformat(starred_at.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if starred.tzinfo is None:
+        starred = starred.replace(tzinfo=timezone.utc)
+    return starred + timedelta(days=DAYS_UNTIL_UNSTAR)
+
+
+def bucket(when):
+    """Index key of the UTC day `when` falls on."""
+    return when.astimezone(timezone.utc).date().isoformat() if when.year > 1 else "0001-01-01"
+
+
+def add(store, user, repo, due):
+    """Index `user`'s growth star on `repo` as expiring at `due` (datetime); idempotent."""
+    index = store.section(INDEX)
+    day = bucket(due)
+    pairs = index.get(day, [])
+    if [user, repo] not in pairs:
+        pairs.append([user, repo])
+        index.put(day, pairs)
+
+
+def remove(store, user, repo, day):
+    """Drop `user`'s growth star on `repo` from the bucket `day`."""
+    index = store.section(INDEX)
+    pairs = [p for p in index.get(day, []) if p != [user, repo]]
+    if pairs:
+        index.put(day, pairs)
+    else:
+        index.delete(day)
+
+
+def due(store, now):
+    """[(day, user, repo)] indexed to expire up to the end of `now`'s UTC day, earliest first."""
+    return [
+        (day, user, repo)
+        for day, pairs in store.section(INDEX).items_until(bucket(now))
+        for user, repo in pairs
+    ]
+
+
+def ensure(store):
+    """Build the index from growth_starred if it doesn't exist yet; returns the entries indexed."""
+    if len(store.section(INDEX)) or not len(store.section("growth_starred")):
+        return 0
+    count = 0
+    with store.transaction():
+        for user, entries in store.section("growth_starred").items():
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get("repo"):
+                    add(store, user, entry["repo"], expires_at(entry.get("starred_at")))
+                    count += 1
+    return count
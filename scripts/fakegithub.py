@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# fakegithub.py
+# Local stand-in for the parts of the GitHub REST API the scripts use, for dry runs,
+# tests and benchmarks without touching a real account. Point any script at it with
+#
+#   python scripts/fakegithub.py --port 8765 --followers 100000 --stargazers 20000 &
+#   GITHUB_API_URL=http://127.0.0.1:8765 PAT_TOKEN=x BOT_USER=bot python scripts/gitgrow.py --dry-run
+#
+# The world is either loaded from a JSON fixture (--fixture, same shape as World.to_dict())
+# or generated (--followers/--following/--stargazers): a bot account, its followers and
+# following, owned repos with dated stargazers and starred repos. Any other login exists
+# with a deterministic synthetic profile, events and repos unless listed as missing, so
+# candidate lists of any size resolve without being spelled out.
+#
+# Responses carry Link pagination, ETags (If-None-Match answers 304 without spending
+# budget) and X-RateLimit-* headers from a per-hour budget (--rate-limit); an exhausted
+# budget answers 403 like GitHub. --latency adds a delay to every request. Of GraphQL only
+# the aliased repositoryOwner lookups of resolver.py are simulated; any other query answers
+# with an error, which the scripts treat like a GraphQL outage and fall back to REST.
+
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+
+from metrics import endpoint
+
+PER_PAGE_MAX = 100
+OWNER_ALIAS = re.compile(r"(\w+): repositoryOwner\(login: \$(\w+)\)")
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class World:
+    """Accounts, follows and stars the fake server answers from; mutations change it in place."""
+
+    def __init__(self, me="bot", followers=(), following=(), repos=None, starred=(), missing=(), users=None,
+                 now=None):
+        self.me = me
+        self.followers = list(followers)
+        self.following = dict.fromkeys(following)      # Ordered set
+        self.repos = {name: list(stars) for name, stars in (repos or {}).items()}  # name -> [[login, starred_at]]
+        self.starred = dict.fromkeys(starred)
+        self.missing = {m.lower() for m in missing}
+        self.users = dict(users or {})                 # login -> profile overrides (events, repos, ...)
+        self.now = now or datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def synthetic(cls, followers=1000, following=1000, stargazers=1000, repos=3, missing_every=50, seed=0):
+        """Generated world: user000000... follow the bot, overlap with who it follows, star its repos."""
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        population = max(followers, following, stargazers)
+        logins = [f"user{i:06d}" for i in range(population)]
+        stars = {}
+        for r in range(repos):
+            chosen = sorted(rng.sample(range(population), min(stargazers, population)))
+            stars[f"bot/repo{r}"] = [
+                [logins[i], _iso(now - timedelta(minutes=len(chosen) - n))] for n, i in enumerate(chosen)
+            ]
+        missing = [f"gone{i:06d}" for i in range(0, population, missing_every)] if missing_every else []
+        return cls("bot", logins[:followers], logins[population - following:], stars, missing=missing, now=now)
+
+    @classmethod
+    def from_fixture(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get("me", "bot"), data.get("followers", ()), data.get("following", ()),
+                   data.get("repos"), data.get("starred", ()), data.get("missing", ()), data.get("users"))
+
+    def to_dict(self):
+        return {"me": self.me, "followers": self.followers, "following": list(self.following),
+                "repos": self.repos, "starred": list(self.starred), "missing": sorted(self.missing),
+                "users": self.users}
+
+    # — synthetic accounts —
+
+    def _seed(self, login):
+        return zlib.crc32(login.lower().encode())
+
+    def exists(self, login):
+        return login.lower() == self.me.lower() or login.lower() not in self.missing
+
+    def user(self, login, base):
+        seed = self._seed(login)
+        profile = {
+            "login": login, "id": seed, "type": "User", "url": f"{base}/users/{login}",
+            "followers": seed % 500, "following": (seed // 500) % 700, "public_repos": seed % 5,
+            "updated_at": _iso(self.now - timedelta(days=seed % 30)),
+        }
+        profile.update({k: v for k, v in self.users.get(login, {}).items() if k not in ("events", "repos")})
+        return profile
+
+    def events(self, login):
+        if "events" in self.users.get(login, {}):
+            return self.users[login]["events"]
+        seed = self._seed(login)
+        if seed % 4 == 0:
+            return []  # A quarter of the synthetic accounts never did anything public
+        at = self.now - timedelta(days=seed % 60)
+        return [{"id": str(seed), "type": "PushEvent", "created_at": _iso(at), "actor": {"login": login}}]
+
+    def user_repos(self, login, base):
+        if login.lower() == self.me.lower():
+            return [self.repo(name, base) for name in self.repos]
+        names = self.users.get(login, {}).get("repos")
+        if names is None:
+            names = [f"{login}/project{i}" for i in range(self._seed(login) % 5)]
+        return [self.repo(name, base) for name in names]
+
+    def repo(self, full_name, base):
+        owner, name = full_name.split("/", 1)
+        events = self.events(owner)  # Last push matches the owner's activity
+        pushed_at = events[0]["created_at"] if events else _iso(self.now - timedelta(days=365))
+        return {
+            "id": self._seed(full_name), "name": name, "full_name": full_name, "fork": False, "private": False,
+            "owner": {"login": owner, "type": "User", "url": f"{base}/users/{owner}"},
+            "stargazers_count": len(self.repos.get(full_name, ())), "url": f"{base}/repos/{full_name}",
+            "pushed_at": pushed_at, "updated_at": pushed_at,
+        }
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, world, port=0, latency=0.0, rate_limit=5000):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.world = world
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset = int(time.time()) + 3600
+        self.requests = 0
+        self.mutations = 0
+        self.calls = Counter()   # endpoint() -> requests, including rate-limited ones
+        self.budget_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def spend(self):
+        """Take one request from the hourly budget; False when it's exhausted."""
+        with self.budget_lock:
+            self.requests += 1
+            if time.time() >= self.reset:
+                self.remaining, self.reset = self.rate_limit, int(time.time()) + 3600
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def refund(self):
+        with self.budget_lock:
+            self.remaining = min(self.remaining + 1, self.rate_limit)
+
+
+def serve(world, port=0, latency=0.0, rate_limit=5000):
+    """Start a fake server on a background thread; returns it (server.url, server.shutdown())."""
+    server = FakeGitHub(world, port, latency, rate_limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeGitHub
+
+    def log_message(self, *args):
+        pass
+
+    # — plumbing —
+
+    def _base(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def _send(self, status, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        headers = dict(headers or {})
+        self.send_response(status)
+        server = self.server
+        self.send_header("X-RateLimit-Limit", str(server.rate_limit))
+        self.send_header("X-RateLimit-Remaining", str(server.remaining))
+        self.send_header("X-RateLimit-Reset", str(server.reset))
+        self.send_header("X-RateLimit-Resource", headers.pop("X-RateLimit-Resource", "core"))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _page(self, items, query):
+        """One page of `items` with GitHub's Link header; ETag/304 for unchanged pages."""
+        per_page = min(int(query.get("per_page", ["30"])[0]), PER_PAGE_MAX)
+        page = max(int(query.get("page", ["1"])[0]), 1)
+        last = max((len(items) + per_page - 1) // per_page, 1)
+        body = items[(page - 1) * per_page:page * per_page]
+        path = urlsplit(self.path).path
+        links = []
+        def link(p, rel):
+            links.append(f'<{self._base()}{path}?per_page={per_page}&page={p}>; rel="{rel}"')
+        if page < last:
+            link(page + 1, "next")
+            link(last, "last")
+        if page > 1:
+            link(1, "first")
+            link(page - 1, "prev")
+        etag = '"%s"' % hashlib.md5(json.dumps(body).encode()).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        headers = {"ETag": etag}
+        if links:
+            headers["Link"] = ", ".join(links)
+        return 200, body, headers
+
+    def _route(self, verb):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = json.loads(self.rfile.read(length) or b"null") if length else None
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        world = self.server.world
+        base = self._base()
+        path = parts.path.rstrip("/")
+        if path.startswith("/api/v3"):
+            path = path[len("/api/v3"):]
+
+        with self.server.budget_lock:
+            self.server.calls[endpoint(verb, path)] += 1
+        if not self.server.spend():
+            return 403, {"message": "API rate limit exceeded"}, {}
+        with world.lock:
+            status, body, headers = self._answer(verb, path, query, world, base)
+        if status == 304:
+            self.server.refund()
+        return status, body, headers
+
+    def _answer(self, verb, path, query, world, base):
+        me = world.me
+        users = lambda logins: [{"login": l, "type": "User", "url": f"{base}/users/{l}"} for l in logins]
+
+        if verb == "POST" and path.endswith("/graphql"):
+            return 200, self._graphql(world, base), {"X-RateLimit-Resource": "graphql"}
+
+        if path == "/user" or path == f"/users/{me}":
+            return 200, world.user(me, base), {}
+        if path in ("/user/followers", f"/users/{me}/followers"):
+            return self._page(users(world.followers), query)
+        if path in ("/user/following", f"/users/{me}/following"):
+            return self._page(users(list(world.following)), query)
+        if path == "/user/repos":
+            return self._page(world.user_repos(me, base), query)
+        if path == "/user/starred" and verb == "GET":
+            return self._page([world.repo(n, base) for n in world.starred], query)
+
+        m = re.fullmatch(r"/user/following/([^/]+)", path)
+        if m and verb in ("PUT", "DELETE"):
+            login = m.group(1)
+            if not world.exists(login):
+                return 404, {"message": "Not Found"}, {}
+            self.server.mutations += 1
+            if verb == "PUT":
+                world.following[login] = None
+            else:
+                world.following.pop(login, None)
+            return 204, None, {}
+
+        m = re.fullmatch(r"/user/starred/([^/]+/[^/]+)", path)
+        if m and verb in ("PUT", "DELETE"):
+            self.server.mutations += 1
+            if verb == "PUT":
+                world.starred[m.group(1)] = None
+            else:
+                world.starred.pop(m.group(1), None)
+            return 204, None, {}
+
+        m = re.fullmatch(r"/users/([^/]+)/starred", path)
+        if m and verb == "GET":
+            names = world.starred if m.group(1).lower() == me.lower() else ()
+            return self._page([world.repo(n, base) for n in names], query)
+
+        m = re.fullmatch(r"/users/([^/]+)(/events(?:/public)?|/repos)?", path)
+        if m and verb == "GET":
+            login, sub = m.groups()
+            if not world.exists(login):
+                return 404, {"message": "Not Found"}, {}
+            if sub is None:
+                return 200, world.user(login, base), {}
+            if sub == "/repos":
+                return self._page(world.user_repos(login, base), query)
+            return self._page(world.events(login), query)
+
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)(/stargazers)?", path)
+        if m and verb == "GET":
+            full_name, sub = m.groups()
+            if sub is None:
+                return 200, world.repo(full_name, base), {}
+            stars = world.repos.get(full_name, [])
+            if "star+json" in (self.headers.get("Accept") or ""):
+                items = [{"starred_at": at, "user": users([login])[0]} for login, at in stars]
+            else:
+                items = users([login for login, _ in stars])
+            return self._page(items, query)
+
+        return 404, {"message": f"Not simulated: {verb} {path}"}, {}
+
+    def _graphql(self, world, base):
+        """Answer resolver.py's `uN: repositoryOwner(login: $lN) { ... }` batches."""
+        query = (self.body or {}).get("query") or ""
+        variables = (self.body or {}).get("variables") or {}
+        aliases = OWNER_ALIAS.findall(query)
+        if not aliases:
+            return {"errors": [{"message": "Only repositoryOwner lookups are simulated by fakegithub"}]}
+        data, errors = {}, []
+        for alias, var in aliases:
+            login = variables.get(var, "")
+            if not world.exists(login):
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias],
+                               "message": f"Could not resolve to a RepositoryOwner with the login of '{login}'."})
+                continue
+            profile = world.user(login, base)
+            node = {"login": login, "__typename": profile["type"]}
+            if "repositories(" in query:
+                repos = world.user_repos(login, base)[:int(variables.get("repos") or 0)]
+                node["repositories"] = {"nodes": [{"nameWithOwner": r["full_name"], "pushedAt": r["pushed_at"]}
+                                                  for r in repos]}
+            if "followers {" in query:
+                node["followers"] = {"totalCount": profile["followers"]}
+                node["following"] = {"totalCount": profile["following"]}
+            if "contributionsCollection" in query:
+                since = variables.get("since") or ""
+                days = [{"date": e["created_at"][:10], "contributionCount": 1}
+                        for e in world.events(login) if e["created_at"] >= since[:19]]
+                node["contributionsCollection"] = {"contributionCalendar": {"weeks": [{"contributionDays": days}]}}
+            data[alias] = node
+        return {"data": data, "errors": errors} if errors else {"data": data}
+
+    def _handle(self, verb):
+        status, body, headers = self._route(verb)
+        self._send(status, body, headers)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake GitHub API for dry runs and benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", help="JSON world to serve (default: a synthetic one)")
+    parser.add_argument("--followers", type=int, default=1000)
+    parser.add_argument("--following", type=int, default=1000)
+    parser.add_argument("--stargazers", type=int, default=1000, help="stargazers per bot repo")
+    parser.add_argument("--repos", type=int, default=3, help="bot-owned repos")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests per hour before 403s")
+    args = parser.parse_args(argv)
+
+    if args.fixture:
+        world = World.from_fixture(args.fixture)
+    else:
+        world = World.synthetic(args.followers, args.following, args.stargazers, args.repos)
+    server = FakeGitHub(world, args.port, args.latency, args.rate_limit)
+    print(f"[FAKE] serving {world.me}: {len(world.followers)} followers, {len(world.following)} following, "
+          f"{sum(map(len, world.repos.values()))} stars on {len(world.repos)} repos at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[FAKE] {server.requests} requests, {server.mutations} mutations", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# ghclient.py
+# Rate-limit-aware access to the GitHub API, shared by every entry point.
+# Scripts call connect(token) instead of Github(token) and route their calls through
+# client.read(...) / client.write(...), which
+#   - watch X-RateLimit-Remaining/Reset of every response and sleep (or defer) when a
+#     budget runs low,
+#   - pace mutations (follow/star/unstar) below GitHub's secondary limits,
+#   - retry secondary-limit 403/429 responses after Retry-After,
+#   - count the requests each phase of a run consumed (client.report()),
+#   - record phases, requests by endpoint and status, retries and sleeps in the run's
+#     metrics (metrics.py), emitted by client.report().
+#
+# GITHUB_API_URL points the client at another API root (GitHub Enterprise, or the local
+# stand-in in fakegithub.py). DRY_RUN=1 or --dry-run on the command line makes the run a
+# dry run: reads happen as usual, mutations are only logged and counted (see actions.py).
+
+import os
+import sys
+import json
+import time
+import inspect
+import logging
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import github
+from github import GithubException
+from urllib3.util.retry import Retry
+
+import metrics
+
+RESERVE          = 50        # Stop issuing calls when a budget drops to this many remaining
+MAX_SLEEP        = 15 * 60   # Longest wait for a reset before deferring work to the next run
+WRITES_PER_MINUTE = 80       # GitHub secondary limit on content-creating requests
+WRITES_PER_HOUR  = 500
+MAX_RETRIES      = 3
+
+# PyGithub's own pacing and retries stack on top of the ones here: its default retry sleeps
+# inside the HTTP call until a rate limit resets (past MAX_SLEEP, no BudgetExhausted), and
+# its throttle spaces every request 0.25s and every write 1s, serialising worker threads.
+# Turned off where the installed PyGithub has them; only transient failures are retried.
+PYGITHUB_OPTIONS = {
+    "retry": Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",)),
+    "seconds_between_requests": None,
+    "seconds_between_writes": None,
+}
+
+
+class BudgetExhausted(Exception):
+    """The remaining API budget can't be waited out in this run; stop and defer the rest."""
+
+
+class Unsupported(Exception):
+    """The installed PyGithub lacks the low-level requester this call needs (PyGithub < 2)."""
+
+
+def dry_run_requested(argv=None):
+    """True when DRY_RUN is set (1/true/yes) or --dry-run is on the command line."""
+    argv = sys.argv[1:] if argv is None else argv
+    return os.getenv("DRY_RUN", "").strip().lower() in ("1", "true", "yes") or "--dry-run" in argv
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+class Client:
+    """
+    Wraps a PyGithub `Github` instance (`client.gh`). Budgets are learned passively from
+    the headers of each response PyGithub logs, so wrapped and unwrapped calls
+    (e.g. iterating a PaginatedList) are both accounted for.
+    """
+
+    def __init__(self, gh, dry_run=False, run_metrics=None):
+        self.gh = gh
+        self.metrics = run_metrics or metrics.Metrics()
+        self.dry_run = dry_run   # Mutations are logged and counted, never sent
+        self.write_interval = _env_float("WRITE_INTERVAL", 1.0)  # Seconds between mutations
+        self.budgets = {}        # resource -> (remaining, limit, reset_epoch)
+        self.sleeps = 0.0        # Seconds spent waiting on rate limits
+        self.retries = 0
+        self._phase = "setup"
+        self._phases = {}        # name -> Counter of requests/reads/writes/<resource>
+        self._order = []
+        self.mutations = Counter()  # action -> successful calls (see actions.py)
+        self._writes = deque()   # monotonic timestamps of mutations in the last hour
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._lazy_gh = None
+
+    # — accounting —
+
+    @contextmanager
+    def phase(self, name):
+        """Attribute every request issued inside the block to `name`."""
+        previous, self._phase = self._phase, name
+        try:
+            with self.metrics.phase(name):
+                yield
+        finally:
+            self._phase = previous
+
+    def _counter(self, name):
+        if name not in self._phases:
+            self._phases[name] = Counter()
+            self._order.append(name)
+        return self._phases[name]
+
+    def _observe(self, verb, url, status, headers):
+        """Called for every HTTP request PyGithub performs (see _RequestLog)."""
+        resource = headers.get("x-ratelimit-resource", "core")
+        self.metrics.request(verb, url, status)
+        with self._lock:
+            counter = self._counter(self._phase)
+            counter["requests"] += 1
+            counter["reads" if verb == "GET" else "writes"] += 1
+            counter[resource] += 1
+            if "x-ratelimit-remaining" in headers:
+                self.budgets[resource] = (
+                    int(headers["x-ratelimit-remaining"]),
+                    int(headers.get("x-ratelimit-limit", 0)),
+                    int(headers.get("x-ratelimit-reset", 0)),
+                )
+
+    def count_mutation(self, action):
+        with self._lock:
+            self.mutations[action] += 1
+        self.metrics.count(f"mutations.{action}")
+
+    def report(self, file=None):
+        """
+        Print how many requests each phase consumed and what budget is left, and emit the
+        run's metrics (JSON lines, GitHub step summary; see metrics.py).
+        """
+        out = file or sys.stdout
+        for name in self._order:
+            c = self._phases[name]
+            elapsed = self.metrics.phases.get(name, (0.0,))[0]
+            print(
+                f"[RATE] phase={name} requests={c['requests']} reads={c['reads']} "
+                f"writes={c['writes']} elapsed={elapsed:.1f}s",
+                file=out,
+            )
+        if self.mutations:
+            label = "mutations (dry run, not sent)" if self.dry_run else "mutations"
+            print(f"[RATE] {label}: " + " ".join(f"{a}={n}" for a, n in sorted(self.mutations.items())), file=out)
+        for resource, (remaining, limit, reset) in sorted(self.budgets.items()):
+            print(f"[RATE] budget {resource}: {remaining}/{limit} left, resets at {reset}", file=out)
+        if self.sleeps or self.retries:
+            print(f"[RATE] slept {self.sleeps:.0f}s on rate limits, {self.retries} retries", file=out)
+        self.metrics.emit()
+
+    # — pacing —
+
+    def _sleep(self, seconds):
+        self.sleeps += seconds
+        self.metrics.slept(seconds)
+        time.sleep(seconds)
+
+    def _await_budget(self, resource):
+        budget = self.budgets.get(resource)
+        if not budget or budget[0] > RESERVE:
+            return
+        remaining, _, reset = budget
+        wait = reset - time.time() + 1
+        if wait <= 0:
+            return
+        if wait > MAX_SLEEP:
+            raise BudgetExhausted(f"{resource} budget at {remaining}, resets in {wait:.0f}s")
+        print(f"[RATE] {resource} budget low ({remaining} left), sleeping {wait:.0f}s until reset")
+        self._sleep(wait)
+        with self._lock:
+            self.budgets.pop(resource, None)
+
+    def _pace_write(self):
+        with self._write_lock:
+            now = time.monotonic()
+            while self._writes and now - self._writes[0] >= 3600:
+                self._writes.popleft()
+            if len(self._writes) >= WRITES_PER_HOUR:
+                raise BudgetExhausted(f"{WRITES_PER_HOUR} mutations in the last hour")
+            in_minute = [t for t in self._writes if now - t < 60]
+            wait = 0.0
+            if len(in_minute) >= WRITES_PER_MINUTE:
+                wait = 60 - (now - in_minute[-WRITES_PER_MINUTE])
+            wait = max(wait, self._last_write + self.write_interval - now)
+            if wait > 0:
+                self._sleep(wait)
+            self._last_write = time.monotonic()
+            self._writes.append(self._last_write)
+
+    def _retry_after(self, err, attempt):
+        """Seconds to wait before retrying `err`, or None if it isn't a throttle."""
+        status = getattr(err, "status", None)
+        if status not in (403, 429):
+            return None
+        headers = getattr(err, "headers", None) or {}
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if headers.get("x-ratelimit-remaining") == "0":
+            return max(float(headers.get("x-ratelimit-reset", 0)) - time.time() + 1, 1)
+        if isinstance(err, github.RateLimitExceededException) or "rate limit" in str(err).lower():
+            return 60 * 2 ** attempt  # Secondary limit without a hint: back off exponentially
+        return None  # Plain 403 (blocked, private, ...), not ours to retry
+
+    def _call(self, fn, args, kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except GithubException as e:
+                wait = self._retry_after(e, attempt)
+                if wait is None or attempt == MAX_RETRIES:
+                    raise
+                if wait > MAX_SLEEP:
+                    raise BudgetExhausted(f"rate limited for {wait:.0f}s") from e
+                print(f"[RATE] throttled ({getattr(e, 'status', '?')}), retrying in {wait:.0f}s")
+                self.retries += 1
+                self.metrics.retry()
+                self._sleep(wait)
+
+    # — public call wrappers —
+
+    def read(self, fn, *args, **kwargs):
+        """Run a read call (GET) once the core budget allows it."""
+        self._await_budget("core")
+        return self._call(fn, args, kwargs)
+
+    def write(self, fn, *args, **kwargs):
+        """Run a mutation (PUT/DELETE/POST), paced under the secondary limits."""
+        self._await_budget("core")
+        self._pace_write()
+        return self._call(fn, args, kwargs)
+
+    def lazy_repo(self, full_name):
+        """
+        Repository handle for star/unstar by name without GETting the repo first.
+        Needs PyGithub >= 2 (lazy objects); older versions fall back to a regular fetch.
+        """
+        if not hasattr(self.gh, "withLazy"):
+            return self.read(self.gh.get_repo, full_name)
+        if self._lazy_gh is None:
+            self._lazy_gh = self.gh.withLazy(True)
+        return self._lazy_gh.get_repo(full_name)
+
+    def lazy_user(self, login):
+        """
+        NamedUser handle for follow/unfollow by login without GETting the profile.
+        Needs PyGithub >= 2 (lazy objects); older versions fall back to a regular fetch.
+        """
+        if not hasattr(self.gh, "withLazy"):
+            return self.read(self.gh.get_user, login)
+        return self.gh.get_user(login, lazy=True)
+
+    def conditional_get(self, url, parameters=None, etag=None):
+        """
+        GET `url` with If-None-Match: `etag`; returns (status, etag, data), data None on 304.
+        Unchanged answers (304) don't count against the rate limit.
+        """
+        requester = getattr(self.gh, "requester", None)
+        if requester is None:
+            raise Unsupported("Conditional requests need PyGithub >= 2")
+
+        def get():
+            headers = {"If-None-Match": etag} if etag else {}
+            status, resp_headers, output = requester.requestJson("GET", url, parameters, headers)
+            data = json.loads(output) if output else None
+            if status >= 400:
+                raise requester.createException(status, resp_headers, data)
+            return status, resp_headers.get("etag", etag), data if status != 304 else None
+
+        return self.read(get)
+
+    def graphql(self, query, variables=None):
+        """
+        POST a GraphQL query and return the raw response body ({"data": ..., "errors": [...]}).
+        Partial errors are left for the caller, unlike PyGithub's graphql_query().
+        """
+        requester = getattr(self.gh, "requester", None)
+        if requester is None or not hasattr(requester, "graphql_url"):
+            raise Unsupported("GraphQL queries need PyGithub >= 2")
+        self._await_budget("graphql")
+        _, data = self._call(
+            requester.requestJsonAndCheck,
+            ("POST", requester.graphql_url),
+            {"input": {"query": query, "variables": variables or {}}},
+        )
+        return data
+
+
+class _RequestLog(logging.Handler):
+    """Feeds PyGithub's per-request debug records to the active client."""
+
+    def emit(self, record):
+        client = _active
+        args = record.args
+        if client is None or not isinstance(args, tuple) or len(args) != 9:
+            return
+        verb, _, _, url, _, _, status, headers, _ = args
+        client._observe(verb, url, status, headers or {})
+
+
+_active = None
+_hook = _RequestLog()
+
+
+def connect(token):
+    """Create the shared client for this run (replaces `Github(token)`)."""
+    global _active
+    params = inspect.signature(github.Github.__init__).parameters
+    options = {k: v for k, v in PYGITHUB_OPTIONS.items() if k in params}
+    base_url = os.getenv("GITHUB_API_URL")
+    if base_url:
+        options["base_url"] = base_url.rstrip("/")
+    _active = Client(github.Github(token, **options), dry_run=dry_run_requested(), run_metrics=metrics.active())
+    if _active.dry_run:
+        print("[DRY-RUN] Mutations will be logged, not sent")
+    logger = logging.getLogger("github.Requester")
+    if _hook not in logger.handlers:
+        logger.addHandler(_hook)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False  # Request bodies stay out of any root handlers
+    return _active
@@ -1,93 +1,216 @@
 #!/usr/bin/env python3
 import os
 import sys
-import random
 from pathlib import Path
-from github import Github, GithubException
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from github import GithubException
 from datetime import datetime, timedelta, timezone
+from usercache import UserCache
+from ghclient import connect, BudgetExhausted
+from actions import Actions
+from snapshot import FollowSnapshot
+from corpus import load_corpus
+from sampler import Sampler, sample_rng
+import scoring
+import resolver
+import metrics
+from ledger import FollowLedger
+
+ACTIVE_WINDOW = timedelta(days=30)  # Only follow users with a public event in this window
+QUEUE_DEPTH   = 3                   # Scored candidates kept queued, in multiples of FOLLOWERS_PER_RUN
+
+
+def probe_batch(client, cache, logins, cutoff):
+    """
+    Check that each of `logins` exists and has been active since `cutoff`.
+    Runs in a worker thread, so it only returns verdicts and never prints:
+    [(login, status, detail)] with status one of "ok", "notfound", "private", "inactive".
+    Fresh answers from the user cache skip the lookup; the rest are resolved
+    together, one GraphQL query per resolver.LOGINS_PER_QUERY logins.
+    """
+    verdicts, ask = {}, []
+    for login in logins:
+        if cache.exists(login) is False:
+            verdicts[login] = ("notfound", None)
+            continue
+        known, last_event_at = cache.last_event(login)
+        if known and (last_event_at is None or last_event_at < cutoff):
+            verdicts[login] = ("inactive", last_event_at or "none")
+        elif known and cache.profile(login) != (None, None):
+            verdicts[login] = ("ok", None)  # Cached as recently active, nothing to look up
+        else:
+            ask.append(login)
+
+    for login, profile in resolver.profiles(client, ask, since=cutoff).items():
+        if profile is False:
+            cache.set_exists(login, False)
+            verdicts[login] = ("notfound", None)
+        elif profile is None:
+            verdicts[login] = ("private", "lookup failed")
+        else:
+            cache.set_exists(login, True)
+            cache.set_profile(login, profile.followers, profile.following)  # Scoring signals
+            cache.set_last_event(login, profile.last_active)
+            if profile.type != "User":
+                verdicts[login] = ("private", f"{profile.type} account")
+            elif profile.last_active is None or profile.last_active < cutoff:
+                verdicts[login] = ("inactive", profile.last_active or "none")
+            else:
+                verdicts[login] = ("ok", None)
+    return [(login, *verdicts[login]) for login in logins]
+
+
+def probe_candidates(client, cache, logins, workers, batch=resolver.LOGINS_PER_QUERY):
+    """
+    Probe `logins` in batches of `batch` on a bounded thread pool and yield
+    (login, status, detail) as verdicts come in. At most `workers * 2` batches are in
+    flight, so once the caller stops consuming (queue deep enough) probing stops right
+    behind it.
+    """
+    cutoff = datetime.now(timezone.utc) - ACTIVE_WINDOW
+    pending = iter(logins)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    in_flight = set()
+    try:
+        while True:
+            while len(in_flight) < workers * 2:
+                chunk = list(islice(pending, batch))
+                if not chunk:
+                    break
+                in_flight.add(pool.submit(probe_batch, client, cache, chunk, cutoff))
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)  # Drop queued probes once the caller is done
+
 
 def main():
+    metrics.start("gitgrow")  # Phase timings, API calls and counters of this run
     # — Auth & client setup —
     token = os.getenv("PAT_TOKEN")  # Retrieve GitHub token from environment variables
     if not token:
         sys.exit("PAT_TOKEN environment variable is required")  # Exit if token is not found
-    gh = Github(token)  # Initialize GitHub client
-    me = gh.get_user()  # Get authenticated user
+    client = connect(token)  # Initialize rate-limit-aware GitHub client
+    me = client.gh.get_user()  # Get authenticated user
+    actions = Actions(client, me)  # Follow by login, one request each
 
     # — Determine repo root & config paths —
     base_dir  = Path(__file__).parent.parent.resolve()  # Determine base directory of the repository
     user_path = base_dir / "config" / "usernames.txt"  # Path to the usernames configuration file
     white_path= base_dir / "config" / "whitelist.txt"  # Path to the whitelist configuration file
     per_run = int(os.getenv("FOLLOWERS_PER_RUN", 100))  # Number of users to follow per run, set by workflow .yml file with a fallback default value of 100
-
-    # — Load whitelist —
-    if white_path.exists():
-        with white_path.open() as f:
-            whitelist = {ln.strip().lower() for ln in f if ln.strip()}  # Load whitelist from file
-    else:
-        print(f"[WARN] config/whitelist.txt not found, proceeding with empty whitelist")
-        whitelist = set()  # Initialize empty whitelist if file is not found
-
-    # — Load candidate usernames —
-    if not user_path.exists():
-        sys.exit(f"Username file not found: {user_path}")  # Exit if usernames file is not found
-    with user_path.open() as f:
-        candidates = [ln.strip() for ln in f if ln.strip()]  # Load candidate usernames from file
-
-    # — Fetch current following list once —
+    workers = max(1, int(os.getenv("PROBE_WORKERS", 8)))  # Concurrent existence/activity probes
+
+    with client.phase("load-state"):
+        # — Load whitelist —
+        if white_path.exists():
+            with white_path.open() as f:
+                whitelist = {ln.strip().lower() for ln in f if ln.strip()}  # Load whitelist from file
+        else:
+            print(f"[WARN] config/whitelist.txt not found, proceeding with empty whitelist")
+            whitelist = set()  # Initialize empty whitelist if file is not found
+
+        # — Load candidate usernames —
+        if not user_path.exists():
+            sys.exit(f"Username file not found: {user_path}")  # Exit if usernames file is not found
+        corpus = load_corpus(user_path)  # Compiled, memory-mapped usernames (rebuilt when the file changes)
+
+    # — Fetch current following & followers lists once —
+    snapshot = FollowSnapshot(client, me)  # Login sets, unchanged pages answered by 304s
     try:
-        following = {u.login.lower(): u for u in me.get_following()}  # Fetch list of users the authenticated user is following
+        with client.phase("fetch-following"):
+            following = snapshot.logins("following")  # Logins the authenticated user is following
     except GithubException as e:
         sys.exit(f"[ERROR] fetching following list: {e}")  # Exit if there is an error fetching the following list
+    try:
+        with client.phase("fetch-followers"):
+            followers = snapshot.logins("followers")  # Logins following the authenticated user (also scores cohorts)
+    except GithubException as e:
+        sys.exit(f"[ERROR] fetching followers list: {e}")  # Exit if there is an error fetching the followers list
 
-    # --- STEP 2: Follow up to per_run new users ---
-    random.shuffle(candidates)  # Shuffle candidate usernames
+    # --- STEP 2: Follow up to per_run new users, best scored first ---
     new_followed = 0  # Counter for new followed users
     notfound_new = []  # List to store usernames not found
     private_new  = []  # List to store private/inaccessible usernames
 
-    for login in candidates:
-        if new_followed >= per_run:
-            break  # Stop if the limit of new followed users is reached
-
-        ll = login.lower()
-        if ll == me.login.lower() or ll in whitelist or ll in following:
-            continue  # Skip if the username is the authenticated user, in the whitelist, or already followed
-
-        # — existence check —
-        try:
-            user = gh.get_user(login)  # Check if the user exists
-        except GithubException as e:
-            if getattr(e, "status", None) == 404:
-                notfound_new.append(login)
-                print(f"[SKIP] {login} not found")
-            else:
-                private_new.append(login)
-                print(f"[PRIVATE] {login} inaccessible: {e}")
-            continue
-
-        # — activity filter (last 30 days) —
+    my_login = me.login.lower()
+    def excluded(login):
+        return login == my_login or login in whitelist or login in following
+
+    ledger = FollowLedger()  # Who we followed when, and who followed back
+    ledger.observe_followers(followers)
+    cache = UserCache()  # Existence/activity answers and the follow queue, persisted across runs
+    rates = scoring.cohort_rates(ledger.rows(), cache.profile)  # Follow-back rate of earlier follows, per cohort
+    queued = {login for login, _ in cache.queued() if not excluded(login)}
+    eligible = Sampler(
+        corpus, exclude=({my_login}, whitelist, following, queued), rng=sample_rng()
+    )  # Random candidates drawn lazily, skipping the authenticated user, whitelisted, already followed and queued users
+
+    # Score fresh candidates until the queue holds QUEUE_DEPTH runs' worth of qualified users
+    needed = per_run * QUEUE_DEPTH - len(queued) if per_run > 0 else 0
+    scored = 0
+    batch = min(resolver.LOGINS_PER_QUERY, max(needed, 1))  # Don't resolve far more candidates than needed
+    with client.phase("score"):
+        probes = probe_candidates(client, cache, eligible if needed > 0 else (), workers, batch)  # Qualified users arrive while the rest are still being probed
         try:
-            events = user.get_events()
-            last_event = next(iter(events), None)  # PaginatedList to iterator
-            if not last_event or last_event.created_at < datetime.now(timezone.utc) - timedelta(days=30): #UTC conversion 
-                print(f"[SKIP] {login} inactive (last event: {last_event.created_at if last_event else 'none'})")
-                continue
-        except GithubException as e:
-            print(f"[WARN] could not fetch events for {login}, skipping: {e}")
-            continue
-
-        # attempt follow
+            for login, status, detail in probes:
+                metrics.count(f"probe.{status}")
+                if status == "notfound":
+                    notfound_new.append(login)
+                    print(f"[SKIP] {login} not found")
+                    continue
+                if status == "private":
+                    private_new.append(login)
+                    print(f"[PRIVATE] {login} inaccessible: {detail}")
+                    continue
+                if status == "inactive":
+                    print(f"[SKIP] {login} inactive (last event: {detail})")
+                    continue
+
+                n_followers, n_following = cache.profile(login)
+                _, last_event_at = cache.last_event(login)
+                cache.enqueue(login, scoring.score(last_event_at, n_followers, n_following, rates))
+                scored += 1
+                if scored >= needed:
+                    break  # Queue is deep enough, stop probing
+        except BudgetExhausted as e:
+            print(f"[RATE] stopping scoring early: {e}")  # Whatever is queued still gets followed
+        finally:
+            probes.close()  # Early stop: drain in-flight probes, submit no more
+            corpus.close()
+            print(f"[SAMPLE] drew {eligible.drawn} candidates, {eligible.rejected} excluded, {scored} queued")
+
+    with client.phase("follow"):
         try:
-            me.add_to_following(user)  # Attempt to follow the user
-            new_followed += 1
-            print(f"[FOLLOWED] {login} ({new_followed}/{per_run})")  # Print success message
-        except GithubException as e:
-            if getattr(e, "status", None) == 403:
-                private_new.append(login)
-                print(f"[PRIVATE] cannot follow {login}: {e}")  # Print error message if the user cannot be followed
-            else:
-                print(f"[ERROR] follow {login}: {e}")  # Print other errors
+            for login, score in cache.queued():
+                if new_followed >= per_run:
+                    break  # Enough followed, the rest waits in the queue for the next run
+                if excluded(login):
+                    cache.dequeue(login)
+                    continue
+                try:
+                    actions.follow(login)  # Attempt to follow the user, by login (no profile GET)
+                    new_followed += 1
+                    following.add(login)  # Not followed again in the follow-back phase
+                    ledger.record_follow(login, "follow")
+                    print(f"[FOLLOWED] {login} ({new_followed}/{per_run}, score {score:.3f})")  # Print success message
+                except GithubException as e:
+                    if getattr(e, "status", None) == 403:
+                        private_new.append(login)
+                        metrics.count("follow.private")
+                        print(f"[PRIVATE] cannot follow {login}: {e}")  # Print error message if the user cannot be followed
+                    else:
+                        metrics.count("follow.error")
+                        print(f"[ERROR] follow {login}: {e}")  # Print other errors
+                cache.dequeue(login)
+        except BudgetExhausted as e:
+            print(f"[RATE] stopping follow phase early: {e}")  # Remaining follows wait for the next run
+        finally:
+            cache.close()
 
     print(f"Done follow phase: {new_followed}/{per_run} followed.")  # Print summary of follow phase
     if notfound_new:
@@ -96,33 +219,35 @@ def main():
         print("Private/inaccessible (skipped) during follow phase:", private_new)  # Print list of private/inaccessible users
 
     # --- STEP 3: Follow-back your followers ---
-    try:
-        followers_map = {u.login.lower(): u for u in me.get_followers()}  # Fetch list of users following the authenticated user
-    except GithubException as e:
-        sys.exit(f"[ERROR] fetching followers list: {e}")  # Exit if there is an error fetching the followers list
-
     back_count  = 0  # Counter for follow-back users
     private_back = []  # List to store private/inaccessible follow-back users
 
-    for login, user in followers_map.items():
-        ll = login.lower()
-        if ll == me.login.lower() or ll in whitelist or ll in following:
-            continue  # Skip if the username is the authenticated user, in the whitelist, or already followed
-        try:
-            me.add_to_following(user)  # Attempt to follow-back the user
-            back_count += 1
-            print(f"[FOLLOW-BACKED] {login}")  # Print success message
-        except GithubException as e:
-            if getattr(e, "status", None) == 403:
-                private_back.append(login)
-                print(f"[PRIVATE] cannot follow-back {login}: {e}")  # Print error message if the user cannot be followed-back
-            else:
-                print(f"[ERROR] follow-back {login}: {e}")  # Print other errors
+    with client.phase("follow-back"):
+        for login in sorted(followers):
+            if login == my_login or login in whitelist or login in following:
+                continue  # Skip if the username is the authenticated user, in the whitelist, or already followed
+            try:
+                actions.follow(login)  # Attempt to follow-back the user
+                ledger.record_follow(login, "follow-back")
+                back_count += 1
+                print(f"[FOLLOW-BACKED] {login}")  # Print success message
+            except BudgetExhausted as e:
+                print(f"[RATE] stopping follow-back phase early: {e}")  # The rest are picked up next run
+                break
+            except GithubException as e:
+                if getattr(e, "status", None) == 403:
+                    private_back.append(login)
+                    metrics.count("follow-back.private")
+                    print(f"[PRIVATE] cannot follow-back {login}: {e}")  # Print error message if the user cannot be followed-back
+                else:
+                    metrics.count("follow-back.error")
+                    print(f"[ERROR] follow-back {login}: {e}")  # Print other errors
 
     print(f"Done follow-back phase: {back_count} followed-back.")  # Print summary of follow-back phase
     if private_back:
         print("Private/inaccessible skipped during follow-back:", private_back)  # Print list of private/inaccessible follow-back users
-
+    ledger.close()
+    client.report()  # API requests consumed per phase
 
 if __name__ == "__main__":
     main()
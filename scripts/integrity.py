@@ -4,20 +4,46 @@
 # This script verifies the integrity of GitHub usernames listed in config/usernames.txt for the bot’s operation.
 # It checks that each username exists on GitHub.
 # Any missing usernames are logged, and the file is updated accordingly.
+#
+# `integrity.py --sweep` is the non-interactive variant for scheduled runs: it walks the
+# whole (compiled) username corpus in sorted order, resolving 50 logins per GraphQL query on
+# a few workers, checkpoints after every batch so the next run resumes where this one
+# stopped, and once the sweep reaches the end removes every missing login in one atomic
+# rewrite of usernames.txt.
+#
+# With --dry-run (or DRY_RUN=1) lookups and logs happen as usual, but usernames.txt and the
+# sweep checkpoint are left untouched.
 
 import os
 import sys
+import argparse
 from pathlib import Path
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from github import Github, GithubException
+from ghclient import connect, BudgetExhausted
+from usercache import UserCache
+from sweep import sweep
+import resolver
+import metrics
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify that usernames in config/usernames.txt exist")
+    parser.add_argument("--sweep", action="store_true",
+                        help="non-interactive, resumable check of the whole file (for scheduled runs)")
+    parser.add_argument("--limit", type=int, default=int(os.getenv("INTEGRITY_SWEEP_LIMIT", 20000)),
+                        help="logins to check per --sweep run")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INTEGRITY_WORKERS", 4)),
+                        help="concurrent lookups during --sweep")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="check and log, but leave usernames.txt and the sweep checkpoint untouched")
+    args = parser.parse_args(argv)
+    metrics.start("integrity")  # Phase timings, API calls and counters of this run
 
-def main():
     load_dotenv()
     token = os.getenv("PAT_TOKEN")
     if not token:
         sys.exit("Error: PAT_TOKEN environment variable is required")
-    gh = Github(token)
+    client = connect(token)
 
     base_dir      = Path(__file__).parent.parent
     username_path = base_dir / "config" / "usernames.txt"
@@ -27,6 +53,11 @@ def main():
     if not username_path.exists():
         sys.exit(f"Error: usernames file not found at {username_path}")
 
+    if args.sweep:
+        sweep(client, username_path, log_dir, max(1, args.limit), max(1, args.workers))
+        client.report()
+        return
+
     # Read all usernames ahead of prompting so we can show the valid range
     lines = [l.strip() for l in username_path.read_text().splitlines() if l.strip()]
     total = len(lines)
@@ -45,20 +76,33 @@ def main():
 
     batch = lines[start-1:end]
 
-    # Check existence
+    # Check existence, resolver.LOGINS_PER_QUERY logins per lookup
     results = []    # (line_no, username, status)
     missing = []
-    for idx, name in enumerate(batch, start=start):
+    cache = UserCache()  # Fresh existence verdicts skip the lookup
+    for offset in range(0, len(batch), resolver.LOGINS_PER_QUERY):
+        chunk = list(enumerate(batch[offset:offset + resolver.LOGINS_PER_QUERY], start=start + offset))
+        ask = [name for _, name in chunk if cache.exists(name) is None]
         try:
-            gh.get_user(name)
-            status = "OK"
-        except GithubException as e:
-            if e.status == 404:
-                status = "MISSING"
-                missing.append(name)
+            found = resolver.exists(client, ask)
+        except BudgetExhausted as e:
+            print(f"[WARN] Rate budget exhausted at line {chunk[0][0]}, stopping early: {e}")
+            break
+        for idx, name in chunk:
+            if name in found:
+                verdict = found[name]
+                status = {True: "OK", False: "MISSING", None: "ERROR"}[verdict]
+                if verdict is not None:
+                    cache.set_exists(name, verdict)
             else:
-                status = f"ERROR({e.status})"
-        results.append((idx, name, status))
+                verdict = cache.exists(name)
+                status = "OK (cached)" if verdict else "MISSING (cached)"
+            if verdict is False:
+                missing.append(name)
+            results.append((idx, name, status))
+    cache.close()
+    metrics.count("usernames.checked", len(results))
+    metrics.count("usernames.missing", len(missing))
 
     # Write run log
     ts       = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
@@ -68,8 +112,9 @@ def main():
         f.write(f"Lines processed: {start} to {end} (of {total})\n\n")
         for idx, name, status in results:
             f.write(f"{idx}: {name} – {status}\n")
-        last_idx, last_name, _ = results[-1]
-        f.write(f"\nLast processed: {last_idx}: {last_name}\n")
+        if results:
+            last_idx, last_name, _ = results[-1]
+            f.write(f"\nLast processed: {last_idx}: {last_name}\n")
     print(f"[INFO] Run log → {run_file}")
 
     # If any missing, log and remove them
@@ -80,10 +125,14 @@ def main():
         print(f"[INFO] Logged {len(missing)} missing → {miss_file}")
 
         remaining = [u for u in lines if u not in missing]
-        username_path.write_text("\n".join(remaining) + "\n")
-        print(f"[INFO] Removed {len(missing)} missing entries; {len(remaining)} remain.")
+        if client.dry_run:
+            print(f"[DRY-RUN] would remove {len(missing)} missing entries; {len(remaining)} would remain.")
+        else:
+            username_path.write_text("\n".join(remaining) + "\n")
+            print(f"[INFO] Removed {len(missing)} missing entries; {len(remaining)} remain.")
     else:
         print("[INFO] No missing usernames in this batch.")
+    client.report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# journal.py
+# Write-ahead journal of the star/unstar mutations made by autostarback.py, autostargrow.py
+# and autounstarback.py. Each action is appended (and fsynced) right after the API call, so
+# a run killed between the call and its state update (runner timeout, crash) loses nothing:
+# the next run replays the journal into the state store before doing any work.
+# replay() is also the end-of-run compaction: it folds the journal into the store in one
+# transaction, re-exports the JSON state atomically and only then truncates the journal.
+# Applying an entry is idempotent, so replaying actions the store already has is harmless.
+# The journal lives next to the state store, overridable with ACTIONS_JOURNAL_PATH.
+
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+
+import expiry
+
+JOURNAL_PATH = Path(os.getenv("ACTIONS_JOURNAL_PATH") or ".github/state/actions.journal")
+
+
+def _star_back(store, entry):
+    reciprocity = store.section("reciprocity")
+    rec = reciprocity.get(entry["user"])
+    if rec is None:
+        return  # No longer a stargazer; autotrack.py reconciles the star itself
+    starred_back = rec.setdefault("starred_back", [])
+    if entry["repo"] not in starred_back:
+        starred_back.append(entry["repo"])
+        reciprocity.put(entry["user"], rec)
+
+
+def _unstar_back(store, entry):
+    reciprocity = store.section("reciprocity")
+    rec = reciprocity.get(entry["user"])
+    if rec is not None and entry["repo"] in rec.get("starred_back", []):
+        rec["starred_back"].remove(entry["repo"])
+        reciprocity.put(entry["user"], rec)
+
+
+def _growth_star(store, entry):
+    expiry.ensure(store)  # Index the existing stars first if this state predates the index
+    growth = store.section("growth_starred")
+    entries = growth.get(entry["user"], [])
+    if not any(e.get("repo") == entry["repo"] for e in entries):
+        entries.append({"repo": entry["repo"], "starred_at": entry["at"]})
+        growth.put(entry["user"], entries)
+        expiry.add(store, entry["user"], entry["repo"], expiry.expires_at(entry["at"]))
+
+
+def _growth_unstar(store, entry):
+    expiry.ensure(store)
+    growth = store.section("growth_starred")
+    entries = growth.get(entry["user"], [])
+    moved = [e for e in entries if e.get("repo") == entry["repo"]]
+    if not moved:
+        return
+    expiry.remove(store, entry["user"], entry["repo"], expiry.bucket(expiry.expires_at(moved[0].get("starred_at"))))
+    rest = [e for e in entries if e.get("repo") != entry["repo"]]
+    if rest:
+        growth.put(entry["user"], rest)
+    else:
+        growth.delete(entry["user"])
+    unresponsive = store.section("unresponsive")
+    logged = unresponsive.get(entry["user"], [])
+    logged.append({**moved[0], "unstarred_at": entry["at"]})
+    unresponsive.put(entry["user"], logged)
+
+
+APPLY = {
+    "star_back": _star_back,          # autostarback.py reciprocated a star
+    "unstar_back": _unstar_back,      # autounstarback.py removed an excess reciprocal star
+    "growth_star": _growth_star,      # autostargrow.py starred a growth candidate
+    "growth_unstar": _growth_unstar,  # autounstarback.py timed out a growth star
+}
+
+
+class Journal:
+    """Append-only JSON-lines log of performed actions, one object per line."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or JOURNAL_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a")
+        self._lock = threading.Lock()  # record() is called from WriteExecutor workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, action, user, repo, at=None):
+        """Durably log one performed action; call right after the API call succeeded."""
+        if action not in APPLY:
+            raise ValueError(f"unknown journal action {action!r}")
+        entry = {"at": at or datetime.now(timezone.utc).isoformat(),
+                 "action": action, "user": user, "repo": repo}
+        with self._lock:
+            self._f.write(json.dumps(entry) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        return entry
+
+    def entries(self):
+        entries = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # Torn final line from a crash mid-write; the action wasn't logged
+        return entries
+
+    def replay(self, store):
+        """Apply every journaled action to `store`, export it and truncate; returns the count."""
+        entries = self.entries()
+        if not entries:
+            return 0
+        with store.transaction():
+            for entry in entries:
+                APPLY[entry["action"]](store, entry)
+        store.export_json()
+        self._f.truncate(0)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return len(entries)
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
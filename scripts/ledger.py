@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# ledger.py
+# Follow ledger shared by gitgrow.py and unfollowers.py: one row per login we follow(ed),
+# with when and by which phase it was followed, when it followed back and when we gave up
+# and unfollowed. unfollowers.py uses it for the unfollow grace period; the report command
+# turns it into conversion numbers:
+#
+#   python scripts/ledger.py report [--days N]
+
+import os
+import sys
+import argparse
+import sqlite3
+import threading
+from pathlib import Path
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_PATH = Path(__file__).parent.parent / ".github" / "state" / "follow_ledger.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS follows (
+    login             TEXT PRIMARY KEY,
+    source            TEXT NOT NULL,
+    followed_at       TEXT NOT NULL,
+    followed_back_at  TEXT,
+    unfollowed_at     TEXT
+)
+"""
+
+
+def ledger_path():
+    """Ledger location, overridable with FOLLOW_LEDGER_PATH (tests, local runs)."""
+    return Path(os.getenv("FOLLOW_LEDGER_PATH") or DEFAULT_PATH)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _parse(ts):
+    return datetime.fromisoformat(ts) if ts else None
+
+
+class FollowLedger:
+    """SQLite-backed follow ledger keyed by lowercase login; safe to share between threads."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else ledger_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # — writes —
+
+    def record_follow(self, login, source, now=None):
+        """
+        We followed `login` in phase `source` ("follow" or "follow-back"). A follow-back
+        is reciprocated from the start; a re-follow after an unfollow starts a new record.
+        """
+        now = (now or _now()).isoformat()
+        back = now if source == "follow-back" else None
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO follows (login, source, followed_at, followed_back_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(login) DO UPDATE SET source = excluded.source, followed_at = excluded.followed_at, "
+                "followed_back_at = excluded.followed_back_at, unfollowed_at = NULL",
+                (login.lower(), source, now, back),
+            )
+            self._db.commit()
+
+    def observe_followers(self, followers, now=None):
+        """Stamp followed_back_at for ledger entries now found among `followers`; returns how many."""
+        now = (now or _now()).isoformat()
+        with self._lock:
+            cur = self._db.executemany(
+                "UPDATE follows SET followed_back_at = ? "
+                "WHERE login = ? AND followed_back_at IS NULL AND unfollowed_at IS NULL",
+                ((now, login.lower()) for login in followers),
+            )
+            self._db.commit()
+            return cur.rowcount
+
+    def record_unfollow(self, login, now=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE follows SET unfollowed_at = ? WHERE login = ?",
+                ((now or _now()).isoformat(), login.lower()),
+            )
+            self._db.commit()
+
+    # — reads —
+
+    def followed_at(self, login):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT followed_at FROM follows WHERE login = ? AND unfollowed_at IS NULL", (login.lower(),)
+            ).fetchone()
+        return _parse(row["followed_at"]) if row else None
+
+    def in_grace(self, login, grace, now=None):
+        """True while `login` was followed less than `grace` ago (too early to give up on)."""
+        followed_at = self.followed_at(login)
+        return followed_at is not None and (now or _now()) - followed_at < grace
+
+    def rows(self, since=None):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM follows WHERE followed_at >= ? ORDER BY followed_at",
+                ((since or datetime.min.replace(tzinfo=timezone.utc)).isoformat(),),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+
+# — report —
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def stats(rows):
+    """Conversion numbers for "follow"-phase rows (follow-backs are reciprocal by definition)."""
+    follows = [r for r in rows if r["source"] == "follow"]
+    back = [r for r in follows if r["followed_back_at"]]
+    delays = [
+        (_parse(r["followed_back_at"]) - _parse(r["followed_at"])).total_seconds() / 86400
+        for r in back
+    ]
+    weeks = defaultdict(lambda: [0, 0])
+    for r in follows:
+        year, week, _ = _parse(r["followed_at"]).isocalendar()
+        weeks[f"{year}-W{week:02d}"][0] += 1
+        weeks[f"{year}-W{week:02d}"][1] += bool(r["followed_back_at"])
+    return {
+        "follows": len(follows),
+        "followed_back": len(back),
+        "unfollowed": sum(1 for r in follows if r["unfollowed_at"] and not r["followed_back_at"]),
+        "follow_backs_given": sum(1 for r in rows if r["source"] == "follow-back"),
+        "rate": len(back) / len(follows) if follows else 0.0,
+        "days_to_follow_back": {
+            "p50": _percentile(delays, 0.5), "p90": _percentile(delays, 0.9),
+        } if delays else None,
+        "weeks": dict(sorted(weeks.items())),
+    }
+
+
+def report(ledger, days=None, file=None):
+    out = file or sys.stdout
+    since = _now() - timedelta(days=days) if days else None
+    s = stats(ledger.rows(since))
+    print(f"[LEDGER] follows={s['follows']} followed_back={s['followed_back']} "
+          f"conversion={s['rate']:.1%} unfollowed_unreciprocated={s['unfollowed']} "
+          f"follow_backs_given={s['follow_backs_given']}", file=out)
+    if s["days_to_follow_back"]:
+        d = s["days_to_follow_back"]
+        print(f"[LEDGER] days to follow back: p50={d['p50']:.1f} p90={d['p90']:.1f}", file=out)
+    for week, (n, back) in s["weeks"].items():
+        print(f"[LEDGER] {week}: follows={n} followed_back={back} conversion={back / n:.1%}", file=out)
+    return s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow ledger tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="conversion rate and time-to-follow-back")
+    rep.add_argument("--days", type=int, help="only follows from the last N days")
+    args = parser.parse_args(argv)
+    if not ledger_path().exists():
+        sys.exit(f"No follow ledger at {ledger_path()}")
+    with FollowLedger() as ledger:
+        report(ledger, days=args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# metrics.py
+# Structured metrics of one run, shared by every entry point: wall time per phase, counters,
+# API calls by endpoint and status, retries and rate-limit sleeps. ghclient.Client feeds it
+# (its phases, every request PyGithub makes, every retry and sleep); scripts add their own
+# counts with metrics.count(name). At the end of a run emit()
+#   - appends JSON lines to METRICS_PATH (default logs/metrics.jsonl): one "run" line, then
+#     "phase", "api" and "counter" lines, all tagged with the script and run start time,
+#   - appends a Markdown summary to $GITHUB_STEP_SUMMARY when set (GitHub Actions job page).
+#
+# Scripts that talk to the API get their Metrics from ghclient.connect(); the others call
+# metrics.start() themselves. Module-level phase()/count() go to the run started last.
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from datetime import datetime, timezone
+
+DEFAULT_PATH = Path(__file__).parent.parent / "logs" / "metrics.jsonl"
+
+# Path patterns folded into one endpoint name, most specific first
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/user/following/[^/]+$"), "/user/following/{login}"),
+    (re.compile(r"^/user/starred/[^/]+/[^/]+$"), "/user/starred/{repo}"),
+    (re.compile(r"^/users/[^/]+"), "/users/{login}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{repo}"),
+]
+
+
+def metrics_path():
+    """Where emit() appends JSON lines, overridable with METRICS_PATH."""
+    return Path(os.getenv("METRICS_PATH") or DEFAULT_PATH)
+
+
+def endpoint(verb, url):
+    """'GET /users/{login}/events' style name of a request to `url` (full URL or path)."""
+    path = urlsplit(url).path.rstrip("/") or "/"
+    if path.startswith("/api/v3/"):  # GitHub Enterprise
+        path = path[len("/api/v3"):]
+    for pattern, name in ENDPOINT_PATTERNS:
+        path = pattern.sub(name, path)
+    return f"{verb} {path}"
+
+
+class Metrics:
+    """Counters and phase timers of one run; safe to update from worker threads."""
+
+    def __init__(self, script=None):
+        self.script = script or Path(sys.argv[0]).stem or "python"
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self.phases = {}            # name -> [elapsed seconds, times entered]
+        self.counters = Counter()   # (phase, name) -> value
+        self.calls = Counter()      # (phase, endpoint, status) -> requests
+        self.retries = 0
+        self.sleep_seconds = 0.0    # Waiting on rate limits and throttles
+        self._phase = "setup"
+        self._lock = threading.Lock()
+
+    # — recording —
+
+    @contextmanager
+    def phase(self, name):
+        """Attribute the block's time, counts and requests to `name`."""
+        previous, self._phase = self._phase, name
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                entry = self.phases.setdefault(name, [0.0, 0])
+                entry[0] += time.monotonic() - started
+                entry[1] += 1
+            self._phase = previous
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[(self._phase, name)] += n
+
+    def request(self, verb, url, status):
+        with self._lock:
+            self.calls[(self._phase, endpoint(verb, url), status)] += 1
+
+    def retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def slept(self, seconds):
+        with self._lock:
+            self.sleep_seconds += seconds
+
+    # — output —
+
+    def records(self):
+        """Everything recorded, as the dicts emit() writes one per line."""
+        tag = {"script": self.script, "run": self.started_at.isoformat()}
+        with self._lock:
+            lines = [dict(tag, type="run", elapsed_s=round(time.monotonic() - self._started, 3),
+                          requests=sum(self.calls.values()), retries=self.retries,
+                          sleep_s=round(self.sleep_seconds, 3))]
+            for name, (elapsed, runs) in self.phases.items():
+                requests = sum(n for (phase, _, _), n in self.calls.items() if phase == name)
+                lines.append(dict(tag, type="phase", phase=name, elapsed_s=round(elapsed, 3),
+                                  runs=runs, requests=requests))
+            for (phase, name, status), n in sorted(self.calls.items(), key=str):
+                lines.append(dict(tag, type="api", phase=phase, endpoint=name, status=status, calls=n))
+            for (phase, name), value in sorted(self.counters.items()):
+                lines.append(dict(tag, type="counter", phase=phase, name=name, value=value))
+        return lines
+
+    def summary(self):
+        """Markdown summary of the run for the GitHub Actions job page."""
+        records = self.records()
+        run = records[0]
+        out = [f"### {self.script}", "",
+               f"{run['elapsed_s']:.1f}s, {run['requests']} API requests, {run['retries']} retries, "
+               f"{run['sleep_s']:.0f}s waiting on rate limits", ""]
+        phases = [r for r in records if r["type"] == "phase"]
+        if phases:
+            out += ["| Phase | Time | Requests |", "| --- | ---: | ---: |"]
+            out += [f"| {r['phase']} | {r['elapsed_s']:.1f}s | {r['requests']} |" for r in phases]
+            out.append("")
+        by_endpoint = Counter()
+        for r in records:
+            if r["type"] == "api":
+                by_endpoint[(r["endpoint"], r["status"])] += r["calls"]
+        if by_endpoint:
+            out += ["| Endpoint | Status | Calls |", "| --- | ---: | ---: |"]
+            out += [f"| `{e}` | {s} | {n} |" for (e, s), n in sorted(by_endpoint.items(), key=lambda i: -i[1])]
+            out.append("")
+        counters = [r for r in records if r["type"] == "counter"]
+        if counters:
+            out += ["| Phase | Counter | Value |", "| --- | --- | ---: |"]
+            out += [f"| {r['phase']} | {r['name']} | {r['value']} |" for r in counters]
+            out.append("")
+        return "\n".join(out) + "\n"
+
+    def emit(self, path=None, summary_path=None):
+        """Append the run's JSON lines to `path` and its summary to $GITHUB_STEP_SUMMARY."""
+        path = Path(path) if path else metrics_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            for record in self.records():
+                f.write(json.dumps(record) + "\n")
+        summary_path = summary_path or os.getenv("GITHUB_STEP_SUMMARY")
+        if summary_path:
+            with open(summary_path, "a") as f:
+                f.write(self.summary())
+
+
+_active = None
+
+
+def start(script=None):
+    """Begin recording a new run; module-level phase()/count() go to it from now on."""
+    global _active
+    _active = Metrics(script)
+    return _active
+
+
+def active():
+    """The run started last (started on first use when nothing was)."""
+    return _active or start()
+
+
+def phase(name):
+    return active().phase(name)
+
+
+def count(name, n=1):
+    active().count(name, n)
@@ -3,19 +3,26 @@ import os
 import sys
 from pathlib import Path
 
-from github import Github, GithubException
+from github import GithubException
+from ghclient import connect
+from actions import Actions
+import resolver
+import metrics
 
 def main():
+    metrics.start("orgs")  # Phase timings, API calls and counters of this run
     # — Auth & client setup —
     token = os.getenv("PAT_TOKEN")
     if not token:
         sys.exit("[FATAL] PAT_TOKEN environment variable is required")
 
-    gh = Github(token)
+    client = connect(token)
+    gh = client.gh
     try:
         me = gh.get_user()
     except GithubException as e:
         sys.exit(f"[FATAL] could not get authenticated user: {e}")
+    actions = Actions(client, me)
 
     # — Load target organizations —
     base_dir  = Path(__file__).parent.parent.resolve()
@@ -27,20 +34,18 @@ def main():
         org_logins = [ln.strip() for ln in f if ln.strip()]
 
     print(f"[INFO] loaded {len(org_logins)} organization(s) to process")
+    found = resolver.exists(client, org_logins)  # One batched lookup for all of them
 
     # — Process each org —
     for login in org_logins:
         print(f"[INFO] processing '{login}'")
-        # fetch as a NamedUser (works for both users & orgs)
-        try:
-            target = gh.get_user(login)
-        except GithubException as e:
-            print(f"[ERROR] cannot fetch '{login}': {e}")
+        if not found.get(login):
+            print(f"[ERROR] cannot fetch '{login}': {'not found' if found.get(login) is False else 'lookup failed'}")
             continue
 
         # unfollow if currently following
         try:
-            me.remove_from_following(target)
+            actions.unfollow(login)  # By login (works for both users & orgs)
         except GithubException as e:
             status = getattr(e, "status", None)
             if status == 404:
@@ -52,11 +57,13 @@ def main():
 
         # follow again
         try:
-            me.add_to_following(target)
+            actions.follow(login)
         except GithubException as e:
             print(f"[ERROR] error following '{login}': {e}")
         else:
             print(f"[FOLLOWED] '{login}'")
 
+    client.report()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
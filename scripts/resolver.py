@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# resolver.py
+# Bulk login lookups. One aliased GraphQL query resolves LOGINS_PER_QUERY logins at once
+# (u0: repositoryOwner(login: ...), u1: ...), so checking thousands of accounts costs tens of
+# requests instead of thousands of REST get_user calls. Logins GraphQL can't answer (query
+# errors other than "not found", PyGithub < 2) fall back to REST one at a time.
+#
+#   exists(client, logins)    -> {login: True / False / None}
+#   profiles(client, logins)  -> {login: Profile / False / None}
+#
+# False means the account does not exist, None that the lookup itself failed (rate limited,
+# server error) and the login should be checked again later.
+
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from github import GithubException
+from ghclient import Unsupported
+
+LOGINS_PER_QUERY = 50
+ACTIVITY_WINDOW  = timedelta(days=30)  # Default contribution window scanned for last activity
+
+# type: "User" or "Organization"; followers/following are None for organizations;
+# last_active is the newest contribution day or repository push seen, None if none;
+# repos are full names of the first public non-fork repos, most recently pushed first
+Profile = namedtuple("Profile", "login type followers following last_active repos")
+
+EXISTS_FIELDS = "login __typename"
+
+PROFILE_FIELDS = """login __typename
+  repositories(first: $repos, privacy: PUBLIC, isFork: false, ownerAffiliations: OWNER,
+               orderBy: {field: PUSHED_AT, direction: DESC}) { nodes { nameWithOwner pushedAt } }
+  ... on User {
+    followers { totalCount }
+    following { totalCount }
+    contributionsCollection(from: $since) {
+      contributionCalendar { weeks { contributionDays { date contributionCount } } }
+    }
+  }"""
+
+
+def _owner_query(logins, fields, extra=None):
+    extra = extra or {}
+    params = [f"$l{i}: String!" for i in range(len(logins))] + [f"${k}: {t}" for k, (t, _) in extra.items()]
+    body = "\n".join(f"u{i}: repositoryOwner(login: $l{i}) {{ {fields} }}" for i in range(len(logins)))
+    variables = {f"l{i}": login for i, login in enumerate(logins)}
+    variables.update({k: v for k, (_, v) in extra.items()})
+    return "query(%s) {\n%s\n}" % (", ".join(params), body), variables
+
+
+def _failed_aliases(response):
+    """Aliases whose lookup errored for a reason other than the login not existing."""
+    failed = set()
+    for error in response.get("errors") or []:
+        path = error.get("path") or []
+        if error.get("type") == "NOT_FOUND" and path:
+            continue
+        if not path:
+            raise RuntimeError(f"GraphQL error: {error.get('message')}")  # Whole query failed
+        failed.add(path[0])
+    return failed
+
+
+def _resolve(client, logins, fields, parse, rest, extra=None):
+    """Run `fields` for every login, LOGINS_PER_QUERY per query; `rest` answers failed aliases."""
+    logins = list(logins)
+    result = {}
+    for start in range(0, len(logins), LOGINS_PER_QUERY):
+        chunk = logins[start:start + LOGINS_PER_QUERY]
+        try:
+            query, variables = _owner_query(chunk, fields, extra)
+            response = client.graphql(query, variables)
+            failed = _failed_aliases(response)
+            data = response.get("data") or {}
+        except (Unsupported, GithubException, RuntimeError):
+            failed, data = {f"u{i}" for i in range(len(chunk))}, {}
+        for i, login in enumerate(chunk):
+            alias = f"u{i}"
+            if alias in failed:
+                result[login] = rest(client, login)
+            else:
+                node = data.get(alias)
+                result[login] = parse(node) if node is not None else False
+    return result
+
+
+def _timestamp(value):
+    if not value:
+        return None
+    if len(value) == 10:  # Contribution calendar date, YYYY-MM-DD
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _parse_profile(node):
+    repos = (node.get("repositories") or {}).get("nodes") or []
+    days = [
+        day["date"]
+        for week in (((node.get("contributionsCollection") or {}).get("contributionCalendar") or {}).get("weeks") or [])
+        for day in week.get("contributionDays") or []
+        if day.get("contributionCount")
+    ]
+    seen = [_timestamp(max(days))] if days else []
+    seen += [_timestamp(r["pushedAt"]) for r in repos if r.get("pushedAt")]
+    return Profile(
+        login=node["login"],
+        type=node.get("__typename", "User"),
+        followers=(node.get("followers") or {}).get("totalCount"),
+        following=(node.get("following") or {}).get("totalCount"),
+        last_active=max(seen) if seen else None,
+        repos=[r["nameWithOwner"] for r in repos],
+    )
+
+
+# — REST fallbacks —
+
+def _rest_exists(client, login):
+    try:
+        client.read(client.gh.get_user, login)
+        return True
+    except GithubException as e:
+        if getattr(e, "status", None) == 404:
+            return False
+        return None
+
+
+def _rest_profile(client, login, repos):
+    try:
+        user = client.read(client.gh.get_user, login)
+        last_event = client.read(lambda: next(iter(user.get_events()), None))  # PaginatedList to iterator
+        names = []
+        if repos:
+            for repo in client.read(user.get_repos, sort="pushed"):
+                if not repo.fork and not repo.private:
+                    names.append(repo.full_name)
+                if len(names) >= repos:
+                    break
+    except GithubException as e:
+        if getattr(e, "status", None) == 404:
+            return False
+        return None
+    kind = getattr(user, "type", None) or "User"
+    return Profile(
+        login=getattr(user, "login", login),
+        type=kind,
+        followers=getattr(user, "followers", None) if kind == "User" else None,
+        following=getattr(user, "following", None) if kind == "User" else None,
+        last_active=last_event.created_at if last_event else None,
+        repos=names,
+    )
+
+
+def exists(client, logins):
+    """{login: True/False/None} for a batch of logins."""
+    return _resolve(client, logins, EXISTS_FIELDS, lambda node: True, _rest_exists)
+
+
+def profiles(client, logins, repos=0, since=None):
+    """
+    {login: Profile/False/None} for a batch of logins. `repos` is how many repository names to
+    include per account; activity is looked for since `since` (default ACTIVITY_WINDOW ago).
+    """
+    since = since or datetime.now(timezone.utc) - ACTIVITY_WINDOW
+    extra = {"repos": ("Int!", repos), "since": ("DateTime!", since.isoformat())}
+    return _resolve(
+        client, logins, PROFILE_FIELDS, _parse_profile,
+        lambda client, login: _rest_profile(client, login, repos), extra,
+    )
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# sampler.py
+# Lazy random draws of eligible candidates from a large population (the username corpus).
+# Instead of shuffling or copying the whole list, indices come from a sparse Fisher–Yates
+# permutation: only the positions already swapped are remembered, so drawing k entries
+# costs O(k) time and memory whatever the population size. Entries found in any exclusion
+# set (whitelist, already followed, already starred, ...) are rejected and the next one drawn.
+# Set SAMPLE_SEED to make a run's picks reproducible.
+
+import os
+import random
+from itertools import islice
+
+
+def sample_rng(seed=None):
+    """Random generator seeded from `seed` or SAMPLE_SEED; unseeded when neither is set."""
+    seed = seed if seed is not None else os.getenv("SAMPLE_SEED")
+    if seed in (None, ""):
+        return random.Random()
+    return random.Random(int(seed) if str(seed).lstrip("-").isdigit() else seed)
+
+
+def sparse_permutation(n, rng):
+    """Yield range(n) in random order, lazily; memory grows only with what was consumed."""
+    swapped = {}  # position -> value that currently sits there, if not its own index
+    for i in range(n):
+        j = rng.randrange(i, n)
+        value = swapped.get(j, j)
+        swapped[j] = swapped.pop(i, i)
+        yield value
+
+
+class Sampler:
+    """
+    Iterates `population` (anything with len() and integer indexing) in random order,
+    skipping entries contained in any of the `exclude` collections.
+    """
+
+    def __init__(self, population, exclude=(), rng=None):
+        self.population = population
+        self.exclude = [e for e in exclude if e]
+        self.rng = rng or sample_rng()
+        self.drawn = 0     # Entries looked at, including rejected ones
+        self.rejected = 0
+
+    def __iter__(self):
+        for i in sparse_permutation(len(self.population), self.rng):
+            candidate = self.population[i]
+            self.drawn += 1
+            if any(candidate in excluded for excluded in self.exclude):
+                self.rejected += 1
+                continue
+            yield candidate
+
+    def take(self, k):
+        """Up to k eligible entries (fewer only if the population runs out)."""
+        return list(islice(self, k))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# scoring.py
+# Expected-return score for gitgrow.py follow candidates, from signals that are already
+# cached (no extra API calls):
+#   - activity recency: days since the user's newest public event,
+#   - follow ratio: accounts that follow many people relative to their followers tend to
+#     follow back,
+#   - cohort follow-back rate: how often users of the same cohort (follower-count bucket
+#     and ratio bucket) that we followed earlier actually followed us back.
+# Higher is better; scores only need to be comparable with each other.
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+RECENCY_HALF_LIFE = 7.0               # Days after which the activity factor halves
+FOLLOWBACK_WINDOW = timedelta(days=3)  # Follows younger than this haven't had time to pay off
+PRIOR_RATE   = 0.2                    # Follow-back rate assumed for cohorts with little history
+PRIOR_WEIGHT = 5                      # ... worth this many observed follows
+
+
+def cohort(followers, following):
+    """Cohort key: order of magnitude of followers, and whether they follow more than follow them."""
+    if followers is None or following is None:
+        return "unknown"
+    size = len(str(followers)) if followers else 0  # 0, 1-9, 10-99, ...
+    return f"f{size}-{'fan' if following >= followers else 'star'}"
+
+
+def cohort_rates(rows, profile, now=None):
+    """
+    Smoothed follow-back rate per cohort. `rows` are follow ledger rows (ledger.py) and
+    `profile(login)` gives the (followers, following) counts last seen for a login.
+    """
+    now = now or datetime.now(timezone.utc)
+    total, back = Counter(), Counter()
+    for row in rows:
+        if row["source"] != "follow":
+            continue  # Follow-backs are reciprocal by definition
+        if now - datetime.fromisoformat(row["followed_at"]) < FOLLOWBACK_WINDOW:
+            continue
+        key = cohort(*profile(row["login"]))
+        total[key] += 1
+        back[key] += bool(row["followed_back_at"])
+    return {
+        key: (back[key] + PRIOR_RATE * PRIOR_WEIGHT) / (total[key] + PRIOR_WEIGHT)
+        for key in total
+    }
+
+
+def score(last_event_at, followers, following, rates, now=None):
+    """Expected value of following a candidate; 0 < score <= 1."""
+    now = now or datetime.now(timezone.utc)
+    rate = rates.get(cohort(followers, following), PRIOR_RATE)
+    if last_event_at is None:
+        recency = 0.0
+    else:
+        days = max((now - last_event_at).total_seconds() / 86400, 0.0)
+        recency = math.pow(0.5, days / RECENCY_HALF_LIFE)
+    if followers is None or following is None or followers + following == 0:
+        ratio = 0.5
+    else:
+        ratio = following / (followers + following)
+    return rate * (0.5 + 0.5 * recency) * (0.5 + 0.5 * ratio)
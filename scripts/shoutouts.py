@@ -1,80 +1,221 @@
 #!/usr/bin/env python3
+# shoutouts.py
+# Welcome/farewell notes for stargazers of this repository, diffed against .github/state/stars.json.
+#
+# Stargazers are listed oldest first, so a normal run reads the repo's star count, jumps to
+# the last page and walks backwards only until it reaches a star it already knows (usually
+# one or two requests). Unstars can't be seen that way; they show up as a star count lower
+# than known + new, which triggers a full scan, as does SHOUTOUTS_FULL_SCAN_DAYS passing
+# since the last one. stars.json keeps its plain list format; the sync watermark lives
+# next to it in stars_sync.json.
+#
+# When autotrack.py already synced this repository's stargazers into the state store
+# (repo_stargazers, see stargazers.py) within STORE_MAX_AGE, that record is used and no
+# stargazer request is made at all. stars_sync.json then records which store sync stars.json
+# was written from (store_synced_at); when autotrack's stargazer_delta starts from exactly
+# that sync (its `since`), the delta's new/lost lists are the notes as they are. Otherwise
+# (first run, a missed sync, an API run in between) stars.json is diffed against the store.
+# The store is opened read-only, or its JSON export read, never created.
+#
+# Phase timings, requests by endpoint and status and the new/lost counts go to the run's
+# metrics (metrics.py).
 
 import os
 import json
+import math
 from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import statestore
+import metrics
 
 STATE_FILE = Path(".github/state/stars.json")
+SYNC_FILE = Path(".github/state/stars_sync.json")
 OUTPUT_DIR = Path(".github/state")
 WELCOME_FILE = OUTPUT_DIR / "welcome_comments.md"
 FAREWELL_FILE = OUTPUT_DIR / "farewell_comments.md"
-REPO = os.environ["GITHUB_REPOSITORY"]
-HEADERS = {"Accept": "application/vnd.github+json"}
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+HEADERS = {"Accept": "application/vnd.github.star+json"}  # star+json adds starred_at to each stargazer
+PER_PAGE = 100
+FULL_SCAN_EVERY = timedelta(days=float(os.getenv("SHOUTOUTS_FULL_SCAN_DAYS", 7)))
+STORE_MAX_AGE = timedelta(days=1)  # Older stargazer syncs in the state store are not trusted
+
+def make_session(token=None):
+    """Pooled session with auth and retries on 429/5xx (honouring Retry-After)."""
+    session = requests.Session()
+    retry = Retry(
+        total=5, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",), respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+def _get(session, url, params=None):
+    resp = session.get(url, params=params, timeout=30)
+    metrics.active().request("GET", url, resp.status_code)
+    resp.raise_for_status()
+    return resp.json()
+
+def stargazer_page(session, repo, page):
+    """[(login, starred_at)] on one page of stargazers, oldest first."""
+    data = _get(session, f"{API_URL}/repos/{repo}/stargazers", {"per_page": PER_PAGE, "page": page})
+    return [(s["user"]["login"], s["starred_at"]) for s in data if s.get("user")]
 
-def get_stargazers():
-    stargazers = set()
-    page = 1
+def full_scan(session, repo):
+    """{login: starred_at} for every stargazer."""
+    stars, page = {}, 1
     while True:
-        url = f"https://api.github.com/repos/{REPO}/stargazers?per_page=100&page={page}"
-        resp = requests.get(url, headers=HEADERS)
-        data = resp.json()
-        if not isinstance(data, list) or not data:
-            break
-        stargazers |= {user["login"] for user in data}
-        if len(data) < 100:
-            break
+        batch = stargazer_page(session, repo, page)
+        stars.update(batch)
+        if len(batch) < PER_PAGE:
+            return stars
         page += 1
-    return stargazers
-
-# Load previous state
-if STATE_FILE.exists():
-    with open(STATE_FILE, "r") as f:
-        previous_stars = set(json.load(f))
-else:
-    previous_stars = set()
-
-# Fetch current stargazers
-current_stars = get_stargazers()
-
-# Detect changes
-new_stars = current_stars - previous_stars
-lost_stars = previous_stars - current_stars
-
-# Output messages
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-if new_stars:
-    welcome_msg = (
-        "# 🌟 **New stargazers detected!**\n"
-        "Welcome aboard and thank you for your interest: "
-        + ", ".join(f"@{u}" for u in sorted(new_stars))
-        + "\n\n"
-        "You've been added to the active users follow list `(usernames.txt)`. Glad to have you here! 😸 \n\n"
-        "> _L'amitié naît d'une mutuelle estime et s'entretient moins par les bienfaits que par l'honnêteté._\n"
-        "> — **Étienne de La Boétie**"
-    )
-    with open(WELCOME_FILE, "w") as f:
-        f.write(welcome_msg)
-else:
-    with open(WELCOME_FILE, "w") as f:
-        f.write("No new stargazers detected this run.\n")
-
-if lost_stars:
-    farewell_msg = (
-        "# 💔 **Oh no, stars fading away...**\n"
-        + ", ".join(f"@{u}" for u in sorted(lost_stars))
-        + " unstarred GitGrowBot.\n\n"
-        "Your support was appreciated. We've removed you from the users follow list, but you're welcome back anytime.\n\n"
-        "> _Rien ne se perd, rien ne se crée, tout se transforme._\n"
-        "> — **Antoine Lavoisier**"
-    )
-    with open(FAREWELL_FILE, "w") as f:
-        f.write(farewell_msg)
-else:
-    with open(FAREWELL_FILE, "w") as f:
-        f.write("No stargazers lost this run.\n")
-        
-# Save new state
-with open(STATE_FILE, "w") as f:
-    json.dump(sorted(current_stars), f, indent=2)
\ No newline at end of file
+
+def newest_stars(session, repo, count, known):
+    """{login: starred_at} of stargazers not in `known`, reading pages newest first until a known one."""
+    new = {}
+    for page in range(max(1, math.ceil(count / PER_PAGE)), 0, -1):
+        batch = stargazer_page(session, repo, page)
+        new.update((login, at) for login, at in batch if login not in known)
+        if any(login in known for login, _ in batch):
+            break  # Everything older than this was seen by an earlier run
+    return new
+
+def sync_stargazers(session, repo, previous, sync, now=None):
+    """Current stargazer logins and the updated sync state, incrementally when possible."""
+    now = now or datetime.now(timezone.utc)
+    last_full = sync.get("full_scan_at")
+    if previous and last_full and now - datetime.fromisoformat(last_full) < FULL_SCAN_EVERY:
+        count = _get(session, f"{API_URL}/repos/{repo}")["stargazers_count"]
+        new = newest_stars(session, repo, count, previous)
+        if len(previous) + len(new) == count:
+            print(f"[INFO] {len(new)} new stargazers, {count} in total (incremental)")
+            return previous | set(new), dict(sync, checked_at=now.isoformat())
+        print(f"[INFO] {count} stars but {len(previous) + len(new)} known: someone unstarred, full scan")
+    stars = full_scan(session, repo)
+    print(f"[INFO] {len(stars)} stargazers in total (full scan)")
+    return set(stars), {"full_scan_at": now.isoformat(), "checked_at": now.isoformat()}
+
+def from_store(repo, now=None):
+    """
+    `repo`'s stargazers and autotrack.py's delta for its last sync from the shared state
+    store, as {"stargazers", "new", "lost", "since", "synced_at"}; None if missing or stale.
+    """
+    if statestore.DB_PATH.exists():
+        with statestore.StateStore(readonly=True) as store:
+            delta = store.get("stargazer_delta") or {}
+            stars = store.section("repo_stargazers").get(repo)
+    elif statestore.JSON_PATH.exists():
+        data = json.loads(statestore.JSON_PATH.read_text())
+        delta = data.get("stargazer_delta") or {}
+        stars = data.get("repo_stargazers", {}).get(repo)
+    else:
+        return None
+    synced_at = delta.get("synced_at")
+    now = now or datetime.now(timezone.utc)
+    if stars is None or not synced_at or now - datetime.fromisoformat(synced_at) > STORE_MAX_AGE:
+        return None
+    print(f"[INFO] {len(stars)} stargazers from the state store (synced {synced_at})")
+    return {
+        "stargazers": set(stars),
+        "new": set(delta.get("new", {}).get(repo, [])),
+        "lost": set(delta.get("lost", {}).get(repo, [])),
+        "since": delta.get("since"),
+        "synced_at": synced_at,
+    }
+
+def changes(current, previous, sync, stored=None):
+    """
+    (new, lost) stargazers since stars.json's `previous`. The store's delta is taken as is
+    when it starts from the store sync stars.json was written from (sync["store_synced_at"]);
+    anything else is a set difference.
+    """
+    if stored is not None and stored["since"] and stored["since"] == sync.get("store_synced_at"):
+        return stored["new"], stored["lost"]
+    return current - previous, previous - current
+
+def write_comments(new_stars, lost_stars):
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    if new_stars:
+        welcome_msg = (
+            "# 🌟 **New stargazers detected!**\n"
+            "Welcome aboard and thank you for your interest: "
+            + ", ".join(f"@{u}" for u in sorted(new_stars))
+            + "\n\n"
+            "You've been added to the active users follow list `(usernames.txt)`. Glad to have you here! 😸 \n\n"
+            "> _L'amitié naît d'une mutuelle estime et s'entretient moins par les bienfaits que par l'honnêteté._\n"
+            "> — **Étienne de La Boétie**"
+        )
+        with open(WELCOME_FILE, "w") as f:
+            f.write(welcome_msg)
+    else:
+        with open(WELCOME_FILE, "w") as f:
+            f.write("No new stargazers detected this run.\n")
+
+    if lost_stars:
+        farewell_msg = (
+            "# 💔 **Oh no, stars fading away...**\n"
+            + ", ".join(f"@{u}" for u in sorted(lost_stars))
+            + " unstarred GitGrowBot.\n\n"
+            "Your support was appreciated. We've removed you from the users follow list, but you're welcome back anytime.\n\n"
+            "> _Rien ne se perd, rien ne se crée, tout se transforme._\n"
+            "> — **Antoine Lavoisier**"
+        )
+        with open(FAREWELL_FILE, "w") as f:
+            f.write(farewell_msg)
+    else:
+        with open(FAREWELL_FILE, "w") as f:
+            f.write("No stargazers lost this run.\n")
+
+def main():
+    run = metrics.start("shoutouts")
+    repo = os.environ["GITHUB_REPOSITORY"]
+
+    # Load previous state
+    with run.phase("load-state"):
+        if STATE_FILE.exists():
+            with open(STATE_FILE, "r") as f:
+                previous_stars = set(json.load(f))
+        else:
+            previous_stars = set()
+        sync = json.loads(SYNC_FILE.read_text()) if SYNC_FILE.exists() else {}
+
+    # Current stargazers: autotrack.py's sync if it covers this repo, else fetch them
+    with run.phase("fetch-stargazers"):
+        stored = from_store(repo)
+        if stored is not None:
+            current_stars = stored["stargazers"]
+        else:
+            with make_session(os.getenv("GITHUB_TOKEN") or os.getenv("PAT_TOKEN")) as session:
+                current_stars, sync = sync_stargazers(session, repo, previous_stars, sync)
+
+    # Detect changes and output messages
+    with run.phase("write"):
+        new_stars, lost_stars = changes(current_stars, previous_stars, sync, stored)
+        # Which store sync stars.json now matches; an API run matches none
+        if stored is not None:
+            sync = dict(sync, store_synced_at=stored["synced_at"])
+        else:
+            sync.pop("store_synced_at", None)
+        run.count("stargazers.new", len(new_stars))
+        run.count("stargazers.lost", len(lost_stars))
+        write_comments(new_stars, lost_stars)
+
+        # Save new state
+        with open(STATE_FILE, "w") as f:
+            json.dump(sorted(current_stars), f, indent=2)
+        SYNC_FILE.write_text(json.dumps(sync, indent=2) + "\n")
+    run.emit()
+
+if __name__ == "__main__":
+    main()
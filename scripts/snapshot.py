@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# snapshot.py
+# Follower/following login sets shared by gitgrow.py and unfollowers.py.
+# Each list page is stored on disk with the ETag GitHub returned for it; the next run asks
+# for every page with If-None-Match and only re-reads pages that changed. A 304 doesn't count
+# against the rate limit, so an unchanged list of 50k follows costs no budget at all, and
+# callers get plain lowercase logins instead of thousands of NamedUser objects.
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime, timezone
+
+from ghclient import Unsupported
+
+DEFAULT_PATH = Path(__file__).parent.parent / ".github" / "state" / "follow_snapshot.json"
+PER_PAGE = 100
+ENDPOINTS = {"followers": "/user/followers", "following": "/user/following"}
+
+
+def snapshot_path():
+    """Snapshot location, overridable with FOLLOW_SNAPSHOT_PATH (tests, local runs)."""
+    return Path(os.getenv("FOLLOW_SNAPSHOT_PATH") or DEFAULT_PATH)
+
+
+class FollowSnapshot:
+    """
+    snapshot.logins("followers") / snapshot.logins("following") for the authenticated
+    user `me`. With PyGithub < 2 (no low-level requester) the lists are read in full.
+    """
+
+    def __init__(self, client, me, path=None):
+        self.client = client
+        self.me = me
+        self.path = Path(path) if path else snapshot_path()
+        try:
+            with self.path.open() as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        if self.data.get("login") != me.login.lower():
+            self.data = {"login": me.login.lower()}  # Another account's pages are useless
+
+    def logins(self, kind):
+        """Lowercase logins in `kind` ("followers" or "following")."""
+        try:
+            pages = self._refresh(kind)
+        except Unsupported:
+            users = self.me.get_followers() if kind == "followers" else self.me.get_following()
+            return {u.login.lower() for u in users}
+        return {login for page in pages for login in page["logins"]}
+
+    def _refresh(self, kind):
+        old = self.data.get(kind, {}).get("pages", [])
+        pages, unchanged = [], 0
+        while True:
+            prev = old[len(pages)] if len(pages) < len(old) else None
+            status, etag, data = self.client.conditional_get(
+                ENDPOINTS[kind], {"per_page": PER_PAGE, "page": len(pages) + 1},
+                prev["etag"] if prev else None,
+            )
+            if status == 304:
+                logins = prev["logins"]
+                unchanged += 1
+            else:
+                logins = [u["login"].lower() for u in data]
+            pages.append({"etag": etag, "logins": logins})
+            if len(logins) < PER_PAGE:
+                break
+        self.data[kind] = {"pages": pages, "updated_at": datetime.now(timezone.utc).isoformat()}
+        self._save()
+        total = sum(len(p["logins"]) for p in pages)
+        print(f"[SNAPSHOT] {kind}: {total} logins, {unchanged}/{len(pages)} pages unchanged")
+        return pages
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# stargazers.py
+# Collects who starred the bot's repos and which repos the bot has starred, for autotrack.py.
+# Two interchangeable sources, selected with STARGAZER_SOURCE:
+#   rest    - one paginated /stargazers listing per repo plus /user/starred
+#   graphql - owned repos, their newest 100 stargazers and the bot's starred repos in one
+#             paginated query, then aliased follow-up queries for many repos at once
+# Both return the same Snapshot, so the reciprocity logic doesn't care which one ran.
+#
+# Incremental sync: given the previous per-repo high-water marks (stargazer count and newest
+# starred_at), a repo whose count is unchanged costs nothing, and a repo that only gained
+# stars is read newest-first until the mark is reached. Only when the counts don't add up
+# (someone unstarred) is the repo's full listing read again.
+#
+# pending_queue() derives the star-back work list autostarback.py consumes, so that run
+# only touches stargazers whose reciprocity is actually out of balance.
+#
+# The result is kept as the canonical per-repo stargazer record (repo_stargazers section of
+# the state store: {repo: {login: starred_at}}) plus the new/lost delta of the last sync,
+# which shoutouts.py reads instead of listing the stargazers a second time.
+
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+REPOS_PER_PAGE   = 50   # Owned repos per GraphQL page (each carries up to 100 stargazers)
+REPOS_PER_BATCH  = 25   # Repos whose remaining stargazers are fetched by one aliased query
+FULL_SYNC_EVERY  = timedelta(days=7)  # Re-read every repo fully at least this often
+UNBALANCED_RETRY = timedelta(days=7)  # Re-check users who lacked enough repos this often
+
+# repos: owned public non-fork repo full names
+# stargazers: {repo full name: [stargazer logins, oldest star first]}
+# starred: [(repo full name, owner login)] for every repo the bot has starred,
+#          or None when it wasn't fetched (see collect_starred)
+# marks: {repo full name: {"count", "last_starred_at", "full_synced_at"}} for the next run
+# dates: {repo full name: {login: starred_at ISO string}} for the stars read this run
+Snapshot = namedtuple("Snapshot", "repos stargazers starred marks dates")
+
+
+def source():
+    """Configured collection path: "rest" (default) or "graphql"."""
+    value = (os.getenv("STARGAZER_SOURCE") or "rest").strip().lower()
+    if value not in ("rest", "graphql"):
+        raise ValueError(f"STARGAZER_SOURCE must be 'rest' or 'graphql', got {value!r}")
+    return value
+
+
+def _ts(value):
+    """Normalise datetime / ISO-8601 (incl. trailing Z) to an aware datetime."""
+    if value is None or isinstance(value, datetime):
+        return value if value is None or value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class _RepoSync:
+    """
+    Stargazers of one repo, fed newest star first. Starts in one of three modes:
+      unchanged - count matches the previous run, nothing to read
+      delta     - only new stars expected; stops at the previous newest starred_at
+      full      - read everything (first run, lost stars, or periodic reconciliation)
+    A delta whose new stars don't account for the count difference turns into a full
+    read on the spot: entries seen so far are the newest prefix, so paging just continues.
+    """
+
+    def __init__(self, name, count, prev, now):
+        self.name = name
+        self.count = count
+        self.prev = prev
+        self.now = now
+        self.entries = []  # (login, starred_at) newest first
+        due = prev is None or not prev.get("last_starred_at") or not prev.get("full_synced_at") \
+            or now - _ts(prev["full_synced_at"]) >= FULL_SYNC_EVERY
+        if due or count < prev["count"]:
+            self.mode = "full"
+        elif count == prev["count"]:
+            self.mode = "unchanged"
+        else:
+            self.mode = "delta"
+        self.done = self.mode == "unchanged"
+
+    def feed(self, login, starred_at):
+        """Take the next (older) entry; returns False once no more are needed."""
+        starred_at = _ts(starred_at)
+        if self.mode == "delta" and starred_at <= _ts(self.prev["last_starred_at"]):
+            if self.prev["count"] + len(self.entries) == self.count:
+                self.done = True
+                return False
+            print(f"    {self.name}: star count doesn't add up, reconciling fully (unstars)")
+            self.mode = "full"
+        self.entries.append((login, starred_at))
+        return True
+
+    def end(self):
+        """The listing ran out."""
+        if self.mode == "delta" and self.prev["count"] + len(self.entries) != self.count:
+            self.mode = "full"  # Everything was read anyway, the entries are the full list
+        self.done = True
+
+    def result(self, previous_logins):
+        """(logins oldest first, next mark)."""
+        if self.mode == "unchanged":
+            return list(previous_logins), dict(self.prev)
+        new = [login for login, _ in reversed(self.entries)]
+        logins = new if self.mode == "full" else list(previous_logins) + new
+        newest = self.entries[0][1].isoformat() if self.entries else (self.prev or {}).get("last_starred_at")
+        synced = self.now.isoformat() if self.mode == "full" else self.prev["full_synced_at"]
+        return logins, {"count": self.count, "last_starred_at": newest, "full_synced_at": synced}
+
+
+def _finish(syncs, previous, starred):
+    stargazers, marks, dates = {}, {}, {}
+    for sync in syncs:
+        prev_logins = (previous or {}).get(sync.name, {}).get("logins", [])
+        stargazers[sync.name], marks[sync.name] = sync.result(prev_logins)
+        dates[sync.name] = {login: at.isoformat() for login, at in sync.entries}
+        label = {"unchanged": "unchanged", "delta": f"+{len(sync.entries)} new", "full": "full read"}[sync.mode]
+        print(f"    Total stargazers for {sync.name}: {len(stargazers[sync.name])} ({label})")
+    return Snapshot([s.name for s in syncs], stargazers, starred, marks, dates)
+
+
+def _prev(previous, name):
+    return (previous or {}).get(name, {}).get("mark")
+
+
+def repo_stargazers(snapshot, previous=None):
+    """
+    Canonical {repo: {login: starred_at}} for `snapshot`. Timestamps
+    come from this run's reads, else from `previous` (the last stored record); None if
+    never seen (stars carried over from before timestamps were kept).
+    """
+    previous = previous or {}
+    return {
+        repo: {
+            login: snapshot.dates.get(repo, {}).get(login) or previous.get(repo, {}).get(login)
+            for login in snapshot.stargazers.get(repo, [])
+        }
+        for repo in snapshot.repos
+    }
+
+
+def deltas(previous, current):
+    """{"new": {repo: [logins]}, "lost": {repo: [logins]}} between two {repo: logins} maps."""
+    new, lost = {}, {}
+    for repo in sorted(set(previous) | set(current)):
+        before, after = set(previous.get(repo, ())), set(current.get(repo, ()))
+        if after - before:
+            new[repo] = sorted(after - before)
+        if before - after:
+            lost[repo] = sorted(before - after)
+    return {"new": new, "lost": lost}
+
+
+def pending_queue(reciprocity, previous_queue=(), now=None):
+    """
+    Logins whose starred_back falls short of starred_by, in work order: entries still
+    pending from `previous_queue` keep their place (so a run cut short resumes where it
+    stopped), newly unbalanced users follow alphabetically. Users autostarback.py found
+    lacking enough repos (starback_unmatchable_at) are left out until UNBALANCED_RETRY has
+    passed; other unbalanced users (not reached yet, or a star that failed) always stay.
+    """
+    now = now or datetime.now(timezone.utc)
+    pending = set()
+    for login, rec in reciprocity.items():
+        if len(rec.get("starred_back", [])) >= len(rec.get("starred_by", [])):
+            continue
+        attempt = rec.get("starback_unmatchable_at")
+        if attempt and now - _ts(attempt) < UNBALANCED_RETRY:
+            continue
+        pending.add(login)
+    kept = [login for login in dict.fromkeys(previous_queue) if login in pending]
+    return kept + sorted(pending - set(kept))
+
+
+# — REST —
+
+def collect_rest(client, me, previous=None, with_starred=True):
+    """
+    `previous` maps repo full name -> {"mark": <marks entry>, "logins": [...]} from the
+    last run; None forces a full read of every repo.
+    """
+    now = datetime.now(timezone.utc)
+    with client.phase("list-repos"):
+        repos = [r for r in me.get_repos(type="owner") if not r.fork and not r.private]
+    print(f"Found {len(repos)} repos.")
+
+    syncs = []
+    with client.phase("fetch-stargazers"):
+        for idx, repo in enumerate(repos):
+            sync = _RepoSync(repo.full_name, repo.stargazers_count, _prev(previous, repo.full_name), now)
+            syncs.append(sync)
+            print(f"[{idx+1}/{len(repos)}] Processing repo: {repo.full_name} ({sync.mode})")
+            if sync.done:
+                continue
+            try:
+                listing = repo.get_stargazers_with_dates()
+                if sync.mode == "full":
+                    listing = list(listing)[::-1]  # Forward listing is one request cheaper than .reversed
+                else:
+                    listing = listing.reversed  # Newest page first, stops at the mark
+                for sg in listing:
+                    if not sync.feed(sg.user.login, sg.starred_at):
+                        break
+                else:
+                    sync.end()
+            except Exception as e:
+                print(f"    ERROR fetching stargazers for {repo.full_name}: {e}")
+                if sync.prev:
+                    sync.mode = "unchanged"  # Keep last run's list and mark, retry next run
+                    sync.count = sync.prev["count"]
+
+    starred = collect_starred(client, me, "rest") if with_starred else None
+    return _finish(syncs, previous, starred)
+
+
+def collect_starred(client, me, mode):
+    """Every repo the bot has starred, as (full name, owner login)."""
+    print("Fetching all repos starred by the bot user...")
+    try:
+        if mode == "graphql":
+            starred = _graphql_pages(client, me.login, with_repos=False, with_starred=True)
+        else:
+            with client.phase("fetch-starred"):
+                starred = [(r.full_name, r.owner.login) for r in me.get_starred()]
+        print(f"Bot user has starred {len(starred)} repos in total.")
+    except Exception as e:
+        print(f"ERROR fetching bot user's starred repos: {e}")
+        starred = []
+    return starred
+
+
+# — GraphQL —
+
+OVERVIEW_QUERY = """
+query($login: String!, $repoCursor: String, $starCursor: String,
+      $withRepos: Boolean!, $withStarred: Boolean!) {
+  user(login: $login) {
+    repositories(first: %d, after: $repoCursor, ownerAffiliations: OWNER,
+                 privacy: PUBLIC, isFork: false) @include(if: $withRepos) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        nameWithOwner
+        stargazers(first: 100, orderBy: {field: STARRED_AT, direction: DESC}) {
+          totalCount
+          pageInfo { hasNextPage endCursor }
+          edges { starredAt node { login } }
+        }
+      }
+    }
+    starredRepositories(first: 100, after: $starCursor) @include(if: $withStarred) {
+      pageInfo { hasNextPage endCursor }
+      nodes { nameWithOwner owner { login } }
+    }
+  }
+}
+""" % REPOS_PER_PAGE
+
+
+def _data(response):
+    """Unwrap a GraphQL response, failing loudly on errors (no partial snapshots)."""
+    if response.get("errors"):
+        raise RuntimeError(f"GraphQL error: {response['errors'][0].get('message')}")
+    return response["data"]
+
+
+def _stargazer_batch_query(batch):
+    """Aliased query fetching the next stargazer page of every (repo, cursor) in `batch`."""
+    params, fields, variables = [], [], {}
+    for i, (full_name, cursor) in enumerate(batch):
+        owner, name = full_name.split("/", 1)
+        params.append(f"$o{i}: String!, $n{i}: String!, $c{i}: String")
+        fields.append(
+            f"r{i}: repository(owner: $o{i}, name: $n{i}) {{"
+            f" stargazers(first: 100, after: $c{i}, orderBy: {{field: STARRED_AT, direction: DESC}}) {{"
+            f" pageInfo {{ hasNextPage endCursor }} edges {{ starredAt node {{ login }} }} }} }}"
+        )
+        variables.update({f"o{i}": owner, f"n{i}": name, f"c{i}": cursor})
+    return "query(%s) {\n%s\n}" % (", ".join(params), "\n".join(fields)), variables
+
+
+def _feed_page(sync, connection):
+    """Feed one GraphQL stargazer page; returns the cursor to continue from, or None."""
+    for edge in connection["edges"]:
+        if not sync.feed(edge["node"]["login"], edge["starredAt"]):
+            return None
+    if connection["pageInfo"]["hasNextPage"]:
+        return connection["pageInfo"]["endCursor"]
+    sync.end()
+    return None
+
+
+def _graphql_pages(client, login, with_repos, with_starred, on_repo=None):
+    """Walk the overview query, handing each repo node to on_repo; returns the starred list."""
+    starred = []
+    variables = {"login": login, "repoCursor": None, "starCursor": None,
+                 "withRepos": with_repos, "withStarred": with_starred}
+    with client.phase("graphql-overview"):
+        while variables["withRepos"] or variables["withStarred"]:
+            user = _data(client.graphql(OVERVIEW_QUERY, variables))["user"]
+            if user is None:
+                raise RuntimeError(f"GraphQL: user {login} not found")
+            if variables["withRepos"]:
+                page = user["repositories"]
+                for node in page["nodes"]:
+                    on_repo(node)
+                variables["repoCursor"] = page["pageInfo"]["endCursor"]
+                variables["withRepos"] = page["pageInfo"]["hasNextPage"]
+            if variables["withStarred"]:
+                page = user["starredRepositories"]
+                starred.extend((n["nameWithOwner"], n["owner"]["login"]) for n in page["nodes"])
+                variables["starCursor"] = page["pageInfo"]["endCursor"]
+                variables["withStarred"] = page["pageInfo"]["hasNextPage"]
+    return starred
+
+
+def collect_graphql(client, login, previous=None, with_starred=True):
+    """Same contract as collect_rest, over GraphQL."""
+    now = datetime.now(timezone.utc)
+    syncs = []
+    more = {}  # repo full name -> (sync, cursor of its next stargazer page)
+
+    def on_repo(node):
+        sg = node["stargazers"]
+        sync = _RepoSync(node["nameWithOwner"], sg["totalCount"], _prev(previous, node["nameWithOwner"]), now)
+        syncs.append(sync)
+        if not sync.done:
+            cursor = _feed_page(sync, sg)
+            if cursor:
+                more[sync.name] = (sync, cursor)
+
+    print("Fetching owned repos and newest stargazers via GraphQL...")
+    starred = _graphql_pages(client, login, True, with_starred, on_repo)
+    print(f"Found {len(syncs)} repos.")
+
+    with client.phase("graphql-stargazers"):
+        while more:
+            batch = list(more.items())[:REPOS_PER_BATCH]
+            query, qvars = _stargazer_batch_query([(name, cursor) for name, (_, cursor) in batch])
+            data = _data(client.graphql(query, qvars))
+            for i, (name, (sync, _)) in enumerate(batch):
+                cursor = _feed_page(sync, data[f"r{i}"]["stargazers"])
+                if cursor:
+                    more[name] = (sync, cursor)
+                else:
+                    del more[name]
+
+    if with_starred:
+        print(f"Bot user has starred {len(starred)} repos in total.")
+    return _finish(syncs, previous, starred if with_starred else None)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# statestore.py
+# Stargazer/reciprocity state shared by autotrack.py, autostarback.py, autostargrow.py and
+# autounstarback.py, kept in SQLite so each script reads and rewrites only the records it
+# touches instead of the whole document.
+#   - map sections (reciprocity, growth_starred, unresponsive, ...) are stored one row per
+#     login/repo, with per-record get/put/delete,
+#   - everything else (current_stargazers, pending_reciprocity, ...) is a single value,
+#   - writes inside `with store.transaction():` commit atomically (BEGIN IMMEDIATE, so a
+#     second writer waits instead of interleaving),
+#   - the schema is versioned with PRAGMA user_version and migrated on open,
+#   - export_json() writes the classic stargazer_state.json for the tracker-data branch;
+#     a store opened without a database imports that file once,
+#   - the database and its JSON export live in .github/state, overridable with
+#     STATE_DB_PATH and STATE_JSON_PATH (dry runs, local runs),
+#   - StateStore(readonly=True) only reads an existing database and never creates,
+#     migrates or imports anything (shoutouts.py).
+
+import os
+import json
+import sqlite3
+from pathlib import Path
+from contextlib import contextmanager
+
+DB_PATH = Path(os.getenv("STATE_DB_PATH") or ".github/state/stargazer_state.sqlite")
+JSON_PATH = Path(os.getenv("STATE_JSON_PATH") or ".github/state/stargazer_state.json")
+
+SCHEMA_VERSION = 1
+SECTIONS = ("mutual_stars", "reciprocity", "stargazer_sync", "repo_stargazers", "growth_starred",
+            "growth_expiry", "unresponsive")
+# Key order of the exported JSON, so tracker-data diffs stay readable
+LAYOUT = ("current_stargazers", "mutual_stars", "unstargazers", "stargazer_delta", "reciprocity",
+          "pending_reciprocity", "stargazer_sync", "repo_stargazers", "growth_starred", "growth_expiry",
+          "unresponsive")
+
+VALUES = ""  # Section name under which single values are stored
+
+MIGRATIONS = {
+    1: [
+        "CREATE TABLE state ("
+        " section TEXT NOT NULL,"
+        " key     TEXT NOT NULL,"
+        " value   TEXT NOT NULL,"
+        " PRIMARY KEY (section, key))",
+    ],
+}
+
+
+def _dump(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def exists(path=None, json_path=None):
+    """Whether there is any state to open (database or a JSON export to import)."""
+    return Path(path or DB_PATH).exists() or Path(json_path or JSON_PATH).exists()
+
+
+class Section:
+    """One map section; keys are logins (or repo names), values any JSON value."""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def get(self, key, default=None):
+        row = self.store._db.execute(
+            "SELECT value FROM state WHERE section = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, key, value):
+        self.store._db.execute(
+            "INSERT INTO state (section, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(section, key) DO UPDATE SET value = excluded.value",
+            (self.name, key, _dump(value)),
+        )
+
+    def delete(self, key):
+        self.store._db.execute("DELETE FROM state WHERE section = ? AND key = ?", (self.name, key))
+
+    def keys(self):
+        return [k for (k,) in self.store._db.execute(
+            "SELECT key FROM state WHERE section = ? ORDER BY key", (self.name,))]
+
+    def items_until(self, key):
+        """(key, value) for keys <= `key`, in key order (a range scan, not a full read)."""
+        return [(k, json.loads(v)) for k, v in self.store._db.execute(
+            "SELECT key, value FROM state WHERE section = ? AND key <= ? ORDER BY key", (self.name, key))]
+
+    def items(self):
+        return [(k, json.loads(v)) for k, v in self.store._db.execute(
+            "SELECT key, value FROM state WHERE section = ? ORDER BY key", (self.name,))]
+
+    def __contains__(self, key):
+        return self.store._db.execute(
+            "SELECT 1 FROM state WHERE section = ? AND key = ?", (self.name, key)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self.store._db.execute(
+            "SELECT COUNT(*) FROM state WHERE section = ?", (self.name,)
+        ).fetchone()[0]
+
+    def replace(self, mapping):
+        """Make the section equal `mapping`, writing only differing rows; returns how many."""
+        current = dict(self.store._db.execute(
+            "SELECT key, value FROM state WHERE section = ?", (self.name,)))
+        changed = 0
+        for key, value in mapping.items():
+            if current.pop(key, None) != _dump(value):
+                self.put(key, value)
+                changed += 1
+        for key in current:
+            self.delete(key)
+            changed += 1
+        return changed
+
+
+class StateStore:
+    """
+    Opens (creating/migrating as needed) the state database at `path`.
+    Reads can happen anywhere; wrap related writes in transaction() so they land together.
+    With readonly=True the database must already exist at the current schema version.
+    """
+
+    def __init__(self, path=None, json_path=None, readonly=False):
+        self.path = Path(path or DB_PATH)
+        self.json_path = Path(json_path or JSON_PATH)
+        if readonly:
+            self._db = sqlite3.connect(self.path.resolve().as_uri() + "?mode=ro", uri=True,
+                                       isolation_level=None, timeout=60)
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self.close()
+                raise RuntimeError(f"{self.path} has schema v{version}, this code reads v{SCHEMA_VERSION}")
+            return
+        fresh = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly below
+        self._db = sqlite3.connect(str(self.path), isolation_level=None, timeout=60)
+        self._migrate()
+        if fresh and self.json_path.exists():
+            self.import_json(self.json_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _migrate(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} has schema v{version}, this code knows v{SCHEMA_VERSION}")
+        if version == SCHEMA_VERSION:
+            return
+        with self.transaction():
+            for step in range(version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[step]:
+                    self._db.execute(statement)
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self):
+        """All writes in the block commit together, or not at all if it raises."""
+        if self._db.in_transaction:  # Nested: part of the enclosing transaction
+            yield self
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    # — access —
+
+    def section(self, name):
+        return Section(self, name)
+
+    def get(self, name, default=None):
+        return self.section(VALUES).get(name, default)
+
+    def set(self, name, value):
+        self.section(VALUES).put(name, value)
+
+    # — JSON interchange —
+
+    def import_json(self, path):
+        """Load a stargazer_state.json document (replacing what's stored under its keys)."""
+        with open(path) as f:
+            data = json.load(f)
+        with self.transaction():
+            for name, value in data.items():
+                if name in SECTIONS and isinstance(value, dict):
+                    self.section(name).replace(value)
+                else:
+                    self.set(name, value)
+        print(f"[state] Imported {path} into {self.path}")
+
+    def to_dict(self):
+        data = {name: {} for name in SECTIONS}
+        for section, key, value in self._db.execute("SELECT section, key, value FROM state"):
+            if section == VALUES:
+                data[key] = json.loads(value)
+            else:
+                data.setdefault(section, {})[key] = json.loads(value)
+        order = {name: i for i, name in enumerate(LAYOUT)}
+        return {k: data[k] for k in sorted(data, key=lambda k: (order.get(k, len(order)), k))}
+
+    def export_json(self, path=None):
+        """Write the whole state as JSON (atomically) for the tracker-data branch and artifacts."""
+        path = Path(path or self.json_path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
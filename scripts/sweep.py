@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# sweep.py
+# Resumable existence sweep over config/usernames.txt, behind `integrity.py --sweep`.
+# Logins are read from the compiled corpus in sorted order, resolved in batches of
+# resolver.LOGINS_PER_QUERY on a small thread pool, and the checkpoint (last login checked,
+# missing logins found so far) is rewritten after every batch, so a run cut short by the
+# rate budget or a timeout continues where it stopped. The usernames file is only rewritten
+# once, atomically, when a sweep reaches the end of the corpus. On a dry run (client.dry_run)
+# neither the checkpoint nor the usernames file is written.
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import resolver
+import metrics
+from corpus import load_corpus
+from ghclient import BudgetExhausted
+from usercache import UserCache
+
+
+def checkpoint_path(base_dir):
+    """Sweep progress, overridable with INTEGRITY_CHECKPOINT_PATH."""
+    return Path(os.getenv("INTEGRITY_CHECKPOINT_PATH") or base_dir / ".github" / "state" / "integrity_checkpoint.json")
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def remove_logins(username_path, missing):
+    """Drop `missing` (case-insensitive) from the usernames file in one atomic rewrite."""
+    missing = {m.lower() for m in missing}
+    kept = removed = 0
+    tmp = username_path.with_name(username_path.name + ".tmp")
+    with username_path.open() as src, tmp.open("w") as dst:
+        for line in src:
+            name = line.strip()
+            if not name:
+                continue
+            if name.lower() in missing:
+                removed += 1
+                continue
+            dst.write(name + "\n")
+            kept += 1
+    os.replace(tmp, username_path)
+    return kept, removed
+
+
+def sweep(client, username_path, log_dir, limit, workers):
+    """Check up to `limit` logins from the checkpoint on; returns True once the sweep completed."""
+    base_dir = username_path.parent.parent
+    cp_path  = checkpoint_path(base_dir)
+    try:
+        checkpoint = json.loads(cp_path.read_text())
+    except (OSError, ValueError):
+        checkpoint = {"after": "", "checked": 0, "missing": [], "errors": 0,
+                      "started_at": datetime.now(timezone.utc).isoformat()}
+    corpus = load_corpus(username_path)
+    start  = corpus.bisect(checkpoint["after"]) if checkpoint["after"] else 0
+    end    = min(len(corpus), start + limit)
+    print(f"[SWEEP] {len(corpus)} logins, resuming at #{start} ({checkpoint['checked']} checked so far), "
+          f"checking up to {end - start} this run")
+    batches = [[corpus[i] for i in range(b, min(b + resolver.LOGINS_PER_QUERY, end))]
+               for b in range(start, end, resolver.LOGINS_PER_QUERY)]
+    at_end = end == len(corpus)
+    corpus.close()
+
+    cache = UserCache()  # Fresh verdicts skip the lookup; new ones are stored for every script
+
+    def check(batch):
+        verdicts, ask = {}, []
+        for login in batch:
+            cached = cache.exists(login)
+            if cached is None:
+                ask.append(login)
+            else:
+                verdicts[login] = cached
+        for login, found in resolver.exists(client, ask).items():
+            verdicts[login] = found
+            if found is not None:
+                cache.set_exists(login, found)
+        return verdicts
+
+    completed = True
+    with client.phase("sweep"):
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(check, batch) for batch in batches]
+        try:
+            for batch, future in zip(batches, futures):  # In order, so the checkpoint is a clean prefix
+                try:
+                    verdicts = future.result()
+                except BudgetExhausted as e:
+                    print(f"[WARN] Rate budget exhausted after {batch[0]!r}, resuming there next run: {e}")
+                    completed = False
+                    break
+                missing = [login for login, found in verdicts.items() if found is False]
+                errors = sum(1 for found in verdicts.values() if found is None)
+                checkpoint["missing"] += missing
+                checkpoint["errors"] += errors
+                metrics.count("usernames.checked", len(batch))
+                metrics.count("usernames.missing", len(missing))
+                metrics.count("usernames.errors", errors)
+                checkpoint["after"] = batch[-1]
+                checkpoint["checked"] += len(batch)
+                if not client.dry_run:
+                    _write_json(cp_path, checkpoint)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            cache.close()
+
+    print(f"[SWEEP] {checkpoint['checked']} checked, {len(checkpoint['missing'])} missing, "
+          f"{checkpoint['errors']} lookup errors so far")
+    if not (completed and at_end):
+        return False
+
+    # Whole corpus swept: apply the removal list once, then start over next time
+    ts = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    if checkpoint["missing"]:
+        miss_file = log_dir / f"sweep-missing-{ts}.txt"
+        miss_file.write_text("\n".join(checkpoint["missing"]) + "\n")
+        print(f"[INFO] Logged {len(checkpoint['missing'])} missing → {miss_file}")
+        if client.dry_run:
+            print(f"[DRY-RUN] would remove {len(checkpoint['missing'])} missing entries from {username_path}")
+        else:
+            kept, removed = remove_logins(username_path, checkpoint["missing"])
+            print(f"[INFO] Removed {removed} missing entries; {kept} remain.")
+    else:
+        print("[INFO] Sweep complete, no missing usernames.")
+    if not client.dry_run:
+        cp_path.unlink(missing_ok=True)
+    return True
@@ -1,16 +1,52 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
 from pathlib import Path
-from github import Github, GithubException
+from datetime import datetime, timedelta, timezone
+from github import GithubException
+from ghclient import connect
+from executor import WriteExecutor
+from actions import Actions
+from snapshot import FollowSnapshot
+from ledger import FollowLedger
+import metrics
+
+QUEUE_MAX_AGE = timedelta(hours=24)  # Older leftovers are recomputed from fresh follow lists
+GRACE = timedelta(days=float(os.getenv("UNFOLLOW_GRACE_DAYS", 7)))  # Time a new follow gets to reciprocate
+
+def queue_path(base_dir):
+    """Unfinished unfollows of the last run, overridable with UNFOLLOW_QUEUE_PATH."""
+    return Path(os.getenv("UNFOLLOW_QUEUE_PATH") or base_dir / ".github" / "state" / "unfollow_queue.json")
+
+def load_queue(path):
+    """Logins a previous run left to unfollow, or None when there is no recent queue."""
+    try:
+        with path.open() as f:
+            queue = json.load(f)
+        created = datetime.fromisoformat(queue["created_at"])
+    except (OSError, ValueError, KeyError):
+        return None
+    if datetime.now(timezone.utc) - created > QUEUE_MAX_AGE or not queue["remaining"]:
+        return None
+    return queue
+
+def save_queue(path, created_at, remaining):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump({"created_at": created_at, "remaining": remaining}, f, indent=2)
+    os.replace(tmp, path)
 
 def main():
+    metrics.start("unfollowers")  # Phase timings, API calls and counters of this run
     # — Auth & client setup —
     token = os.getenv("PAT_TOKEN")  # Retrieve GitHub token from environment variables
     if not token:
         sys.exit("PAT_TOKEN environment variable is required")  # Exit if token is not found
-    gh = Github(token)  # Initialize GitHub client
-    me = gh.get_user()  # Get authenticated user
+    client = connect(token)  # Initialize rate-limit-aware GitHub client
+    me = client.gh.get_user()  # Get authenticated user
+    actions = Actions(client, me)
 
     # — Load whitelist —
     base_dir   = Path(__file__).parent.parent.resolve()  # Determine base directory of the repository
@@ -22,33 +58,63 @@ def main():
         print(f"[WARN] config/whitelist.txt not found, proceeding with empty whitelist")
         whitelist = set()  # Initialize empty whitelist if file is not found
 
-    # — Fetch your followers and following —
-    try:
-        followers     = {u.login.lower() for u in me.get_followers()}  # Fetch list of followers
-        following_map = {u.login.lower(): u for u in me.get_following()}  # Fetch list of users the authenticated user is following
-    except GithubException as e:
-        sys.exit(f"[ERROR] fetching follow lists: {e}")  # Exit if there is an error fetching the lists
-
-    # — Compute who to unfollow —
-    to_unfollow = [
-        login for login in following_map
-        if login not in followers
-        and login not in whitelist
-        and login != me.login.lower()
-    ]  # Determine users to unfollow
-
-    # — Unfollow them by passing the NamedUser object —
-    unfollowed = 0  # Counter for unfollowed users
-    for login in to_unfollow:
-        user = following_map[login]
+    # — Resume the previous run's leftovers, or compute who to unfollow —
+    ledger = FollowLedger()  # Follow times (grace period) and follow-back/unfollow bookkeeping
+    path  = queue_path(base_dir)
+    queue = load_queue(path)
+    if queue:
+        created_at  = queue["created_at"]
+        to_unfollow = [login for login in queue["remaining"] if login not in whitelist]
+        print(f"[QUEUE] resuming {len(to_unfollow)} unfollows left from {created_at}")
+    else:
+        # — Fetch your followers and following —
+        snapshot = FollowSnapshot(client, me)  # Login sets, unchanged pages answered by 304s
         try:
-            me.remove_from_following(user)  # Attempt to unfollow the user
-            unfollowed += 1
-            print(f"[UNFOLLOWED] {login}")  # Print success message
+            with client.phase("fetch-follows"):
+                followers = snapshot.logins("followers")  # Fetch list of followers
+                following = snapshot.logins("following")  # Fetch list of users the authenticated user is following
         except GithubException as e:
-            print(f"[ERROR] could not unfollow {login}: {e}")  # Print error message if the user cannot be unfollowed
+            sys.exit(f"[ERROR] fetching follow lists: {e}")  # Exit if there is an error fetching the lists
+        ledger.observe_followers(followers)
+
+        created_at  = datetime.now(timezone.utc).isoformat()
+        to_unfollow = [
+            login for login in sorted(following)
+            if login not in followers
+            and login not in whitelist
+            and login != me.login.lower()
+        ]  # Determine users to unfollow
+
+    # — Give recent follows time to reciprocate —
+    waiting = {login for login in to_unfollow if ledger.in_grace(login, GRACE)}
+    if waiting:
+        print(f"[GRACE] {len(waiting)} follows are younger than {GRACE.days} days, not unfollowing yet")
+        metrics.count("unfollow.in-grace", len(waiting))
+        to_unfollow = [login for login in to_unfollow if login not in waiting]
+
+    # — Unfollow them on a small worker pool, capped per run —
+    def unfollow(login):
+        actions.unfollow(login)  # By login, no profile GET
+        ledger.record_unfollow(login)
+        print(f"[UNFOLLOWED] {login}")
+
+    workers = max(1, int(os.getenv("UNFOLLOW_WORKERS", 4)))
+    cap     = max(0, int(os.getenv("UNFOLLOWS_PER_RUN", 500)))
+    with client.phase("unfollow"):
+        result = WriteExecutor(client, workers=workers, cap=cap).run(to_unfollow, unfollow)
+        metrics.count("unfollow.failed", len(result.failed))
+        metrics.count("unfollow.deferred", len(result.remaining))
+
+    # — Persist what's left so the next run continues instead of recomputing —
+    if result.remaining:
+        save_queue(path, created_at, result.remaining)
+        print(f"[QUEUE] {len(result.remaining)} unfollows deferred to the next run")
+    elif path.exists():
+        path.unlink()
 
-    print(f"Done unfollow phase: {unfollowed}")  # Print summary of unfollow phase
+    ledger.close()
+    print(f"Done unfollow phase: {len(result.done)}")  # Print summary of unfollow phase
+    client.report()  # API requests consumed per phase
 
 if __name__ == "__main__":
     main()
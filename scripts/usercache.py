@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# usercache.py
+# Persistent per-login metadata cache shared by gitgrow.py, autostargrow.py, autostarback.py
+# and integrity.py. Stores whether a login exists, when it was last active and which public,
+# non-fork repos it owns, each with its own TTL, so repeated runs only ask the GitHub API
+# about logins whose cached answer has gone stale.
+# It also holds gitgrow.py's candidate bookkeeping: profile counts feeding candidate scoring
+# (scoring.py) and the persistent queue of scored candidates. Follow history itself lives in
+# the follow ledger (ledger.py).
+
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_PATH = Path(__file__).parent.parent / ".github" / "state" / "user_cache.sqlite"
+
+EXISTS_TTL   = timedelta(days=30)   # An existing account rarely disappears
+MISSING_TTL  = timedelta(days=7)    # Missing logins may be re-registered, re-check sooner
+ACTIVITY_TTL = timedelta(hours=20)  # Last-event timestamp, refreshed about once a day
+REPOS_TTL    = timedelta(days=7)    # Starrable repo list
+EVICT_AFTER  = timedelta(days=90)   # Rows untouched this long are dropped on close
+QUEUE_TTL    = timedelta(days=3)    # Queued candidates older than this are re-probed instead
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    login             TEXT PRIMARY KEY,
+    exists_flag       INTEGER,
+    exists_checked    TEXT,
+    last_event_at     TEXT,
+    activity_checked  TEXT,
+    repos             TEXT,
+    repos_checked     TEXT,
+    repos_sig         TEXT,
+    followers         INTEGER,
+    following         INTEGER,
+    touched_at        TEXT NOT NULL
+)
+"""
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS follow_queue (
+    login      TEXT PRIMARY KEY,
+    score      REAL NOT NULL,
+    queued_at  TEXT NOT NULL
+)
+"""
+
+# Columns added after the first release, created on open in older cache files
+ADDED_COLUMNS = {"repos_sig": "TEXT", "followers": "INTEGER", "following": "INTEGER"}
+
+
+def cache_path():
+    """Cache location, overridable with USER_CACHE_PATH (tests, local runs)."""
+    return Path(os.getenv("USER_CACHE_PATH") or DEFAULT_PATH)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _parse(ts):
+    return datetime.fromisoformat(ts) if ts else None
+
+
+def _fresh(checked, ttl, now):
+    checked = _parse(checked)
+    return checked is not None and now - checked < ttl
+
+
+class UserCache:
+    """
+    SQLite-backed cache keyed by lowercase login.
+    Getters return None when nothing fresh is cached, so callers fall back to the API
+    and store the answer with the matching setter. Safe to share between threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(SCHEMA)
+        self._db.execute(QUEUE_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(users)")}
+        for name, kind in ADDED_COLUMNS.items():
+            if name not in columns:
+                self._db.execute(f"ALTER TABLE users ADD COLUMN {name} {kind}")
+        self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # — reads —
+
+    def _row(self, login):
+        with self._lock:
+            return self._db.execute(
+                "SELECT * FROM users WHERE login = ?", (login.lower(),)
+            ).fetchone()
+
+    def exists(self, login, now=None):
+        """True/False if a fresh existence verdict is cached, else None."""
+        row = self._row(login)
+        if row is None or row["exists_flag"] is None:
+            return None
+        now = now or _now()
+        ttl = EXISTS_TTL if row["exists_flag"] else MISSING_TTL
+        return bool(row["exists_flag"]) if _fresh(row["exists_checked"], ttl, now) else None
+
+    def last_event(self, login, now=None):
+        """
+        (True, datetime-or-None) if the last-event lookup is fresh, else (False, None).
+        A fresh None means the user had no public events at all.
+        """
+        row = self._row(login)
+        if row is None or not _fresh(row["activity_checked"], ACTIVITY_TTL, now or _now()):
+            return False, None
+        return True, _parse(row["last_event_at"])
+
+    def repos(self, login, signature=None, now=None):
+        """
+        Cached list of starrable repo full names, or None when stale/unknown.
+        With a `signature` (e.g. the user's public_repos count and updated_at) the list is
+        valid exactly as long as the signature it was stored with matches, regardless of age.
+        """
+        row = self._row(login)
+        if row is None or row["repos"] is None:
+            return None
+        if signature is not None:
+            if row["repos_sig"] != json.dumps(signature, default=str):
+                return None
+        elif not _fresh(row["repos_checked"], REPOS_TTL, now or _now()):
+            return None
+        return json.loads(row["repos"])
+
+    def profile(self, login):
+        """(followers, following) counts last seen for `login`, (None, None) if unknown."""
+        row = self._row(login)
+        return (row["followers"], row["following"]) if row else (None, None)
+
+    # — writes —
+
+    def _upsert(self, login, **fields):
+        now = _now().isoformat()
+        fields["touched_at"] = now
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in fields)
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO users (login, {cols}) VALUES (?, {marks}) "
+                f"ON CONFLICT(login) DO UPDATE SET {updates}",
+                (login.lower(), *fields.values()),
+            )
+            self._pending += 1
+            if self._pending >= 100:
+                self._db.commit()
+                self._pending = 0
+
+    def set_exists(self, login, exists):
+        self._upsert(login, exists_flag=int(bool(exists)), exists_checked=_now().isoformat())
+
+    def set_last_event(self, login, last_event_at):
+        """Record the newest public event time (None = no events); implies the user exists."""
+        now = _now().isoformat()
+        self._upsert(
+            login,
+            exists_flag=1,
+            exists_checked=now,
+            last_event_at=last_event_at.isoformat() if last_event_at else None,
+            activity_checked=now,
+        )
+
+    def set_repos(self, login, repo_names, signature=None):
+        self._upsert(
+            login,
+            exists_flag=1,
+            exists_checked=_now().isoformat(),
+            repos=json.dumps(list(repo_names)),
+            repos_checked=_now().isoformat(),
+            repos_sig=json.dumps(signature, default=str) if signature is not None else None,
+        )
+
+    def forget_repos(self, login):
+        """Invalidate the repo list, e.g. after starring one of its entries failed."""
+        self._upsert(login, repos=None, repos_checked=None, repos_sig=None)
+
+    def set_profile(self, login, followers, following):
+        self._upsert(login, followers=followers, following=following)
+
+    # — follow queue —
+
+    def enqueue(self, login, score):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO follow_queue (login, score, queued_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(login) DO UPDATE SET score = excluded.score, queued_at = excluded.queued_at",
+                (login.lower(), score, _now().isoformat()),
+            )
+
+    def dequeue(self, login):
+        with self._lock:
+            self._db.execute("DELETE FROM follow_queue WHERE login = ?", (login.lower(),))
+
+    def queued(self, now=None):
+        """Queued (login, score) pairs, best first; entries older than QUEUE_TTL are dropped."""
+        cutoff = ((now or _now()) - QUEUE_TTL).isoformat()
+        with self._lock:
+            self._db.execute("DELETE FROM follow_queue WHERE queued_at < ?", (cutoff,))
+            return [tuple(r) for r in self._db.execute(
+                "SELECT login, score FROM follow_queue ORDER BY score DESC, login")]
+
+    # — maintenance —
+
+    def evict(self, now=None):
+        """Drop rows not touched within EVICT_AFTER; returns the number removed."""
+        cutoff = ((now or _now()) - EVICT_AFTER).isoformat()
+        with self._lock:
+            cur = self._db.execute("DELETE FROM users WHERE touched_at < ?", (cutoff,))
+            self._db.commit()
+            return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+        self.evict()
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+            self._db = None
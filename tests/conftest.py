@@ -1,10 +1,17 @@
 # tests/conftest.py
 # tests/conftest.py
+import sys
 import pytest
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent
 CONFIG_DIR   = PROJECT_ROOT / "config"
+SCRIPTS_DIR  = PROJECT_ROOT / "scripts"
+
+# scripts import their shared helpers (usercache, ...) as top-level modules,
+# exactly as they do when run as `python scripts/<name>.py`
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
 
 @pytest.fixture(scope="function")
 def patch_config():
@@ -41,3 +48,17 @@ def patch_config():
         white_file.unlink(missing_ok=True)
         bak_user.rename(user_file)
         bak_white.rename(white_file)
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Keep caches and state written by the scripts out of the working tree, and skip pacing."""
+    monkeypatch.setenv("USER_CACHE_PATH", str(tmp_path / "user_cache.sqlite"))
+    monkeypatch.setenv("WRITE_INTERVAL", "0")  # no mutation pacing against dummies
+    monkeypatch.setenv("UNFOLLOW_QUEUE_PATH", str(tmp_path / "unfollow_queue.json"))
+    monkeypatch.setenv("FOLLOW_SNAPSHOT_PATH", str(tmp_path / "follow_snapshot.json"))
+    monkeypatch.setenv("USERNAME_CORPUS_PATH", str(tmp_path / "usernames.corpus"))
+    monkeypatch.setenv("FOLLOW_LEDGER_PATH", str(tmp_path / "follow_ledger.sqlite"))
+    monkeypatch.setenv("INTEGRITY_CHECKPOINT_PATH", str(tmp_path / "integrity_checkpoint.json"))
+    monkeypatch.setenv("METRICS_PATH", str(tmp_path / "metrics.jsonl"))
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    return tmp_path
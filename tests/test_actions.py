@@ -0,0 +1,44 @@
+# tests/test_actions.py
+import io
+
+from actions import Actions
+from ghclient import Client
+
+
+class FakeRequester:
+    def __init__(self):
+        self.calls = []
+
+    def requestJsonAndCheck(self, verb, url):
+        self.calls.append((verb, url))
+        return {}, None
+
+
+class FakeGithub:
+    def __init__(self):
+        self.requester = FakeRequester()
+
+    def get_user(self, *args):
+        raise AssertionError("actions must not fetch users")
+
+    def get_repo(self, *args):
+        raise AssertionError("actions must not fetch repos")
+
+
+def test_one_request_per_action_and_counted():
+    gh = FakeGithub()
+    client = Client(gh)
+    actions = Actions(client)
+
+    actions.star("ann/tool")
+    actions.unstar("ann/tool")
+    actions.follow("bob")
+    actions.unfollow("bob")
+
+    assert gh.requester.calls == [
+        ("PUT", "/user/starred/ann/tool"), ("DELETE", "/user/starred/ann/tool"),
+        ("PUT", "/user/following/bob"), ("DELETE", "/user/following/bob"),
+    ]
+    out = io.StringIO()
+    client.report(file=out)
+    assert "mutations: follow=1 star=1 unfollow=1 unstar=1" in out.getvalue()
@@ -0,0 +1,41 @@
+# tests/test_bench.py
+from importlib import util
+from pathlib import Path
+
+def load_script(path):
+    project_root = Path(__file__).parent.parent
+    full_path = project_root / path
+    spec = util.spec_from_file_location(full_path.stem, full_path)
+    mod = util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+bench = load_script(Path("bench/run.py"))
+
+def result(**overrides):
+    r = {"exit": 0, "wall_s": 2.0, "peak_rss_mb": 40.0, "requests": 100, "mutations": 5,
+         "endpoints": {}, "state_bytes": 1000}
+    r.update(overrides)
+    return r
+
+def test_thresholds_from_run_pass_and_catch_regressions():
+    thresholds = bench.thresholds_from({"small": {"gitgrow": result(), "integrity": result(exit=1)}})
+    assert thresholds == {"small": {"gitgrow": {
+        "requests": 126, "wall_s": 4.0, "peak_rss_mb": 61, "state_bytes": 1501,
+    }}}  # Failed scripts get no limits
+    assert bench.check({"small": {"gitgrow": result()}}, thresholds) == []
+
+    failures = bench.check({"small": {"gitgrow": result(requests=200)}}, thresholds)
+    assert failures == ["small/gitgrow: requests 200 > 126"]
+    assert bench.check({"small": {"gitgrow": result(exit=1)}}, thresholds) == ["small/gitgrow: exited with 1"]
+    assert bench.check({"medium": {"gitgrow": result(requests=10**6)}}, thresholds) == []  # Not benchmarked
+    assert bench.check({"small": {"integrity": result(exit=1)}}, thresholds) == ["small/integrity: exited with 1"]
+
+def test_world_and_corpus_match():
+    world, lines = bench.build_world("small")
+    spec = bench.SIZES["small"]
+    assert len(world.followers) == spec["followers"]
+    assert len({l.lower() for l in lines}) == spec["corpus"]
+    gone = [l for l in lines if l.startswith("gone")]
+    assert gone and all(not world.exists(l) for l in gone)
+    assert all(world.exists(l) for l in lines if not l.startswith("gone"))
@@ -1,5 +1,59 @@
 # tests/test_cleaner.py
-# Unit tests for cleaner.py are deferred due to performance issues.
-# The logic in cleaner.py is slow and requires optimization.
-# Tests will be implemented after refactoring cleaner.py.
-# TODO: Optimize cleaner.py, then add tests.
\ No newline at end of file
+from datetime import datetime, timedelta, timezone
+
+import cleaner
+
+
+def write(path, names):
+    path.write_text("\n".join(names) + "\n")
+    return path
+
+
+def test_dedupe_keeps_first_casing_and_order_across_runs(tmp_path):
+    users = write(tmp_path / "usernames.txt", ["Zed", "alice", "", "ZED", "bob", "Alice", "carol", "zed"])
+    dups = tmp_path / "dups.txt"
+
+    kept, duplicates, missing = cleaner.clean(users, duplicates_log=dups, chunk=2)  # Forces on-disk runs
+
+    assert (kept, duplicates, missing) == (4, 3, 0)
+    assert users.read_text().split() == ["Zed", "alice", "bob", "carol"]
+    assert sorted(dups.read_text().split()) == ["Alice", "ZED", "zed"]
+
+
+def test_drops_missing_and_can_sort(tmp_path):
+    users = write(tmp_path / "usernames.txt", ["dave", "Bob", "alice", "bob"])
+    logs = tmp_path / "integrity"
+    logs.mkdir()
+    write(logs / "sweep-missing-20240101000000.txt", ["ALICE"])
+
+    now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    kept, duplicates, missing = cleaner.clean(users, cleaner.load_missing(logs, now=now), keep_order=False, chunk=3)
+
+    assert (kept, duplicates, missing) == (2, 1, 1)
+    assert users.read_text().split() == ["Bob", "dave"]
+
+
+def test_only_recent_missing_logs_count(tmp_path):
+    logs = tmp_path / "integrity"
+    logs.mkdir()
+    write(logs / "missing-20240101000000-0-100.txt", ["old"])
+    write(logs / "missing-20240110000000-100-200.txt", ["New"])
+
+    now = datetime(2024, 1, 10, tzinfo=timezone.utc) + timedelta(days=1)
+    assert cleaner.load_missing(logs, now=now) == {"new"}
+
+
+def test_clean_file_is_left_untouched(tmp_path):
+    users = write(tmp_path / "usernames.txt", ["a", "b"])
+    before = users.stat().st_mtime_ns
+
+    assert cleaner.clean(users, chunk=1) == (2, 0, 0)
+    assert users.stat().st_mtime_ns == before
+    assert not (tmp_path / "usernames.txt.tmp").exists()
+
+
+def test_dry_run_only_counts(tmp_path):
+    users = write(tmp_path / "usernames.txt", ["a", "A", "b"])
+
+    assert cleaner.clean(users, chunk=1, dry_run=True) == (2, 1, 0)
+    assert users.read_text().split() == ["a", "A", "b"]
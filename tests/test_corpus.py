@@ -0,0 +1,23 @@
+# tests/test_corpus.py
+import os
+import random
+
+from corpus import load_corpus, compiled_path
+
+def test_compiles_sorted_lowercase_and_rebuilds_when_stale(tmp_path):
+    source = tmp_path / "usernames.txt"
+    source.write_text("Zed\nalice\n\nALICE\nbob\n")
+    corpus = load_corpus(source)
+
+    assert list(corpus) == ["alice", "bob", "zed"]
+    assert "Alice" in corpus and "zed" in corpus and "carol" not in corpus
+    assert corpus[-1] == "zed"
+    assert sorted(corpus.sample(2, random.Random(1))) in (["alice", "bob"], ["alice", "zed"], ["bob", "zed"])
+    assert sorted(corpus.shuffled()) == ["alice", "bob", "zed"]
+    corpus.close()
+
+    source.write_text("carol\n")
+    os.utime(source, ns=(0, 1))  # definitely a different mtime
+    with load_corpus(source) as corpus:
+        assert list(corpus) == ["carol"]
+    assert compiled_path(source).exists()
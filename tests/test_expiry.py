@@ -0,0 +1,37 @@
+# tests/test_expiry.py
+from datetime import datetime, timezone
+
+import expiry
+from journal import Journal
+from statestore import StateStore
+
+NOW = datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+
+
+def test_index_is_built_once_and_only_due_buckets_are_read(tmp_path):
+    store = StateStore(tmp_path / "state.sqlite", tmp_path / "state.json")
+    store.section("growth_starred").put("old", [{"repo": "old/x", "starred_at": "2025-03-01T08:00:00+00:00"}])
+    store.section("growth_starred").put("today", [{"repo": "today/x", "starred_at": "2025-03-06T20:00:00Z"}])
+    store.section("growth_starred").put("new", [{"repo": "new/x", "starred_at": "2025-03-09T00:00:00+00:00"}])
+    store.section("growth_starred").put("legacy", [{"repo": "legacy/x", "starred_at": None}])
+
+    assert expiry.ensure(store) == 4
+    assert expiry.ensure(store) == 0  # already built
+    assert expiry.due(store, NOW) == [
+        ("0001-01-01", "legacy", "legacy/x"), ("2025-03-05", "old", "old/x"), ("2025-03-10", "today", "today/x"),
+    ]
+    assert expiry.expires_at("2025-03-06T20:00:00Z") > NOW  # in today's bucket but not due yet
+
+
+def test_journal_keeps_the_index_in_step(tmp_path):
+    store = StateStore(tmp_path / "state.sqlite", tmp_path / "state.json")
+    journal = Journal(tmp_path / "actions.journal")
+    journal.record("growth_star", "ann", "ann/x", at="2025-03-01T00:00:00+00:00")
+    journal.replay(store)
+    assert expiry.due(store, NOW) == [("2025-03-05", "ann", "ann/x")]
+
+    journal.record("growth_unstar", "ann", "ann/x", at=NOW.isoformat())
+    journal.replay(store)
+    assert expiry.due(store, NOW) == []
+    assert len(store.section("growth_expiry")) == 0
+    journal.close()
@@ -0,0 +1,100 @@
+# tests/test_fakegithub.py
+import pytest
+import requests
+from importlib import util
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+import fakegithub
+import ghclient
+
+def load_script(path):
+    project_root = Path(__file__).parent.parent
+    full_path = project_root / path
+    spec = util.spec_from_file_location(full_path.stem, full_path)
+    mod = util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def recent():
+    at = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return [{"id": "1", "type": "PushEvent", "created_at": at}]
+
+@pytest.fixture
+def server(monkeypatch):
+    world = fakegithub.World(
+        me="me",
+        followers=["sotiris", "zakaria"],
+        following=["sotiris", "zakaria"],
+        missing=["dne"],
+        users={"irene": {"events": recent()}, "guadalupe": {"events": recent()}},
+    )
+    srv = fakegithub.serve(world)
+    monkeypatch.setenv("PAT_TOKEN", "fake")
+    monkeypatch.setenv("GITHUB_API_URL", srv.url)
+    monkeypatch.delenv("DRY_RUN", raising=False)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def test_gitgrow_against_fake_server(server, patch_config, capsys):
+    load_script(Path("scripts/gitgrow.py")).main()
+
+    assert set(server.world.following) == {"sotiris", "zakaria", "irene", "guadalupe"}
+    assert server.mutations == 2
+    out = capsys.readouterr().out
+    assert "[FOLLOWED] irene" in out
+    assert "[RATE] budget core:" in out  # learned from the fake's X-RateLimit headers
+
+def test_dry_run_sends_no_mutations(server, patch_config, monkeypatch, capsys):
+    monkeypatch.setenv("DRY_RUN", "1")
+    load_script(Path("scripts/gitgrow.py")).main()
+
+    assert server.mutations == 0
+    assert list(server.world.following) == ["sotiris", "zakaria"]
+    out = capsys.readouterr().out
+    assert "[DRY-RUN] would follow irene" in out
+    assert "[RATE] mutations (dry run, not sent): follow=2" in out
+    assert server.requests > 0  # reads still happen
+
+def test_pagination_etags_and_rate_limit(monkeypatch):
+    world = fakegithub.World(me="me", followers=[f"user{i:03d}" for i in range(250)])
+    srv = fakegithub.serve(world, rate_limit=1000)
+    try:
+        monkeypatch.setenv("GITHUB_API_URL", srv.url)
+        client = ghclient.connect("fake")
+        me = client.gh.get_user()
+        assert len(list(me.get_followers())) == 250  # followed the Link headers across pages
+        assert client.budgets["core"][0] == 1000 - srv.requests
+
+        status, etag, data = client.conditional_get("/user/followers", {"per_page": 100})
+        assert status == 200 and len(data) == 100
+        spent = srv.remaining
+        assert client.conditional_get("/user/followers", {"per_page": 100}, etag)[0] == 304
+        assert srv.remaining == spent  # unchanged pages are free, as on GitHub
+
+        srv.remaining = 0
+        r = requests.get(f"{srv.url}/user")
+        assert r.status_code == 403
+        assert r.headers["X-RateLimit-Remaining"] == "0"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+def test_autounstarback_keeps_deferred_star_backs_queued(server, tmp_path, monkeypatch):
+    import statestore, journal, stargazers
+    monkeypatch.setattr(statestore, "DB_PATH", tmp_path / "state.sqlite")
+    monkeypatch.setattr(statestore, "JSON_PATH", tmp_path / "state.json")
+    monkeypatch.setattr(journal, "JOURNAL_PATH", tmp_path / "actions.journal")
+    with statestore.StateStore() as store:
+        # alice was past autostarback's budget, bob's star failed and is up for retry
+        store.section("reciprocity").put("alice", {"starred_by": ["me/a", "me/b"], "starred_back": []})
+        store.section("reciprocity").put("bob", {"starred_by": ["me/a"], "starred_back": []})
+        store.set("pending_reciprocity", ["alice", "bob"])
+
+    load_script(Path("scripts/autounstarback.py")).main()
+
+    with statestore.StateStore() as store:
+        reciprocity = dict(store.section("reciprocity").items())
+    assert reciprocity["alice"]["last_unbalanced_attempt"]  # Still stamped as before
+    assert stargazers.pending_queue(reciprocity, ["alice", "bob"]) == ["alice", "bob"]
@@ -0,0 +1,62 @@
+# tests/test_ghclient.py
+import time
+import pytest
+from github import GithubException
+
+import ghclient
+from ghclient import Client, BudgetExhausted
+
+class Throttled(GithubException):
+    def __init__(self, retry_after):
+        super().__init__(403, {"message": "You have exceeded a secondary rate limit"},
+                         headers={"retry-after": str(retry_after)})
+
+@pytest.fixture
+def client(monkeypatch):
+    c = Client(gh=None)
+    c.write_interval = 0
+    slept = []
+    monkeypatch.setattr(c, "_sleep", lambda s: slept.append(s))
+    c.slept = slept
+    return c
+
+def test_secondary_limit_is_retried_after_retry_after(client):
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Throttled(7)
+        return "ok"
+    assert client.write(flaky) == "ok"
+    assert client.slept == [7.0]
+    assert client.retries == 1
+
+def test_plain_forbidden_is_not_retried(client):
+    def blocked():
+        raise GithubException(403, {"message": "blocked"}, headers={})
+    with pytest.raises(GithubException):
+        client.write(blocked)
+    assert client.retries == 0
+
+def test_low_budget_defers_when_reset_is_far(client):
+    client._observe("GET", "/users/x", 200, {
+        "x-ratelimit-resource": "core", "x-ratelimit-remaining": "3",
+        "x-ratelimit-limit": "5000", "x-ratelimit-reset": str(int(time.time()) + 3600),
+    })
+    with pytest.raises(BudgetExhausted):
+        client.read(lambda: None)
+
+def test_requests_are_counted_per_phase(client):
+    with client.phase("follow"):
+        client._observe("GET", "/users/x", 200, {})
+        client._observe("PUT", "/user/following/x", 204, {})
+    assert client._phases["follow"]["requests"] == 2
+    assert client._phases["follow"]["writes"] == 1
+
+def test_hourly_mutation_cap(client, monkeypatch):
+    monkeypatch.setattr(ghclient, "WRITES_PER_MINUTE", 10_000)
+    monkeypatch.setattr(ghclient, "WRITES_PER_HOUR", 3)
+    for _ in range(3):
+        client.write(lambda: None)
+    with pytest.raises(BudgetExhausted):
+        client.write(lambda: None)
@@ -2,6 +2,7 @@
 import pytest
 from importlib import util
 from pathlib import Path
+from datetime import datetime, timezone
 from github import GithubException
 
 def load_script(path):
@@ -12,8 +13,13 @@ def load_script(path):
     spec.loader.exec_module(mod)
     return mod
 
+class DummyEvent:
+    def __init__(self): self.created_at = datetime.now(timezone.utc)
+
 class DummyUser:
     def __init__(self, login): self.login = login
+    # every candidate looks active, the activity filter is exercised separately
+    def get_events(self): return [DummyEvent()]
 
 class DummyMe:
     def __init__(self):
@@ -47,7 +53,7 @@ def fake_github(monkeypatch):
     # fake token + patch Github()
     monkeypatch.setenv("PAT_TOKEN", "fake")
     me = DummyMe()
-    monkeypatch.setattr("github.Github", lambda token: DummyGithub(me))
+    monkeypatch.setattr("github.Github", lambda token, **kwargs: DummyGithub(me))
     return me
 
 def test_gitgrow_follow_and_back(fake_github, patch_config, capsys):
@@ -67,3 +73,40 @@ def test_gitgrow_follow_and_back(fake_github, patch_config, capsys):
     assert "[FOLLOWED] guadalupe" in out
     # no follow-back because followers == following
     assert "[FOLLOW-BACKED]" not in out
+
+def test_gitgrow_stops_at_per_run(fake_github, patch_config, monkeypatch):
+    monkeypatch.setenv("FOLLOWERS_PER_RUN", "1")
+    monkeypatch.setenv("PROBE_WORKERS", "2")
+    bot = load_script(Path("scripts/gitgrow.py"))
+    bot.main()
+
+    # exactly one qualified candidate gets followed, probing stops there
+    assert len(fake_github.added) == 1
+    assert fake_github.added[0] in {"irene", "guadalupe"}
+
+def test_gitgrow_follows_best_queued_candidate_first(fake_github, patch_config, monkeypatch):
+    from usercache import UserCache
+    from ledger import FollowLedger
+    with UserCache() as cache:
+        cache.enqueue("zed", 0.9)  # scored by an earlier run
+    monkeypatch.setenv("FOLLOWERS_PER_RUN", "1")
+    bot = load_script(Path("scripts/gitgrow.py"))
+    bot.main()
+
+    assert fake_github.added == ["zed"]
+    with UserCache() as cache:
+        queued = dict(cache.queued())
+        assert "zed" not in queued
+        assert set(queued) == {"irene", "guadalupe"}  # newly scored, kept for the next run
+    with FollowLedger() as ledger:
+        assert [r["login"] for r in ledger.rows()] == ["zed"]
+
+def test_gitgrow_does_not_follow_back_someone_just_followed(fake_github, patch_config):
+    from ledger import FollowLedger
+    fake_github._followers.append(DummyUser("irene"))
+    bot = load_script(Path("scripts/gitgrow.py"))
+    bot.main()
+
+    assert fake_github.added.count("irene") == 1
+    with FollowLedger() as ledger:
+        assert {r["login"]: r["source"] for r in ledger.rows()}["irene"] == "follow"
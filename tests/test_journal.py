@@ -0,0 +1,29 @@
+# tests/test_journal.py
+from journal import Journal
+from statestore import StateStore
+
+def test_replay_applies_actions_once_and_truncates(tmp_path):
+    store = StateStore(tmp_path / "state.sqlite", tmp_path / "state.json")
+    store.section("reciprocity").put("ann", {"starred_by": ["me/a"], "starred_back": []})
+    store.section("growth_starred").put("bob", [{"repo": "bob/x", "starred_at": "2025-01-01T00:00:00+00:00"}])
+
+    journal = Journal(tmp_path / "actions.journal")
+    journal.record("star_back", "ann", "ann/x")
+    journal.record("growth_unstar", "bob", "bob/x", at="2025-01-09T00:00:00+00:00")
+    journal.record("growth_star", "cid", "cid/y")
+    with open(journal.path, "a") as f:
+        f.write('{"action": "star_b')  # torn write from a killed run
+
+    assert journal.replay(store) == 3
+    assert store.section("reciprocity").get("ann")["starred_back"] == ["ann/x"]
+    assert "bob" not in store.section("growth_starred")
+    assert store.section("unresponsive").get("bob")[0]["unstarred_at"] == "2025-01-09T00:00:00+00:00"
+    assert store.section("growth_starred").get("cid")[0]["repo"] == "cid/y"
+    assert (tmp_path / "state.json").exists()
+    assert journal.entries() == []
+
+    # Replaying an action the store already reflects changes nothing
+    journal.record("star_back", "ann", "ann/x")
+    journal.replay(store)
+    assert store.section("reciprocity").get("ann")["starred_back"] == ["ann/x"]
+    journal.close()
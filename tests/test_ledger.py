@@ -0,0 +1,25 @@
+# tests/test_ledger.py
+import io
+from datetime import datetime, timedelta, timezone
+
+from ledger import FollowLedger, report
+
+T0 = datetime(2025, 3, 3, tzinfo=timezone.utc)  # a Monday
+
+def test_conversion_report(tmp_path):
+    ledger = FollowLedger(tmp_path / "ledger.sqlite")
+    for login in ("a", "b", "c", "d"):
+        ledger.record_follow(login, "follow", now=T0)
+    ledger.record_follow("fan", "follow-back", now=T0)
+    ledger.observe_followers({"a", "fan"}, now=T0 + timedelta(days=1))
+    ledger.observe_followers({"a", "b"}, now=T0 + timedelta(days=3))
+    ledger.record_unfollow("d", now=T0 + timedelta(days=8))
+
+    out = io.StringIO()
+    s = report(ledger, file=out)
+    assert (s["follows"], s["followed_back"], s["unfollowed"], s["follow_backs_given"]) == (4, 2, 1, 1)
+    assert s["rate"] == 0.5
+    assert s["days_to_follow_back"] == {"p50": 3.0, "p90": 3.0}
+    assert "conversion=50.0%" in out.getvalue()
+    assert ledger.in_grace("a", timedelta(days=7), now=T0 + timedelta(days=2))
+    assert not ledger.in_grace("d", timedelta(days=7), now=T0 + timedelta(days=2))  # unfollowed
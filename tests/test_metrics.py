@@ -0,0 +1,78 @@
+# tests/test_metrics.py
+import json
+from importlib import util
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+import metrics
+import fakegithub
+
+def load_script(path):
+    project_root = Path(__file__).parent.parent
+    full_path = project_root / path
+    spec = util.spec_from_file_location(full_path.stem, full_path)
+    mod = util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def test_endpoint_names_fold_logins_and_repos():
+    assert metrics.endpoint("GET", "https://api.github.com/users/octocat/events?page=2") == "GET /users/{login}/events"
+    assert metrics.endpoint("PUT", "/user/starred/octo/cat") == "PUT /user/starred/{repo}"
+    assert metrics.endpoint("DELETE", "/user/following/octocat") == "DELETE /user/following/{login}"
+    assert metrics.endpoint("GET", "https://ghe.example/api/v3/repos/o/r/stargazers") == "GET /repos/{repo}/stargazers"
+    assert metrics.endpoint("GET", "/user/followers") == "GET /user/followers"
+
+def test_records_and_emit(tmp_path):
+    run = metrics.Metrics("demo")
+    run.request("GET", "/user", 200)
+    with run.phase("fetch"):
+        run.request("GET", "/users/a", 200)
+        run.request("GET", "/users/b", 404)
+        run.count("probe.notfound")
+    run.retry()
+    run.slept(1.5)
+
+    summary = tmp_path / "summary.md"
+    run.emit(tmp_path / "m.jsonl", summary)
+    lines = [json.loads(l) for l in (tmp_path / "m.jsonl").read_text().splitlines()]
+    assert {l["script"] for l in lines} == {"demo"}
+    assert lines[0]["type"] == "run"
+    assert (lines[0]["requests"], lines[0]["retries"], lines[0]["sleep_s"]) == (3, 1, 1.5)
+    phases = {l["phase"]: l for l in lines if l["type"] == "phase"}
+    assert phases["fetch"]["requests"] == 2 and phases["fetch"]["runs"] == 1
+    api = {(l["phase"], l["endpoint"], l["status"]): l["calls"] for l in lines if l["type"] == "api"}
+    assert api == {("setup", "GET /user", 200): 1, ("fetch", "GET /users/{login}", 200): 1,
+                   ("fetch", "GET /users/{login}", 404): 1}
+    assert [(l["phase"], l["name"], l["value"]) for l in lines if l["type"] == "counter"] == [
+        ("fetch", "probe.notfound", 1)]
+    text = summary.read_text()
+    assert "### demo" in text and "| fetch |" in text and "| `GET /users/{login}` | 404 | 1 |" in text
+
+def test_gitgrow_run_emits_metrics(patch_config, isolated_state, monkeypatch):
+    at = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    active = {"events": [{"id": "1", "type": "PushEvent", "created_at": at}]}
+    world = fakegithub.World(me="me", followers=["sotiris", "zakaria"], following=["sotiris", "zakaria"],
+                             missing=["dne"], users={"irene": active, "guadalupe": active})
+    srv = fakegithub.serve(world)
+    summary = isolated_state / "step_summary.md"
+    try:
+        monkeypatch.setenv("PAT_TOKEN", "fake")
+        monkeypatch.setenv("GITHUB_API_URL", srv.url)
+        monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+        load_script(Path("scripts/gitgrow.py")).main()
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    lines = [json.loads(l) for l in (isolated_state / "metrics.jsonl").read_text().splitlines()]
+    assert {l["script"] for l in lines} == {"gitgrow"}
+    phases = [l["phase"] for l in lines if l["type"] == "phase"]
+    assert {"load-state", "fetch-following", "fetch-followers", "score", "follow"} <= set(phases)
+    api = {(l["endpoint"], l["status"]) for l in lines if l["type"] == "api"}
+    assert ("PUT /user/following/{login}", 204) in api
+    assert ("POST /graphql", 200) in api
+    counters = {(l["phase"], l["name"]): l["value"] for l in lines if l["type"] == "counter"}
+    assert counters[("score", "probe.notfound")] == 1  # dne
+    assert counters[("follow", "mutations.follow")] >= 1
+    assert lines[0]["requests"] == srv.requests
+    assert "### gitgrow" in summary.read_text()
@@ -0,0 +1,84 @@
+# tests/test_resolver.py
+from datetime import datetime, timezone
+
+from github import GithubException
+from ghclient import Unsupported
+import resolver
+
+
+class ProfileClient:
+    """Answers aliased profile queries from canned repositoryOwner nodes."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.queries = []
+        self.gh = self
+
+    def graphql(self, query, variables):
+        self.queries.append((query, variables))
+        data, errors = {}, []
+        for var, login in variables.items():
+            if not var.startswith("l"):
+                continue
+            alias = "u" + var[1:]
+            data[alias] = self.nodes.get(login)
+            if data[alias] is None:
+                errors.append({"type": "NOT_FOUND", "path": [alias]})
+        return {"data": data, "errors": errors}
+
+
+def user_node(login, pushed="2024-05-01T10:00:00Z", contributed=None):
+    days = [{"date": "2024-05-02", "contributionCount": 0}]
+    if contributed:
+        days.append({"date": contributed, "contributionCount": 3})
+    return {
+        "login": login, "__typename": "User",
+        "repositories": {"nodes": [{"nameWithOwner": f"{login}/tool", "pushedAt": pushed}]},
+        "followers": {"totalCount": 12}, "following": {"totalCount": 40},
+        "contributionsCollection": {"contributionCalendar": {"weeks": [{"contributionDays": days}]}},
+    }
+
+
+def test_profiles_parse_counts_repos_and_latest_activity():
+    client = ProfileClient({
+        "ann": user_node("ann", contributed="2024-05-20"),
+        "acme": {"login": "acme", "__typename": "Organization", "repositories": {"nodes": []}},
+    })
+    result = resolver.profiles(client, ["ann", "acme", "ghost"], repos=1)
+
+    assert len(client.queries) == 1
+    _, variables = client.queries[0]
+    assert variables["repos"] == 1 and "since" in variables
+    ann = result["ann"]
+    assert (ann.type, ann.followers, ann.following, ann.repos) == ("User", 12, 40, ["ann/tool"])
+    assert ann.last_active == datetime(2024, 5, 20, tzinfo=timezone.utc)  # contribution newer than push
+    assert result["acme"].type == "Organization" and result["acme"].followers is None
+    assert result["acme"].last_active is None
+    assert result["ghost"] is False
+
+
+def test_profiles_fall_back_to_rest_without_graphql():
+    class Event:
+        created_at = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    class Repo:
+        def __init__(self, name, fork):
+            self.full_name, self.fork, self.private = name, fork, False
+
+    class User:
+        login, type, followers, following = "bob", "User", 3, 9
+        def get_events(self): return [Event()]
+        def get_repos(self, sort=None): return [Repo("bob/fork", True), Repo("bob/app", False)]
+
+    class RestOnly:
+        def __init__(self): self.gh = self
+        def graphql(self, query, variables): raise Unsupported("no GraphQL")
+        def read(self, fn, *args, **kwargs): return fn(*args, **kwargs)
+        def get_user(self, login):
+            if login != "bob":
+                raise GithubException(404, {"message": "Not Found"}, None)
+            return User()
+
+    result = resolver.profiles(RestOnly(), ["bob", "nobody"], repos=2)
+    assert result["bob"] == resolver.Profile("bob", "User", 3, 9, Event.created_at, ["bob/app"])
+    assert result["nobody"] is False
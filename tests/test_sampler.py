@@ -0,0 +1,19 @@
+# tests/test_sampler.py
+import random
+
+from sampler import Sampler, sample_rng, sparse_permutation
+
+def test_sparse_permutation_is_a_permutation():
+    assert sorted(sparse_permutation(1000, random.Random(3))) == list(range(1000))
+
+def test_sampler_excludes_and_is_reproducible_with_seed():
+    population = [f"user{i}" for i in range(50)]
+    excluded = {f"user{i}" for i in range(0, 50, 2)}
+
+    first = Sampler(population, exclude=(excluded, set()), rng=sample_rng(42)).take(10)
+    again = Sampler(population, exclude=(excluded,), rng=sample_rng("42")).take(10)
+    assert first == again
+    assert len(set(first)) == 10 and not set(first) & excluded
+
+    everything = Sampler(population, exclude=(excluded,)).take(100)
+    assert sorted(everything) == sorted(set(population) - excluded)
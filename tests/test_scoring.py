@@ -0,0 +1,30 @@
+# tests/test_scoring.py
+from datetime import datetime, timedelta, timezone
+
+import scoring
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+def test_cohort_rates_use_only_settled_follows():
+    old, fresh = (NOW - timedelta(days=10)).isoformat(), (NOW - timedelta(hours=1)).isoformat()
+    def row(login, followed_at, back, source="follow"):
+        return {"login": login, "source": source, "followed_at": followed_at,
+                "followed_back_at": followed_at if back else None, "unfollowed_at": None}
+    rows = [
+        row("a", old, True), row("b", old, True), row("c", old, False),  # fans, a and b followed back
+        row("d", old, False),                                            # popular, didn't
+        row("e", fresh, True),                                           # too recent to judge
+        row("f", old, True, source="follow-back"),                       # reciprocal anyway
+    ]
+    profiles = {"a": (5, 50), "b": (7, 70), "c": (3, 30), "d": (500, 5), "e": (5, 50), "f": (500, 5)}
+    rates = scoring.cohort_rates(rows, profiles.get, now=NOW)
+    fan, star = scoring.cohort(5, 50), scoring.cohort(500, 5)
+    assert rates[fan] > scoring.PRIOR_RATE > rates[star]
+
+def test_score_prefers_recent_activity_and_good_cohorts():
+    rates = {scoring.cohort(5, 50): 0.6}
+    recent = scoring.score(NOW - timedelta(days=1), 5, 50, rates, now=NOW)
+    stale = scoring.score(NOW - timedelta(days=25), 5, 50, rates, now=NOW)
+    popular = scoring.score(NOW - timedelta(days=1), 5000, 10, rates, now=NOW)
+    assert recent > stale
+    assert recent > popular
@@ -0,0 +1,103 @@
+# tests/test_shoutouts.py
+from datetime import datetime, timedelta, timezone
+
+import shoutouts
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class FakeSession:
+    """Serves /repos/<repo> and /repos/<repo>/stargazers pages from a list, oldest first."""
+
+    def __init__(self, logins):
+        self.logins = logins
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url.rsplit("/", 1)[-1], (params or {}).get("page")))
+        if url.endswith("/stargazers"):
+            page = params["page"]
+            chunk = self.logins[(page - 1) * shoutouts.PER_PAGE:page * shoutouts.PER_PAGE]
+            body = [{"user": {"login": l}, "starred_at": "2024-01-01T00:00:00Z"} for l in chunk]
+        else:
+            body = {"stargazers_count": len(self.logins)}
+        return FakeResponse(body)
+
+
+class FakeResponse:
+    status_code = 200
+    def __init__(self, body): self.body = body
+    def raise_for_status(self): pass
+    def json(self): return self.body
+
+
+def test_incremental_sync_reads_only_the_newest_page():
+    known = [f"u{i}" for i in range(250)]
+    session = FakeSession(known + ["new1", "new2"])
+    sync = {"full_scan_at": (NOW - timedelta(days=1)).isoformat()}
+
+    current, sync = shoutouts.sync_stargazers(session, "o/r", set(known), sync, now=NOW)
+
+    assert current == set(known) | {"new1", "new2"}
+    assert session.requests == [("r", None), ("stargazers", 3)]
+    assert sync["full_scan_at"] == (NOW - timedelta(days=1)).isoformat()
+
+
+def test_unstar_triggers_full_scan():
+    known = {f"u{i}" for i in range(150)}
+    session = FakeSession(sorted(known - {"u7"}) + ["new1"])  # same count, but u7 left
+    sync = {"full_scan_at": (NOW - timedelta(days=1)).isoformat()}
+
+    current, sync = shoutouts.sync_stargazers(session, "o/r", known, sync, now=NOW)
+
+    assert "u7" not in current and "new1" in current
+    assert ("stargazers", 1) in session.requests
+    assert sync["full_scan_at"] == NOW.isoformat()
+
+
+def test_stale_or_missing_sync_state_does_a_full_scan():
+    session = FakeSession(["a", "b"])
+    current, sync = shoutouts.sync_stargazers(session, "o/r", {"a", "b"}, {}, now=NOW)
+    assert current == {"a", "b"}
+    assert session.requests == [("stargazers", 1)]
+
+
+def test_fresh_state_store_replaces_the_api(tmp_path, monkeypatch):
+    import statestore
+    monkeypatch.setattr(statestore, "DB_PATH", tmp_path / "state.sqlite")
+    monkeypatch.setattr(statestore, "JSON_PATH", tmp_path / "state.json")
+    store = statestore.StateStore()
+    with store.transaction():
+        store.section("repo_stargazers").put("o/r", {"a": None, "b": "2024-05-01T00:00:00+00:00"})
+        store.set("stargazer_delta", {"new": {}, "lost": {}, "synced_at": (NOW - timedelta(hours=3)).isoformat()})
+    store.close()
+
+    assert shoutouts.from_store("o/r", now=NOW)["stargazers"] == {"a", "b"}
+    assert shoutouts.from_store("o/other", now=NOW) is None
+    assert shoutouts.from_store("o/r", now=NOW + timedelta(days=2)) is None
+
+
+def test_store_is_read_without_creating_a_database(tmp_path, monkeypatch):
+    import json, statestore
+    monkeypatch.setattr(statestore, "DB_PATH", tmp_path / "state.sqlite")
+    monkeypatch.setattr(statestore, "JSON_PATH", tmp_path / "state.json")
+    synced_at = (NOW - timedelta(hours=3)).isoformat()
+    statestore.JSON_PATH.write_text(json.dumps({
+        "repo_stargazers": {"o/r": {"a": None, "c": None}},
+        "stargazer_delta": {"new": {"o/r": ["c"]}, "lost": {"o/r": ["b"]}, "since": "t1", "synced_at": synced_at},
+    }))
+
+    stored = shoutouts.from_store("o/r", now=NOW)
+
+    assert stored == {"stargazers": {"a", "c"}, "new": {"c"}, "lost": {"b"}, "since": "t1", "synced_at": synced_at}
+    assert not statestore.DB_PATH.exists()
+
+
+def test_delta_is_used_only_when_it_starts_from_the_last_announced_sync():
+    stored = {"stargazers": {"a", "c"}, "new": {"c"}, "lost": {"b"}, "since": "t1", "synced_at": "t2"}
+
+    # stars.json was written from sync t1: the delta is taken as is, the sets aren't compared
+    assert shoutouts.changes({"a", "c"}, {"a", "b", "stale"}, {"store_synced_at": "t1"}, stored) == ({"c"}, {"b"})
+    # A sync was missed, or the last run used the API: stars.json is diffed instead
+    assert shoutouts.changes({"a", "c"}, {"x"}, {"store_synced_at": "t0"}, stored) == ({"a", "c"}, {"x"})
+    assert shoutouts.changes({"a", "c"}, {"x"}, {}, stored) == ({"a", "c"}, {"x"})
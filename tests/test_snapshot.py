@@ -0,0 +1,33 @@
+# tests/test_snapshot.py
+from types import SimpleNamespace
+
+from snapshot import FollowSnapshot, PER_PAGE
+
+class FakeClient:
+    """Serves /user/followers pages with per-page ETags, answering 304 when they match."""
+    def __init__(self, logins):
+        self.logins = logins
+        self.calls = []
+
+    def conditional_get(self, url, parameters, etag):
+        page = parameters["page"]
+        chunk = self.logins[(page - 1) * PER_PAGE: page * PER_PAGE]
+        current = f'"{hash(tuple(chunk))}"'
+        self.calls.append((page, etag == current))
+        if etag == current:
+            return 304, etag, None
+        return 200, current, [{"login": login} for login in chunk]
+
+def test_unchanged_pages_are_served_from_snapshot(tmp_path):
+    me = SimpleNamespace(login="Me")
+    logins = [f"User{i}" for i in range(PER_PAGE + 5)]
+    client = FakeClient(logins)
+
+    first = FollowSnapshot(client, me, tmp_path / "snap.json").logins("followers")
+    assert first == {login.lower() for login in logins}
+
+    client.logins = logins + ["newbie"]  # only the last page changes
+    client.calls.clear()
+    second = FollowSnapshot(client, me, tmp_path / "snap.json").logins("followers")
+    assert "newbie" in second and len(second) == len(logins) + 1
+    assert client.calls == [(1, True), (2, False)]
@@ -0,0 +1,109 @@
+# tests/test_stargazers.py
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import stargazers
+
+NOW = datetime.now(timezone.utc)
+
+def ts(hours_ago):
+    return (NOW - timedelta(hours=hours_ago)).isoformat()
+
+def page(edges, cursor=None, total=None):
+    conn = {"pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+            "edges": [{"node": {"login": login}, "starredAt": at} for login, at in edges]}
+    if total is not None:
+        conn["totalCount"] = total
+    return conn
+
+class FakeGraphQL:
+    """Answers the overview query in two pages and the aliased follow-up query."""
+    def __init__(self):
+        self.queries = []
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def graphql(self, query, variables):
+        self.queries.append(variables)
+        if "login" in variables:
+            if variables["repoCursor"] is None:
+                repos = [{"nameWithOwner": "bot/a",
+                          "stargazers": page([("u3", ts(1))], cursor="a1", total=2)}]
+                user = {"repositories": {"pageInfo": {"hasNextPage": True, "endCursor": "r1"}, "nodes": repos}}
+            else:
+                repos = [{"nameWithOwner": "bot/b", "stargazers": page([("u2", ts(5))], total=1)}]
+                user = {"repositories": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": repos}}
+            if variables["withStarred"]:
+                user["starredRepositories"] = {
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "nodes": [{"nameWithOwner": "u1/x", "owner": {"login": "u1"}}],
+                }
+            return {"data": {"user": user}}
+        assert variables == {"o0": "bot", "n0": "a", "c0": "a1"}
+        return {"data": {"r0": {"stargazers": page([("u1", ts(9))])}}}
+
+def test_graphql_collects_all_pages():
+    client = FakeGraphQL()
+    snap = stargazers.collect_graphql(client, "bot")
+
+    assert snap.repos == ["bot/a", "bot/b"]
+    assert snap.stargazers == {"bot/a": ["u1", "u3"], "bot/b": ["u2"]}
+    assert snap.starred == [("u1/x", "u1")]
+    assert snap.marks["bot/a"]["count"] == 2
+    assert len(client.queries) == 3  # two overview pages + one batched follow-up
+
+def mark(count, newest_hours_ago):
+    return {"count": count, "last_starred_at": ts(newest_hours_ago), "full_synced_at": ts(1)}
+
+def test_unchanged_count_reads_nothing():
+    sync = stargazers._RepoSync("bot/a", 2, mark(2, 3), NOW)
+    assert sync.done
+    assert sync.result(["u1", "u2"])[0] == ["u1", "u2"]
+
+def test_delta_stops_at_high_water_mark():
+    sync = stargazers._RepoSync("bot/a", 3, mark(2, 3), NOW)
+    assert sync.mode == "delta"
+    assert sync.feed("u3", ts(1))
+    assert not sync.feed("u2", ts(3))  # reached last run's newest star
+    logins, new_mark = sync.result(["u1", "u2"])
+    assert logins == ["u1", "u2", "u3"]
+    assert new_mark["count"] == 3
+
+def test_delta_turns_full_when_someone_unstarred():
+    # two new stars but the count only went 2 -> 3: someone unstarred in between
+    sync = stargazers._RepoSync("bot/a", 3, mark(2, 3), NOW)
+    sync.feed("u4", ts(1))
+    sync.feed("u5", ts(2))
+    assert sync.feed("u2", ts(3))  # 2 + 2 != 3 → keep reading everything
+    sync.end()
+    assert sync.mode == "full"
+    assert sync.result(["u1", "u2"])[0] == ["u2", "u5", "u4"]
+
+def test_pending_queue_keeps_order_and_skips_recent_unbalanced():
+    reciprocity = {
+        "ann": {"starred_by": ["me/a", "me/b"], "starred_back": ["ann/x"]},
+        "bob": {"starred_by": ["me/a"], "starred_back": ["bob/x"]},            # balanced
+        "cid": {"starred_by": ["me/a"], "starred_back": []},
+        "dee": {"starred_by": ["me/a"], "starred_back": [], "starback_unmatchable_at": ts(1)},
+        "eve": {"starred_by": ["me/a"], "starred_back": [], "starback_unmatchable_at": ts(24 * 8)},
+        # Stamped by autounstarback's reciprocity pass, not a verdict that nothing can be starred
+        "fay": {"starred_by": ["me/a"], "starred_back": [], "last_unbalanced_attempt": ts(1)},
+    }
+    queue = stargazers.pending_queue(reciprocity, previous_queue=["cid", "bob", "gone"])
+    assert queue == ["cid", "ann", "eve", "fay"]
+
+def test_repo_record_keeps_timestamps_and_deltas():
+    snap = stargazers.Snapshot(
+        repos=["bot/a", "bot/b"],
+        stargazers={"bot/a": ["u1", "u3"], "bot/b": []},
+        starred=None, marks={},
+        dates={"bot/a": {"u3": ts(1)}},
+    )
+    previous = {"bot/a": {"u1": ts(50), "u2": ts(40)}, "bot/b": {"u9": None}}
+    record = stargazers.repo_stargazers(snap, previous)
+    assert record == {"bot/a": {"u1": ts(50), "u3": ts(1)}, "bot/b": {}}
+    assert stargazers.deltas(previous, record) == {
+        "new": {"bot/a": ["u3"]}, "lost": {"bot/a": ["u2"], "bot/b": ["u9"]},
+    }
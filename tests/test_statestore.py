@@ -0,0 +1,47 @@
+# tests/test_statestore.py
+import json
+
+import pytest
+
+from statestore import StateStore, SCHEMA_VERSION
+
+def test_imports_legacy_json_and_exports_it_back(tmp_path):
+    legacy = {
+        "current_stargazers": ["ann"],
+        "reciprocity": {"ann": {"starred_by": ["me/a"], "starred_back": []}},
+        "growth_starred": {"bob": [{"repo": "bob/x", "starred_at": None}]},
+        "custom_key": 1,
+    }
+    (tmp_path / "state.json").write_text(json.dumps(legacy))
+    store = StateStore(tmp_path / "state.sqlite", tmp_path / "state.json")
+
+    assert store.get("current_stargazers") == ["ann"]
+    assert store.section("reciprocity").get("ann")["starred_by"] == ["me/a"]
+    assert "bob" in store.section("growth_starred")
+
+    store.export_json()
+    exported = json.loads((tmp_path / "state.json").read_text())
+    assert exported["growth_starred"] == legacy["growth_starred"]
+    assert exported["custom_key"] == 1
+    assert exported["unresponsive"] == {}  # known sections are always present
+    assert list(exported)[0] == "current_stargazers"
+
+def test_transaction_rolls_back_and_replace_writes_only_changes(tmp_path):
+    store = StateStore(tmp_path / "state.sqlite", tmp_path / "missing.json")
+    recip = store.section("reciprocity")
+    recip.put("ann", {"starred_by": ["me/a"]})
+    recip.put("bob", {"starred_by": ["me/b"]})
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            recip.delete("ann")
+            raise RuntimeError("boom")
+    assert "ann" in recip
+
+    assert recip.replace({"ann": {"starred_by": ["me/a"]}, "cid": {"starred_by": []}}) == 2
+    assert recip.keys() == ["ann", "cid"]
+    store.close()
+
+    reopened = StateStore(tmp_path / "state.sqlite", tmp_path / "missing.json")
+    assert reopened._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert len(reopened.section("reciprocity")) == 2
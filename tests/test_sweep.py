@@ -0,0 +1,103 @@
+# tests/test_sweep.py
+import json
+import contextlib
+
+from github import GithubException
+from ghclient import BudgetExhausted
+import resolver
+import sweep
+
+
+class FakeClient:
+    """Answers aliased repositoryOwner queries from a set of existing logins."""
+
+    def __init__(self, existing, budget=None, dry_run=False):
+        self.existing = set(existing)
+        self.budget = budget
+        self.dry_run = dry_run
+        self.queries = 0
+        self.gh = self
+
+    def graphql(self, query, variables):
+        if self.budget is not None and self.queries >= self.budget:
+            raise BudgetExhausted("out of points")
+        self.queries += 1
+        data, errors = {}, []
+        for var, login in variables.items():
+            alias = "u" + var[1:]
+            if login in self.existing:
+                data[alias] = {"login": login, "__typename": "User"}
+            else:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias]})
+        return {"data": data, "errors": errors}
+
+    def read(self, fn, *args):
+        return fn(*args)
+
+    def get_user(self, login):
+        if login not in self.existing:
+            raise GithubException(404, {"message": "Not Found"}, None)
+        return login
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield
+
+
+def test_exists_batches_and_flags_missing():
+    logins = [f"user{i}" for i in range(120)]
+    client = FakeClient(logins[::2])
+    verdicts = resolver.exists(client, logins)
+    assert client.queries == 3  # 50 + 50 + 20
+    assert verdicts["user0"] is True and verdicts["user1"] is False
+
+
+def test_exists_falls_back_to_rest_for_errored_aliases():
+    class Flaky(FakeClient):
+        def graphql(self, query, variables):
+            response = super().graphql(query, variables)
+            response["data"]["u1"] = None
+            response["errors"].append({"type": "INTERNAL", "path": ["u1"]})
+            return response
+
+    verdicts = resolver.exists(Flaky(["a", "b"]), ["a", "b", "c"])
+    assert verdicts == {"a": True, "b": True, "c": False}
+
+
+def test_sweep_resumes_from_checkpoint_and_rewrites_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(resolver, "LOGINS_PER_QUERY", 2)
+    usernames = tmp_path / "config" / "usernames.txt"
+    usernames.parent.mkdir()
+    names = ["Alice", "bob", "carol", "dave", "erin", "frank"]
+    usernames.write_text("\n".join(names) + "\n")
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    existing = {"alice", "carol", "erin", "frank"}
+
+    # First run stops after one batch: checkpoint holds progress, file untouched
+    assert not sweep.sweep(FakeClient(existing, budget=1), usernames, log_dir, limit=100, workers=1)
+    checkpoint = json.loads(sweep.checkpoint_path(tmp_path).read_text())
+    assert checkpoint["after"] == "bob" and checkpoint["missing"] == ["bob"]
+    assert usernames.read_text().split() == names
+
+    # Second run picks up at "carol" and finishes the sweep
+    client = FakeClient(existing)
+    assert sweep.sweep(client, usernames, log_dir, limit=100, workers=2)
+    assert client.queries == 2
+    assert usernames.read_text().split() == ["Alice", "carol", "erin", "frank"]
+    assert not sweep.checkpoint_path(tmp_path).exists()
+    assert list(log_dir.glob("sweep-missing-*.txt"))
+
+
+def test_dry_run_sweep_leaves_file_and_checkpoint_alone(tmp_path):
+    usernames = tmp_path / "config" / "usernames.txt"
+    usernames.parent.mkdir()
+    usernames.write_text("alice\nbob\n")
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+
+    assert sweep.sweep(FakeClient({"alice"}, dry_run=True), usernames, log_dir, limit=100, workers=1)
+    assert usernames.read_text().split() == ["alice", "bob"]
+    assert not sweep.checkpoint_path(tmp_path).exists()
+    assert list(log_dir.glob("sweep-missing-*.txt"))
@@ -1,5 +1,7 @@
 # tests/test_unfollowers.py
+import json
 import pytest
+from datetime import datetime, timezone
 from importlib import util
 from pathlib import Path
 
@@ -30,14 +32,14 @@ class DummyMe:
 
 class DummyGithub:
     def __init__(self, me): self._me = me
-    def get_user(self, *args, **kwargs):
-        return self._me
+    def get_user(self, login=None, **kwargs):
+        return DummyUser(login) if login else self._me
 
 @pytest.fixture(autouse=True)
 def fake_github(monkeypatch):
     monkeypatch.setenv("PAT_TOKEN", "fake")
     me = DummyMe()
-    monkeypatch.setattr("github.Github", lambda token: DummyGithub(me))
+    monkeypatch.setattr("github.Github", lambda token, **kwargs: DummyGithub(me))
     return me
 
 def test_unfollowers_only(fake_github, patch_config, capsys):
@@ -48,3 +50,38 @@ def test_unfollowers_only(fake_github, patch_config, capsys):
     assert fake_github.removed == ["charlie"]
     out = capsys.readouterr().out
     assert "[UNFOLLOWED] charlie" in out
+
+def test_unfollowers_resumes_queue_and_caps_per_run(fake_github, patch_config, isolated_state, monkeypatch, capsys):
+    queue = isolated_state / "unfollow_queue.json"
+    queue.write_text(json.dumps({
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "remaining": ["alice", "bob", "sotiris", "dave"],  # sotiris is whitelisted
+    }))
+    monkeypatch.setenv("UNFOLLOWS_PER_RUN", "2")
+    monkeypatch.setenv("UNFOLLOW_WORKERS", "1")
+
+    unf = load_script(Path("scripts/unfollowers.py"))
+    unf.main()
+
+    # the follow lists aren't re-fetched; the first two leftovers go, the rest waits
+    assert fake_github.removed == ["alice", "bob"]
+    assert json.loads(queue.read_text())["remaining"] == ["dave"]
+
+    unf.main()
+    assert fake_github.removed == ["alice", "bob", "dave"]
+    assert not queue.exists()
+
+def test_unfollowers_spares_recent_follows_and_records_unfollows(fake_github, patch_config):
+    from ledger import FollowLedger
+    with FollowLedger() as ledger:
+        ledger.record_follow("charlie", "follow")  # followed minutes ago
+    unf = load_script(Path("scripts/unfollowers.py"))
+    unf.main()
+    assert fake_github.removed == []
+
+    with FollowLedger() as ledger:
+        ledger.record_follow("charlie", "follow", now=datetime(2020, 1, 1, tzinfo=timezone.utc))
+    unf.main()
+    assert fake_github.removed == ["charlie"]
+    with FollowLedger() as ledger:
+        assert ledger.rows()[0]["unfollowed_at"] is not None
@@ -0,0 +1,37 @@
+# tests/test_usercache.py
+from datetime import datetime, timedelta, timezone
+
+from usercache import UserCache, MISSING_TTL, EVICT_AFTER
+
+def test_roundtrip_is_case_insensitive(tmp_path):
+    cache = UserCache(tmp_path / "c.sqlite")
+    seen = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    cache.set_last_event("Irene", seen)
+    cache.set_repos("irene", ["irene/a", "irene/b"])
+
+    assert cache.exists("IRENE") is True
+    assert cache.last_event("irene") == (True, seen)
+    assert cache.repos("Irene") == ["irene/a", "irene/b"]
+    assert cache.exists("nobody") is None
+    assert cache.last_event("nobody") == (False, None)
+
+def test_ttl_and_eviction(tmp_path):
+    path = tmp_path / "c.sqlite"
+    cache = UserCache(path)
+    cache.set_exists("dne", False)
+    later = datetime.now(timezone.utc) + MISSING_TTL + timedelta(minutes=1)
+    assert cache.exists("dne") is False
+    assert cache.exists("dne", now=later) is None  # stale → ask the API again
+
+    assert cache.evict(now=datetime.now(timezone.utc) + EVICT_AFTER + timedelta(days=1)) == 1
+    cache.close()
+    assert UserCache(path).exists("dne") is None
+
+def test_repo_index_follows_signature(tmp_path):
+    cache = UserCache(tmp_path / "c.sqlite")
+    cache.set_repos("irene", ["irene/a"], signature=[1, "2025-01-01"])
+    assert cache.repos("irene", signature=[1, "2025-01-01"]) == ["irene/a"]
+    assert cache.repos("irene", signature=[2, "2025-02-01"]) is None  # new repo → re-list
+    cache.forget_repos("irene")
+    assert cache.repos("irene") is None
+    assert cache.exists("irene") is True